@@ -1,3 +1,12 @@
 from django.contrib import admin
+from .models import ProviderRateBucket, IdempotencyKey
 
-# Register your models here.
+@admin.register(ProviderRateBucket)
+class ProviderRateBucketAdmin(admin.ModelAdmin):
+    list_display = ('key', 'tokens', 'updated_at')
+
+
+@admin.register(IdempotencyKey)
+class IdempotencyKeyAdmin(admin.ModelAdmin):
+    list_display = ('key', 'created_by', 'status_code', 'created_at')
+    search_fields = ('key',)
@@ -0,0 +1,183 @@
+from collections import Counter
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Count, F, Q, Sum, Value, When
+from django.db.models.functions import Greatest, TruncDate
+from django.utils import timezone
+
+from src.message_logs.models import DeliveryRollup, MessageLog, RecipientLog
+from src.send_jobs.models import SendJob
+
+
+GROUP_BY_FIELDS = {
+    "day": ("day",),
+    "template": ("template_key", "template_id__name"),
+    "status": ("status",),
+}
+# rollup keys matched by one UPDATE
+ROLLUP_UPDATE_CHUNK_SIZE = 100
+
+
+def rollup_key(message_log, status: str, templates: dict):
+    template_id = templates.get(message_log.job_id_id)
+    return (
+        message_log.author_id_id,
+        timezone.localdate(message_log.sent_at),
+        status or "",
+        str(template_id) if template_id else "",
+    )
+
+
+def job_templates(message_logs):
+    """{send job id: template id} of the send jobs of `message_logs`."""
+    job_field = MessageLog._meta.get_field("job_id")
+    templates = {}
+    unknown = set()
+    for message_log in message_logs:
+        if message_log.job_id_id is None:
+            continue
+        if job_field.is_cached(message_log):
+            templates[message_log.job_id_id] = message_log.job_id.template_id_id
+        else:
+            unknown.add(message_log.job_id_id)
+    if unknown:
+        templates.update(SendJob.objects.filter(pk__in=unknown).values_list("id", "template_id"))
+    return templates
+
+
+def update_rollups(changes):
+    """
+    Apply `(message_log, old_status, new_status)` recipient log changes to
+    the daily delivery rollups, with `old_status` None for a new recipient.
+    Call it in the transaction writing the recipient logs.
+
+    Missing rollup rows are inserted with one INSERT ignoring conflicts,
+    then counts are moved with F() expressions, one UPDATE per chunk of
+    rollup keys, so concurrent writers never lose an increment.
+    """
+    changes = list(changes)
+    templates = job_templates({message_log for message_log, _, _ in changes})
+
+    deltas = Counter()
+    for message_log, old_status, new_status in changes:
+        if old_status is not None:
+            deltas[rollup_key(message_log, old_status, templates)] -= 1
+        deltas[rollup_key(message_log, new_status, templates)] += 1
+    deltas = {key: n for key, n in deltas.items() if n}
+    if not deltas:
+        return
+
+    DeliveryRollup.objects.bulk_create(
+        [
+            DeliveryRollup(
+                author_id_id=author_id,
+                day=day,
+                status=status,
+                template_key=template_key,
+                template_id_id=template_key or None,
+            )
+            for author_id, day, status, template_key in deltas
+        ],
+        ignore_conflicts=True,
+    )
+    keys = list(deltas)
+    for i in range(0, len(keys), ROLLUP_UPDATE_CHUNK_SIZE):
+        matches = [
+            (Q(author_id=author_id, day=day, status=status, template_key=template_key), deltas[author_id, day, status, template_key])
+            for author_id, day, status, template_key in keys[i : i + ROLLUP_UPDATE_CHUNK_SIZE]
+        ]
+        delta = Case(*(When(match, then=Value(n)) for match, n in matches), default=Value(0))
+        DeliveryRollup.objects.filter(reduce(or_, (match for match, _ in matches))).update(
+            # a count that drifted low stays at 0 until the rollups are backfilled
+            count=Greatest(F("count") + delta, 0)
+        )
+
+
+def backfill_rollups(since=None):
+    """
+    Rebuild the rollups from the recipient logs of messages sent on or after
+    the date `since`, or of every message. Returns the number of rollup rows
+    written.
+    """
+    recipients = RecipientLog.objects.all()
+    rollups = DeliveryRollup.objects.all()
+    if since is not None:
+        recipients = recipients.filter(message_id__sent_at__date__gte=since)
+        rollups = rollups.filter(day__gte=since)
+
+    rows = (
+        recipients.values(
+            "status",
+            author=F("message_id__author_id"),
+            sent_on=TruncDate("message_id__sent_at"),
+            template=F("message_id__job_id__template_id"),
+        )
+        .annotate(recipients=Count("id"))
+        .order_by()
+    )
+    with transaction.atomic():
+        rollups.delete()
+        created = DeliveryRollup.objects.bulk_create(
+            [
+                DeliveryRollup(
+                    author_id_id=row["author"],
+                    day=row["sent_on"],
+                    status=row["status"] or "",
+                    template_id_id=row["template"],
+                    template_key=str(row["template"]) if row["template"] else "",
+                    count=row["recipients"],
+                )
+                for row in rows.iterator()
+            ],
+            batch_size=1000,
+        )
+    return len(created)
+
+
+def summarize(row: dict):
+    total, success, failed = row.pop("total"), row.pop("success"), row.pop("failed")
+    return {
+        **row,
+        "total": total,
+        "success": success,
+        "failed": failed,
+        "pending": total - success - failed,
+        "success_rate": round(success / total, 4) if total else None,
+    }
+
+
+def delivery_summary(user, start, end, group_by: str = "day"):
+    """
+    Recipients of `user`'s messages sent between the dates `start` and `end`
+    included, by delivery outcome, in total and per `group_by` (day,
+    template or status). Reads the rollups only.
+    """
+    success = Q(status__in=settings.SMS_SUCCESS_STATUSES)
+    failed = (
+        Q(status__in=settings.SMS_FAILED_STATUSES) | Q(status__in=settings.SMS_RETRYABLE_STATUSES)
+    ) & ~success
+    sums = {
+        "total": Sum("count", default=0),
+        "success": Sum("count", filter=success, default=0),
+        "failed": Sum("count", filter=failed, default=0),
+    }
+    rollups = DeliveryRollup.objects.filter(author_id=user, day__gte=start, day__lte=end)
+    fields = GROUP_BY_FIELDS[group_by]
+    groups = rollups.values(*fields).annotate(**sums).order_by(*fields)
+
+    results = []
+    for row in groups:
+        if group_by == "template":
+            template_key, name = row.pop("template_key"), row.pop("template_id__name")
+            row = {"template_id": template_key or None, "template": name, **row}
+        results.append(summarize(row))
+    return {
+        "start": start,
+        "end": end,
+        "group_by": group_by,
+        "totals": summarize(rollups.aggregate(**sums)),
+        "results": results,
+    }
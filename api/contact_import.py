@@ -0,0 +1,287 @@
+import codecs
+import csv
+from itertools import islice
+
+import openpyxl
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from src.contacts.models import Contact, ContactImport
+from src.contacts.utils import normalize_phone
+from .jobs import lease_expiry
+from .utils import lookup_contact_ids
+
+
+# header spellings accepted for each column
+COLUMN_ALIASES = {
+    "full_name": "full_name",
+    "full name": "full_name",
+    "name": "full_name",
+    "phone": "phone",
+    "phone number": "phone",
+    "phone_number": "phone",
+    "mobile": "phone",
+    "email": "email",
+    "email address": "email",
+    "info": "info",
+    "notes": "info",
+}
+FULL_NAME_MAX_LENGTH = Contact._meta.get_field("full_name").max_length
+EMAIL_MAX_LENGTH = Contact._meta.get_field("email").max_length
+
+
+class ContactImportError(Exception):
+    pass
+
+
+def import_format(filename: str):
+    """Return the import format of an uploaded file name, or None if unsupported."""
+    extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    if extension == ContactImport.CSV:
+        return ContactImport.CSV
+    if extension == ContactImport.XLSX:
+        return ContactImport.XLSX
+    return None
+
+
+def map_header(header):
+    columns = [COLUMN_ALIASES.get(str(name or "").strip().lower()) for name in header]
+    if "phone" not in columns or "full_name" not in columns:
+        raise ContactImportError("The first row must name a full_name and a phone column")
+    return columns
+
+
+def iter_csv_rows(file):
+    reader = csv.reader(codecs.iterdecode(file, "utf-8-sig"))
+    columns = map_header(next(reader, []))
+    for values in reader:
+        yield dict(zip(columns, values))
+
+
+def iter_xlsx_rows(file):
+    workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        columns = map_header(next(rows, ()))
+        for values in rows:
+            yield dict(zip(columns, ("" if value is None else str(value) for value in values)))
+    finally:
+        workbook.close()
+
+
+ROW_READERS = {
+    ContactImport.CSV: iter_csv_rows,
+    ContactImport.XLSX: iter_xlsx_rows,
+}
+
+
+def clean_row(row: dict):
+    """Return the contact fields of a file row, or raise ValidationError."""
+    full_name = (row.get("full_name") or "").strip()
+    if not full_name:
+        raise ValidationError("full_name is required")
+    if len(full_name) > FULL_NAME_MAX_LENGTH:
+        raise ValidationError(f"full_name is longer than {FULL_NAME_MAX_LENGTH} characters")
+
+    phone = (row.get("phone") or "").strip()
+    phone_e164 = normalize_phone(phone)
+    if phone_e164 is None:
+        raise ValidationError(f"'{phone}' is not a valid phone number")
+
+    email = (row.get("email") or "").strip() or None
+    if email is not None:
+        if len(email) > EMAIL_MAX_LENGTH:
+            raise ValidationError(f"email is longer than {EMAIL_MAX_LENGTH} characters")
+        validate_email(email)
+
+    info = (row.get("info") or "").strip() or None
+    return {"full_name": full_name, "phone_e164": phone_e164, "email": email, "info": info}
+
+
+class ImportBatch:
+    """One batch of file rows, cleaned and deduplicated by phone number."""
+
+    def __init__(self):
+        self.contacts = {}
+        self.errors = []
+
+    def add(self, line: int, row: dict):
+        try:
+            contact = clean_row(row)
+        except ValidationError as e:
+            self.errors.append({"row": line, "error": "; ".join(e.messages)})
+            return
+        # a later row for the same number wins
+        contact["row"] = line
+        self.contacts.pop(contact["phone_e164"], None)
+        self.contacts[contact["phone_e164"]] = contact
+
+    def reject(self, contact, error: str):
+        del self.contacts[contact["phone_e164"]]
+        self.errors.append({"row": contact["row"], "error": error})
+
+
+def check_emails(batch: ImportBatch, user):
+    """
+    Contact emails are unique across all users. Reject rows whose email
+    belongs to another contact, or to an earlier row of the batch.
+    """
+    owners = {}
+    for contact in list(batch.contacts.values()):
+        email = contact["email"]
+        if email is None:
+            continue
+        if email in owners:
+            batch.reject(contact, f"email {email} is used by row {owners[email]['row']}")
+        else:
+            owners[email] = contact
+    if not owners:
+        return
+
+    existing = Contact.objects.filter(email__in=list(owners)).values_list(
+        "email", "created_by", "phone_e164"
+    )
+    for email, created_by, phone_e164 in existing:
+        contact = owners[email]
+        if created_by != user.pk or phone_e164 != contact["phone_e164"]:
+            batch.reject(contact, f"email {email} belongs to another contact")
+
+
+def upsert_batch(batch: ImportBatch, user):
+    """
+    Write a batch with one lookup of the numbers already in the user's
+    contacts, one bulk update of those and one bulk insert of the rest.
+    Returns the number of contacts created and updated.
+    """
+    check_emails(batch, user)
+    if not batch.contacts:
+        return 0, 0
+
+    existing_ids = lookup_contact_ids(list(batch.contacts), user)
+    updates, creates = [], []
+    for phone_e164, contact in batch.contacts.items():
+        fields = {
+            "full_name": contact["full_name"],
+            "email": contact["email"],
+            "info": contact["info"],
+        }
+        if phone_e164 in existing_ids:
+            updates.append(Contact(id=existing_ids[phone_e164], **fields))
+        else:
+            creates.append(
+                Contact(phone=phone_e164, phone_e164=phone_e164, created_by=user, **fields)
+            )
+
+    now = timezone.now()
+    for contact in updates + creates:
+        contact.updated_at = now
+    with transaction.atomic():
+        Contact.objects.bulk_update(
+            updates, ["full_name", "email", "info", "updated_at"], batch_size=1000
+        )
+        # every saved number is normalized, so the lookup found all the contacts to update
+        Contact.objects.bulk_create(creates, batch_size=1000)
+    return len(creates), len(updates)
+
+
+def claim_imports(worker_id: str, limit: int = 1):
+    """Lease pending imports, or imports whose worker's lease expired."""
+    now = timezone.now()
+    with transaction.atomic():
+        imports = list(
+            ContactImport.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status=ContactImport.PENDING)
+                | Q(status=ContactImport.RUNNING, locked_until__lt=now)
+            )
+            .order_by("created_at")[:limit]
+        )
+        for contact_import in imports:
+            contact_import.status = ContactImport.RUNNING
+            contact_import.locked_by = worker_id
+            contact_import.locked_until = lease_expiry()
+            contact_import.started_at = contact_import.started_at or now
+            contact_import.save(
+                update_fields=["status", "locked_by", "locked_until", "started_at", "updated_at"]
+            )
+    return imports
+
+
+def process_import(contact_import, worker_id: str):
+    """
+    Stream the uploaded file and upsert it batch by batch. Progress is saved
+    after every batch, so a resumed import skips the rows already written.
+    Returns False when the lease was lost to another worker.
+    """
+    user = contact_import.created_by
+    batch_size = settings.CONTACT_IMPORT_BATCH_SIZE
+    max_errors = settings.CONTACT_IMPORT_MAX_ERRORS
+
+    with contact_import.file.open("rb") as file:
+        rows = ROW_READERS[contact_import.file_format](file)
+        # line 1 is the header
+        line = 1 + contact_import.processed_rows
+        rows = islice(rows, contact_import.processed_rows, None)
+        while True:
+            chunk = list(islice(rows, batch_size))
+            if not chunk:
+                break
+            batch = ImportBatch()
+            for row in chunk:
+                line += 1
+                batch.add(line, row)
+            created, updated = upsert_batch(batch, user)
+
+            contact_import.processed_rows += len(chunk)
+            contact_import.created_count += created
+            contact_import.updated_count += updated
+            contact_import.error_count += len(batch.errors)
+            room = max_errors - len(contact_import.errors)
+            if room > 0:
+                contact_import.errors = contact_import.errors + batch.errors[:room]
+            updated_rows = ContactImport.objects.filter(
+                pk=contact_import.pk, locked_by=worker_id
+            ).update(
+                processed_rows=contact_import.processed_rows,
+                created_count=contact_import.created_count,
+                updated_count=contact_import.updated_count,
+                error_count=contact_import.error_count,
+                errors=contact_import.errors,
+                locked_until=lease_expiry(),
+                updated_at=timezone.now(),
+            )
+            if updated_rows != 1:
+                return False
+    return True
+
+
+def finish_import(contact_import, worker_id: str, status: str, error: str = None):
+    ContactImport.objects.filter(pk=contact_import.pk, locked_by=worker_id).update(
+        status=status,
+        error=error,
+        locked_by=None,
+        locked_until=None,
+        finished_at=timezone.now(),
+        updated_at=timezone.now(),
+    )
+    contact_import.status = status
+    contact_import.error = error
+
+
+def run_pending_imports(worker_id: str, limit: int = 1):
+    """Claim and process one round of contact imports. Returns the number claimed."""
+    imports = claim_imports(worker_id, limit=limit)
+    for contact_import in imports:
+        try:
+            finished = process_import(contact_import, worker_id)
+        except Exception as e:
+            finish_import(contact_import, worker_id, ContactImport.FAILED, error=str(e))
+            continue
+        if finished:
+            finish_import(contact_import, worker_id, ContactImport.COMPLETED)
+            contact_import.file.delete(save=False)
+    return len(imports)
@@ -0,0 +1,105 @@
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.db.models.functions import Greatest
+
+from src.message_logs.models import MessageLog
+
+
+SUCCESS = "success_count"
+FAILED = "failed_count"
+PENDING = "pending_count"
+COUNTER_FIELDS = ["total_count", SUCCESS, FAILED, PENDING]
+
+
+def status_counter(status: str):
+    """Name of the MessageLog counter a recipient with `status` is counted in."""
+    if status in settings.SMS_SUCCESS_STATUSES:
+        return SUCCESS
+    if status in settings.SMS_FAILED_STATUSES or status in settings.SMS_RETRYABLE_STATUSES:
+        return FAILED
+    return PENDING
+
+
+def update_counters(changes):
+    """
+    Apply `(message_log, old_status, new_status)` recipient log changes to
+    the message log counters, with `old_status` None for a new recipient.
+    Call it in the transaction writing the recipient logs.
+
+    Counters are moved with F() expressions, so concurrent writers never
+    lose an increment, and message logs with the same deltas share one
+    UPDATE. Returns the number of UPDATE queries run.
+    """
+    deltas = defaultdict(Counter)
+    for message_log, old_status, new_status in changes:
+        delta = deltas[message_log.pk]
+        if old_status is None:
+            delta["total_count"] += 1
+        else:
+            delta[status_counter(old_status)] -= 1
+        delta[status_counter(new_status)] += 1
+
+    groups = defaultdict(list)
+    for message_id, delta in deltas.items():
+        key = tuple(sorted((field, n) for field, n in delta.items() if n))
+        if key:
+            groups[key].append(message_id)
+
+    for key, message_ids in groups.items():
+        MessageLog.objects.filter(pk__in=message_ids).update(
+            # a counter that drifted low stays at 0 until it is reconciled
+            **{field: F(field) + n if n > 0 else Greatest(F(field) + n, 0) for field, n in key}
+        )
+    return len(groups)
+
+
+def reconcile_counters(batch_size: int = 1000, dry_run: bool = False):
+    """
+    Recompute the counters of every message log from its recipient logs and
+    fix the ones that drifted. Logs are walked in id order, one batch per
+    transaction. Each batch is locked before it is counted, so a writer
+    either commits before the count or increments it afterwards. Returns
+    the number of message logs whose counters were wrong.
+    """
+    failed_statuses = set(settings.SMS_FAILED_STATUSES) | set(settings.SMS_RETRYABLE_STATUSES)
+    success_statuses = set(settings.SMS_SUCCESS_STATUSES)
+    drifted = 0
+    last_id = 0
+    while True:
+        with transaction.atomic():
+            batch = MessageLog.objects.filter(pk__gt=last_id).order_by("pk")
+            if not dry_run:
+                batch = batch.select_for_update()
+            ids = list(batch.values_list("pk", flat=True)[:batch_size])
+            if not ids:
+                return drifted
+            last_id = ids[-1]
+
+            logs = MessageLog.objects.filter(pk__in=ids).annotate(
+                actual_total=Count("recipientlog"),
+                actual_success=Count(
+                    "recipientlog", filter=Q(recipientlog__status__in=success_statuses)
+                ),
+                actual_failed=Count(
+                    "recipientlog",
+                    filter=Q(recipientlog__status__in=failed_statuses - success_statuses),
+                ),
+            )
+            stale = []
+            for log in logs:
+                actual = {
+                    "total_count": log.actual_total,
+                    SUCCESS: log.actual_success,
+                    FAILED: log.actual_failed,
+                    PENDING: log.actual_total - log.actual_success - log.actual_failed,
+                }
+                if any(getattr(log, field) != count for field, count in actual.items()):
+                    for field, count in actual.items():
+                        setattr(log, field, count)
+                    stale.append(log)
+            drifted += len(stale)
+            if stale and not dry_run:
+                MessageLog.objects.bulk_update(stale, COUNTER_FIELDS)
@@ -0,0 +1,45 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+def dedupe_key(user_id, number: str, digest: str):
+    return f"sms-dedupe:{user_id}:{number}:{digest}"
+
+
+def dedupe_keys(user, message: str, phone_numbers: list):
+    digest = hashlib.sha1(message.encode()).hexdigest()
+    return {number: dedupe_key(user.pk, number, digest) for number in phone_numbers}
+
+
+def drop_recent_duplicates(user, message: str, phone_numbers: list):
+    """
+    Split `phone_numbers` into the ones that may be sent `message` and the
+    ones that were already sent the same text by `user` within the last
+    SMS_DEDUPE_WINDOW minutes. Nothing is marked: call `mark_sent` once the
+    send is committed, so a send that fails is not dropped on retry.
+
+    The window lives in the cache: one `get_many` per call, whatever the
+    recipient count. The cache must be shared by the API and the workers
+    for the window to hold across processes.
+    """
+    if settings.SMS_DEDUPE_WINDOW <= 0:
+        return phone_numbers, []
+
+    keys = dedupe_keys(user, message, phone_numbers)
+    seen = cache.get_many(keys.values())
+
+    kept, dropped = [], []
+    for number, key in keys.items():
+        (dropped if key in seen else kept).append(number)
+    return kept, dropped
+
+
+def mark_sent(user, message: str, phone_numbers: list):
+    """Open the dedupe window of `message` for `phone_numbers`, with one `set_many`."""
+    window = settings.SMS_DEDUPE_WINDOW
+    if window <= 0 or not phone_numbers:
+        return
+    keys = dedupe_keys(user, message, phone_numbers)
+    cache.set_many(dict.fromkeys(keys.values(), 1), timeout=window * 60)
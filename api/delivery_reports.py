@@ -0,0 +1,116 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from src.message_logs.models import PendingDeliveryReport, RecipientLog
+from .retries import schedule_retries, is_retryable
+from .counters import update_counters
+from .analytics import update_rollups
+
+
+def apply_delivery_reports(updates: dict):
+    """
+    Apply `{provider_message_id: (status, received_at)}` to the matching
+    recipient logs with one SELECT and one bulk UPDATE per batch, whatever
+    the number of reports. A report received before the recipient log's
+    last status change is stale and skipped, so a retried report can't move
+    a final status back. Recipients reported as failed are scheduled for a
+    retry. Returns the provider ids that matched no recipient log.
+    """
+    if not updates:
+        return set()
+
+    with transaction.atomic():
+        recipient_logs = list(
+            RecipientLog.objects.filter(provider_message_id__in=updates.keys())
+            .select_related("message_id__job_id")
+            # the previous status is moved out of its counter, so it must not change under us
+            .select_for_update(of=("self",))
+        )
+        changes, updated = [], []
+        for recipient_log in recipient_logs:
+            status, received_at = updates[recipient_log.provider_message_id]
+            if recipient_log.status_updated_at is not None and received_at < recipient_log.status_updated_at:
+                continue
+            changes.append((recipient_log.message_id, recipient_log.status, status))
+            recipient_log.status = status
+            recipient_log.status_updated_at = received_at
+            updated.append(recipient_log)
+        RecipientLog.objects.bulk_update(
+            updated,
+            ["status", "status_updated_at"],
+            batch_size=settings.DLR_BATCH_SIZE,
+        )
+        update_counters(changes)
+        update_rollups(changes)
+        schedule_retries([r for r in updated if is_retryable(r.status)])
+    return set(updates) - {r.provider_message_id for r in recipient_logs}
+
+
+def store_delivery_reports(reports):
+    """
+    Save `(provider_message_id, status)` reports in one INSERT, so they are
+    durable before the provider is acknowledged. The send worker applies them
+    with run_pending_delivery_reports().
+    """
+    PendingDeliveryReport.objects.bulk_create(
+        [
+            PendingDeliveryReport(provider_message_id=provider_message_id, status=status)
+            for provider_message_id, status in reports
+        ],
+        batch_size=settings.DLR_BATCH_SIZE,
+    )
+
+
+def run_pending_delivery_reports(limit: int = None):
+    """
+    Apply up to `limit` (DLR_BATCH_SIZE by default) stored delivery reports
+    in one batch and delete them, in the same transaction. A report for the
+    same message replaces the earlier one. Reports that arrive before their
+    recipient log exists are tried again DLR_RETRY_INTERVAL seconds later,
+    up to DLR_UNMATCHED_RETRIES times, before being dropped; a retried report
+    replaces the older ones of its message still waiting. The reports are
+    leased with SKIP LOCKED, so concurrent workers take distinct batches.
+    Returns the number of reports handled.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        reports = list(
+            PendingDeliveryReport.objects.select_for_update(skip_locked=True)
+            .filter(next_attempt_at__lte=now)
+            .order_by("id")[: limit or settings.DLR_BATCH_SIZE]
+        )
+        if not reports:
+            return 0
+
+        # the latest report of each message, in arrival order
+        latest = {report.provider_message_id: report for report in reports}
+        missing = apply_delivery_reports(
+            {
+                provider_message_id: (report.status, report.received_at)
+                for provider_message_id, report in latest.items()
+            }
+        )
+        retried = [
+            latest[provider_message_id]
+            for provider_message_id in missing
+            if latest[provider_message_id].attempts < settings.DLR_UNMATCHED_RETRIES
+        ]
+        if retried:
+            PendingDeliveryReport.objects.filter(id__in=[report.id for report in retried]).update(
+                attempts=F("attempts") + 1,
+                next_attempt_at=now + timedelta(seconds=settings.DLR_RETRY_INTERVAL),
+            )
+            # older reports of the same messages still waiting are replaced by the retried one
+            older = Q()
+            for report in retried:
+                older |= Q(provider_message_id=report.provider_message_id, id__lt=report.id)
+            PendingDeliveryReport.objects.filter(older).delete()
+        retried = [report.id for report in retried]
+        PendingDeliveryReport.objects.filter(id__in=[report.id for report in reports]).exclude(
+            id__in=retried
+        ).delete()
+    return len(reports)
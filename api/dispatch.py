@@ -0,0 +1,54 @@
+import math
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+from .rate_limit import throttle
+from .send_sms import send_sms
+from .sms_backends import get_backend, SMSBackendError
+
+
+# status given to the recipients of a provider call that failed as a whole
+FAILED_STATUS = "Failed"
+
+
+def failed_results(numbers: list, error: Exception):
+    return [{"number": number, "status": FAILED_STATUS, "error": str(error)} for number in numbers]
+
+
+def dispatch(batches: list, concurrency: int = None):
+    """
+    Send `(message, numbers)` batches through `send_sms` using at most
+    `concurrency` provider calls in flight, SMS_DISPATCH_CONCURRENCY by
+    default. Results are returned in the order of `batches`. When the
+    provider rejects a call, each of its recipients gets a FAILED_STATUS
+    result so it can be logged and retried.
+
+    Calls are paced by the provider rate limiter, which waits as long as
+    needed: tokens are taken on the calling thread before each submission so
+    pool threads never touch the database.
+    """
+    concurrency = concurrency or settings.SMS_DISPATCH_CONCURRENCY
+    if concurrency <= 1 or len(batches) <= 1:
+        results = []
+        for message, numbers in batches:
+            try:
+                results.append(send_sms(message=message, to=numbers, max_wait=math.inf))
+            except SMSBackendError as e:
+                results.append(failed_results(numbers, e))
+        return results
+
+    backend = get_backend()
+
+    def send(message, numbers):
+        try:
+            return backend.send_batch(message, numbers)
+        except SMSBackendError as e:
+            return failed_results(numbers, e)
+
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(batches))) as executor:
+        futures = []
+        for message, numbers in batches:
+            throttle(len(numbers))
+            futures.append(executor.submit(send, message, numbers))
+        return [future.result() for future in futures]
@@ -0,0 +1,97 @@
+import functools
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+def request_fingerprint(request, *args, **kwargs):
+    payload = json.dumps(
+        [request.method, request.path, kwargs, request.data],
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def key_expiry():
+    return timezone.now() - timedelta(hours=settings.IDEMPOTENCY_KEY_TTL)
+
+
+def idempotent(view_method):
+    """
+    Store the first response to a request carrying an `Idempotency-Key`
+    header and replay it to retries with the same key, so a retried send
+    never queues a second job.
+
+    The key row is inserted in the same transaction as the view's work. A
+    concurrent retry blocks on the unique (user, key) index until the first
+    request commits and then replays its response. Server errors are rolled
+    back with the key so the client can retry them.
+    """
+
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return view_method(self, request, *args, **kwargs)
+        if len(key) > IdempotencyKey._meta.get_field("key").max_length:
+            return Response(
+                {"message": f"{IDEMPOTENCY_HEADER} is too long"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        fingerprint = request_fingerprint(request, *args, **kwargs)
+        with transaction.atomic():
+            try:
+                with transaction.atomic():
+                    record = IdempotencyKey.objects.create(
+                        created_by=request.user, key=key, fingerprint=fingerprint
+                    )
+            except IntegrityError:
+                record = IdempotencyKey.objects.select_for_update().get(
+                    created_by=request.user, key=key
+                )
+                if record.created_at >= key_expiry():
+                    if record.fingerprint != fingerprint:
+                        return Response(
+                            {
+                                "message": f"{IDEMPOTENCY_HEADER} was already used for a different request"
+                            },
+                            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                        )
+                    return Response(
+                        record.response,
+                        status=record.status_code,
+                        headers={REPLAYED_HEADER: "true"},
+                    )
+                # expired, the key starts over
+                record.fingerprint = fingerprint
+                record.created_at = timezone.now()
+
+            response = view_method(self, request, *args, **kwargs)
+            if response.status_code >= 500:
+                transaction.set_rollback(True)
+                return response
+            record.status_code = response.status_code
+            record.response = response.data
+            record.save()
+        return response
+
+    return wrapper
+
+
+def purge_expired_keys():
+    deleted, _ = IdempotencyKey.objects.filter(created_at__lt=key_expiry()).delete()
+    return deleted
@@ -0,0 +1,297 @@
+import math
+import os
+import socket
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from src.message_logs.models import MessageLog
+from src.contacts.models import Contact
+from src.msg_templates.models import Template
+from src.send_jobs.models import SendJob
+from .templating import get_compiled_template
+from .sms_encoding import transliterate
+from .dispatch import dispatch
+from .dedupe import drop_recent_duplicates, mark_sent
+from .utils import create_message_logs, create_recipient_log, create_recipient_logs
+
+
+MESSAGE_LOG_CACHE_SIZE = 10000
+
+
+class SendJobError(Exception):
+    pass
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def lease_expiry():
+    return timezone.now() + timedelta(seconds=settings.SEND_JOB_LEASE_SECONDS)
+
+
+def initial_status(send_at):
+    if send_at is not None and send_at > timezone.now():
+        return SendJob.SCHEDULED
+    return SendJob.PENDING
+
+
+def enqueue_quick_send(user, message: str, phone_numbers: list, send_at=None, rate_per_minute=None):
+    return SendJob.objects.create(
+        kind=SendJob.QUICK,
+        created_by=user,
+        message=message,
+        recipients=phone_numbers,
+        total=len(phone_numbers),
+        status=initial_status(send_at),
+        send_at=send_at,
+        rate_per_minute=rate_per_minute,
+    )
+
+
+def enqueue_template_send(
+    user, template, total: int, send_at=None, rate_per_minute=None, transliterate=False
+):
+    return SendJob.objects.create(
+        kind=SendJob.TEMPLATE,
+        created_by=user,
+        template_id=template,
+        total=total,
+        status=initial_status(send_at),
+        send_at=send_at,
+        rate_per_minute=rate_per_minute,
+        transliterate=transliterate,
+    )
+
+
+def claim_jobs(worker_id: str, limit: int = 1):
+    """
+    Lease up to `limit` runnable jobs to `worker_id`. Rows locked by another
+    worker's claim are skipped, so concurrent workers never claim the same job.
+    Jobs whose lease expired (crashed worker) become claimable again.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        jobs = list(
+            SendJob.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status=SendJob.PENDING)
+                | Q(status=SendJob.RUNNING, locked_until__lt=now)
+            )
+            .order_by("created_at")[:limit]
+        )
+        for job in jobs:
+            job.status = SendJob.RUNNING
+            job.locked_by = worker_id
+            job.locked_until = lease_expiry()
+            job.attempts += 1
+            job.started_at = job.started_at or now
+            job.save(
+                update_fields=[
+                    "status",
+                    "locked_by",
+                    "locked_until",
+                    "attempts",
+                    "started_at",
+                    "updated_at",
+                ]
+            )
+    return jobs
+
+
+def record_progress(job, worker_id: str, processed: int, last_contact_id=None):
+    """
+    Store progress and renew the lease. Returns False when the lease was lost
+    to another worker, in which case the caller must stop sending.
+    """
+    progress = {"processed": processed}
+    if last_contact_id is not None:
+        progress["last_contact_id"] = last_contact_id
+    updated = SendJob.objects.filter(pk=job.pk, locked_by=worker_id).update(
+        locked_until=lease_expiry(), updated_at=timezone.now(), **progress
+    )
+    for field, value in progress.items():
+        setattr(job, field, value)
+    return updated == 1
+
+
+def finish_job(job, worker_id: str, status: str, error: str = None):
+    SendJob.objects.filter(pk=job.pk, locked_by=worker_id).update(
+        status=status,
+        error=error,
+        locked_by=None,
+        locked_until=None,
+        finished_at=timezone.now(),
+        updated_at=timezone.now(),
+    )
+    job.status = status
+    job.error = error
+
+
+def release_job(job, worker_id: str, send_at):
+    """Hand a paced job back to the scheduler until its next slice is due."""
+    SendJob.objects.filter(pk=job.pk, locked_by=worker_id).update(
+        status=SendJob.SCHEDULED,
+        send_at=send_at,
+        locked_by=None,
+        locked_until=None,
+        updated_at=timezone.now(),
+    )
+    job.status = SendJob.SCHEDULED
+    job.send_at = send_at
+
+
+def process_quick_job(job, worker_id: str, limit: int):
+    user = job.created_by
+    chunk_size = settings.SEND_JOB_CHUNK_SIZE
+    messageLog = MessageLog.objects.filter(job_id=job).first()
+    if messageLog is None:
+        messageLog = create_message_logs(message=job.message, user=user, job=job)
+
+    processed = job.processed
+    end = min(len(job.recipients), processed + limit)
+    while processed < end:
+        chunk = job.recipients[processed : min(processed + chunk_size, end)]
+        # sent outside the transaction, which would hold its locks through the
+        # rate limiter's waits and the provider call
+        (results,) = dispatch([(job.message, chunk)])
+        with transaction.atomic():
+            create_recipient_log(messageLogInstance=messageLog, results=results, user=user)
+            processed += len(chunk)
+            if not record_progress(job, worker_id, processed):
+                return False
+    return processed >= len(job.recipients)
+
+
+def flush_template_batches(pending: dict, messageLogs: dict, job, user):
+    """
+    Send every buffered group of identical messages with one provider call
+    per chunk and one MessageLog per distinct message. Personalized messages
+    cannot share a call, so the calls are fanned out with bounded concurrency.
+    Returns the `(messageLog, results)` deliveries for the caller to log in
+    bulk; it must not be called in a transaction.
+    """
+    chunk_size = settings.SEND_JOB_CHUNK_SIZE
+    for message in list(pending):
+        pending[message], _ = drop_recent_duplicates(user, message, pending[message])
+        if not pending[message]:
+            del pending[message]
+    new_messages = [message for message in pending if message not in messageLogs]
+    created = MessageLog.objects.bulk_create(
+        [MessageLog(content=message, author_id=user, job_id=job) for message in new_messages]
+    )
+    messageLogs.update(zip(new_messages, created))
+
+    batches = [
+        (message, phone_numbers[i : i + chunk_size])
+        for message, phone_numbers in pending.items()
+        for i in range(0, len(phone_numbers), chunk_size)
+    ]
+    results = dispatch(batches)
+    for message, phone_numbers in pending.items():
+        mark_sent(user, message, phone_numbers)
+    deliveries = [(messageLogs[message], result) for (message, _), result in zip(batches, results)]
+    pending.clear()
+    # personalized sends rarely repeat, don't let the cache grow with the audience
+    if len(messageLogs) > MESSAGE_LOG_CACHE_SIZE:
+        messageLogs.clear()
+    return deliveries
+
+
+def process_template_job(job, worker_id: str, limit: int):
+    user = job.created_by
+    template = job.template_id
+    if template is None:
+        raise SendJobError("Template no longer exists")
+
+    chunk_size = settings.SEND_JOB_CHUNK_SIZE
+    compiled = get_compiled_template(template)
+    contacts = Contact.objects.filter(contacttemplate__template_id=template).order_by("id")
+    if job.last_contact_id is not None:
+        # keyset, so contacts added to or removed from the template meanwhile
+        # don't shift the ones still to send
+        contacts = contacts.filter(id__gt=job.last_contact_id)
+    elif job.processed:
+        # progress recorded before last_contact_id existed
+        contacts = contacts[job.processed :]
+    rows = contacts.values(
+        *dict.fromkeys(("id", *compiled.fields)), number=Coalesce("phone_e164", "phone")
+    ).iterator(chunk_size=chunk_size)
+
+    # contacts rendering to the same text are grouped into one provider call;
+    # each batch is flushed before progress is recorded so a resumed job
+    # starts right after the last contact sent
+    pending, messageLogs = {}, {}
+    processed = job.processed
+    remaining = limit
+    while remaining > 0:
+        batch = list(islice(rows, min(chunk_size, remaining)))
+        if not batch:
+            break
+        remaining -= len(batch)
+        messages = compiled.render_many(batch)
+        if job.transliterate:
+            messages = map(transliterate, messages)
+        for row, message in zip(batch, messages):
+            pending.setdefault(message, []).append(row["number"])
+        deliveries = flush_template_batches(pending, messageLogs, job, user)
+        with transaction.atomic():
+            create_recipient_logs(deliveries, user)
+            processed += len(batch)
+            if not record_progress(job, worker_id, processed, last_contact_id=batch[-1]["id"]):
+                return False
+    else:
+        # the slice ended on the limit, contacts may be left for the next one
+        return False
+
+    Template.objects.filter(pk=template.pk).update(last_sent=timezone.now())
+    return True
+
+
+JOB_PROCESSORS = {
+    SendJob.QUICK: process_quick_job,
+    SendJob.TEMPLATE: process_template_job,
+}
+
+
+def process_job(job, worker_id: str):
+    """
+    Run a claimed job. A paced job sends one slice of `rate_per_minute`
+    recipients per claim and goes back to the scheduler until the next minute.
+    """
+    started = timezone.now()
+    limit = job.rate_per_minute or math.inf
+    try:
+        finished = JOB_PROCESSORS[job.kind](job, worker_id, limit)
+    except Exception as e:
+        finish_job(job, worker_id, SendJob.FAILED, error=str(e))
+        return
+    if finished:
+        finish_job(job, worker_id, SendJob.COMPLETED)
+    elif job.rate_per_minute:
+        release_job(job, worker_id, send_at=started + timedelta(minutes=1))
+
+
+def run_pending_jobs(worker_id: str = None, limit: int = 1):
+    """
+    Process one round of up to `limit` jobs. Returns the number of jobs claimed.
+
+    Jobs are claimed one at a time as the previous one finishes: a job
+    leased up front could see its lease expire while the ones before it
+    run, and be claimed and sent again by another worker.
+    """
+    worker_id = worker_id or default_worker_id()
+    claimed = 0
+    while claimed < limit:
+        jobs = claim_jobs(worker_id)
+        if not jobs:
+            break
+        process_job(jobs[0], worker_id)
+        claimed += 1
+    return claimed
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from api.analytics import backfill_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the daily delivery rollups read by the analytics endpoint from the recipient logs. "
+        "Run it after upgrading, or with --since to rebuild recent days only."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--since", help="Only rebuild the days from this date, YYYY-MM-DD")
+
+    def handle(self, *args, **options):
+        since = None
+        if options["since"]:
+            try:
+                since = parse_date(options["since"])
+            except ValueError:
+                since = None
+            if since is None:
+                raise CommandError("--since must be a valid YYYY-MM-DD date")
+        written = backfill_rollups(since=since)
+        self.stdout.write(f"Wrote {written} delivery rollups")
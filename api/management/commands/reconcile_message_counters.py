@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from api.counters import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the recipient counters of every message log from its recipient logs "
+        "and fix the ones that drifted. Run it after upgrading, then periodically, e.g. from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Message logs counted per query")
+        parser.add_argument("--dry-run", action="store_true", help="Only report the drifted message logs")
+
+    def handle(self, *args, **options):
+        drifted = reconcile_counters(batch_size=options["batch_size"], dry_run=options["dry_run"])
+        if options["dry_run"]:
+            self.stdout.write(f"{drifted} message logs have drifted counters")
+        else:
+            self.stdout.write(f"Fixed the counters of {drifted} message logs")
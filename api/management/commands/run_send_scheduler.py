@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connection
+
+from api.scheduler import JobScheduler, try_acquire_leadership, release_leadership
+
+
+class Command(BaseCommand):
+    help = (
+        "Release scheduled and paced send jobs to the workers when they are due. "
+        "Start one on every node; a database advisory lock keeps a single "
+        "scheduler active and a standby takes over when the leader goes away."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--standby-sleep",
+            type=float,
+            default=10.0,
+            help="Seconds between attempts to take over as the active scheduler",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            try:
+                if try_acquire_leadership():
+                    self.stdout.write("Send scheduler is active")
+                    self.lead()
+            except DatabaseError as e:
+                # the advisory lock went away with the connection
+                self.stderr.write(f"Send scheduler lost its database connection: {e}")
+                connection.close()
+            time.sleep(options["standby_sleep"])
+
+    def lead(self):
+        scheduler = JobScheduler()
+        try:
+            while True:
+                released = scheduler.run_once()
+                if released:
+                    self.stdout.write(f"Released {released} scheduled jobs")
+                time.sleep(scheduler.seconds_until_next())
+        finally:
+            if connection.is_usable():
+                release_leadership()
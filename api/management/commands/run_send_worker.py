@@ -0,0 +1,81 @@
+import logging
+import time
+from multiprocessing import Process
+
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+
+from api.jobs import default_worker_id, run_pending_jobs
+from api.retries import run_due_retries
+from api.contact_import import run_pending_imports
+from api.delivery_reports import run_pending_delivery_reports
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Drain queued send jobs, due retries, contact imports and delivery "
+        "reports. Work is leased with SELECT ... FOR UPDATE SKIP LOCKED, so "
+        "any number of workers may run across processes and hosts."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=1,
+            help="Number of worker processes to start on this host",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1,
+            help="Number of jobs claimed per round",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=2.0,
+            help="Seconds to wait when no job is available",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once the queue is empty",
+        )
+
+    def handle(self, *args, **options):
+        processes = max(1, options["processes"])
+        if processes == 1:
+            self.work(options)
+            return
+
+        # children must not share the parent's database connection
+        connections.close_all()
+        workers = [Process(target=self.work, args=(options,)) for _ in range(processes)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+    def work(self, options):
+        worker_id = default_worker_id()
+        self.stdout.write(f"Send worker {worker_id} started")
+        while True:
+            try:
+                claimed = run_pending_jobs(worker_id, limit=options["batch_size"])
+                claimed += run_due_retries()
+                claimed += run_pending_imports(worker_id)
+                claimed += run_pending_delivery_reports()
+            except Exception:
+                # the work is leased, so whatever this round held is picked up again
+                logger.exception("Send worker %s failed a round", worker_id)
+                # reconnect on the next round if the database went away
+                connection.close_if_unusable_or_obsolete()
+                claimed = 0
+            if claimed:
+                continue
+            if options["once"]:
+                break
+            time.sleep(options["sleep"])
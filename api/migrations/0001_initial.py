@@ -0,0 +1,27 @@
+# Generated by Django 5.0.3 on 2026-10-17 22:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProviderRateBucket',
+            fields=[
+                ('key', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('tokens', models.FloatField()),
+                ('updated_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Provider Rate Bucket',
+                'verbose_name_plural': 'Provider Rate Buckets',
+                'db_table': 'provider_rate_bucket',
+            },
+        ),
+    ]
@@ -1,3 +1,41 @@
 from django.db import models
+from django.contrib.auth import get_user_model
 
-# Create your models here.
+
+User = get_user_model()
+
+
+class ProviderRateBucket(models.Model):
+    # token bucket shared by every worker sending through a provider account
+    key = models.CharField(max_length=255, primary_key=True)
+    tokens = models.FloatField()
+    updated_at = models.DateTimeField()
+
+    def __str__(self):
+        return self.key
+
+    class Meta:
+        verbose_name = 'Provider Rate Bucket'
+        verbose_name_plural = 'Provider Rate Buckets'
+        db_table = 'provider_rate_bucket'
+
+
+class IdempotencyKey(models.Model):
+    # first response to a send request, replayed when the client retries with the same key
+    created_by = models.ForeignKey(User, on_delete=models.CASCADE, db_column='created_by')
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return self.key
+
+    class Meta:
+        verbose_name = 'Idempotency Key'
+        verbose_name_plural = 'Idempotency Keys'
+        db_table = 'idempotency_key'
+        constraints = [
+            models.UniqueConstraint(fields=['created_by', 'key'], name='idempotency_key_created_by_key_uniq'),
+        ]
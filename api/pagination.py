@@ -0,0 +1,174 @@
+import copy
+
+from django.core import signing
+from django.db.models import Q
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+PAGE_SIZE = 10
+MAX_PAGE_SIZE = 100
+CURSOR_SALT = "api.pagination.cursor"
+
+
+class PaginationError(Exception):
+    pass
+
+
+class KeysetPagination:
+    """
+    Cursor pagination over one whitelisted sort field with the primary key
+    as tie breaker. A page is a range scan starting after the last row of
+    the previous one, `WHERE (field, pk) > (value, pk) ORDER BY field, pk
+    LIMIT n`, so deep pages cost the same as the first and no COUNT(*) is
+    run. Every sort field is meant to be backed by a composite index on
+    (owner, field, id).
+
+    A sort field may also be an annotation of the queryset, e.g. a search
+    rank, read back from the row attribute of the same name.
+
+    Cursors are signed, so they are opaque to clients and can't be forged
+    to point anywhere else, and they carry the ordering they were made for.
+    """
+
+    cursor_query_param = "cursor"
+    ordering_query_param = "ordering"
+    page_size_query_param = "page_size"
+
+    def __init__(self, orderings, default_ordering: str, page_size: int = PAGE_SIZE, max_page_size: int = MAX_PAGE_SIZE):
+        self.orderings = tuple(orderings)
+        self.default_ordering = default_ordering
+        self.page_size = page_size
+        self.max_page_size = max_page_size
+        self.next_cursor = None
+        self.previous_cursor = None
+
+    def get_ordering(self, request):
+        ordering = request.query_params.get(self.ordering_query_param) or self.default_ordering
+        if ordering.lstrip("-") not in self.orderings:
+            allowed = ", ".join(f"{field}, -{field}" for field in self.orderings)
+            raise PaginationError(f"ordering must be one of: {allowed}")
+        return ordering
+
+    def get_page_size(self, request):
+        page_size = request.query_params.get(self.page_size_query_param)
+        if not page_size:
+            return self.page_size
+        try:
+            page_size = int(page_size)
+        except ValueError:
+            raise PaginationError("page_size must be a number")
+        if page_size < 1:
+            raise PaginationError("page_size must be at least 1")
+        return min(page_size, self.max_page_size)
+
+    def decode_cursor(self, request, ordering: str):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None
+        try:
+            payload = signing.loads(cursor, salt=CURSOR_SALT)
+        except signing.BadSignature:
+            raise PaginationError("Invalid cursor")
+        if payload.get("o") != ordering:
+            raise PaginationError("The cursor was made for another ordering")
+        return payload
+
+    def encode_cursor(self, row, backwards: bool):
+        payload = {
+            "o": self.ordering,
+            "v": self.field.value_to_string(row),
+            "k": self.pk_field.value_to_string(row),
+            "b": backwards,
+        }
+        return signing.dumps(payload, salt=CURSOR_SALT)
+
+    def get_field(self, queryset, name: str):
+        annotation = queryset.query.annotations.get(name)
+        if annotation is None:
+            return queryset.model._meta.get_field(name)
+        field = copy.copy(annotation.output_field)
+        field.set_attributes_from_name(name)
+        return field
+
+    def paginate_queryset(self, queryset, request):
+        """Return the rows of the requested page, a list of at most page_size instances."""
+        self.request = request
+        self.ordering = self.get_ordering(request)
+        page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request, self.ordering)
+
+        self.field = self.get_field(queryset, self.ordering.lstrip("-"))
+        self.pk_field = queryset.model._meta.pk
+        backwards = bool(cursor and cursor["b"])
+        # a previous page is read in the opposite order, then flipped
+        descending = self.ordering.startswith("-") != backwards
+
+        if cursor:
+            try:
+                value = self.field.to_python(cursor["v"])
+                pk = self.pk_field.to_python(cursor["k"])
+            except Exception:
+                raise PaginationError("Invalid cursor")
+            lookup = "lt" if descending else "gt"
+            queryset = queryset.filter(
+                Q(**{f"{self.field.name}__{lookup}": value})
+                | Q(**{self.field.name: value, f"pk__{lookup}": pk})
+            )
+
+        prefix = "-" if descending else ""
+        rows = list(queryset.order_by(prefix + self.field.name, prefix + "pk")[: page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if backwards:
+            rows.reverse()
+
+        has_next, has_previous = (True, has_more) if backwards else (has_more, cursor is not None)
+        self.next_cursor = self.encode_cursor(rows[-1], False) if rows and has_next else None
+        self.previous_cursor = self.encode_cursor(rows[0], True) if rows and has_previous else None
+        return rows
+
+    def get_link(self, cursor):
+        if cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_link(self.next_cursor),
+                "previous": self.get_link(self.previous_cursor),
+                "results": data,
+            }
+        )
+
+
+def pagination_parameters(orderings, default_ordering: str):
+    """The query parameters of a KeysetPagination list, for extend_schema."""
+    allowed = ", ".join(f"{field}, -{field}" for field in orderings)
+    return [
+        OpenApiParameter(
+            name="ordering",
+            description=f"Order response by field, one of: {allowed}. Defaults to {default_ordering}",
+            location=OpenApiParameter.QUERY,
+            required=False,
+            type=OpenApiTypes.STR,
+        ),
+        OpenApiParameter(
+            name="cursor",
+            description="Cursor from the next or previous link of a page",
+            location=OpenApiParameter.QUERY,
+            required=False,
+            type=OpenApiTypes.STR,
+        ),
+        OpenApiParameter(
+            name="page_size",
+            description=f"Number of results per page, {PAGE_SIZE} by default and at most {MAX_PAGE_SIZE}",
+            location=OpenApiParameter.QUERY,
+            required=False,
+            type=OpenApiTypes.INT,
+        ),
+    ]
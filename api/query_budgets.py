@@ -0,0 +1,100 @@
+"""
+SQL query budgets of the API routes in `api/urls.py`, checked by
+`tests/test_api/test_query_budgets.py` with data seeded at several sizes.
+
+Every route and method has an entry. A `constant` budget must run the same
+number of queries whatever the size of the data; the others, whose work
+is chunked by the number of recipients in the request, may grow but never
+past `max_queries`. Adding a route without a budget fails the suite.
+
+The figures are counted on the SQLite test database with 10k rows, where
+bulk inserts and updates are split into more statements than on
+PostgreSQL.
+"""
+
+
+class QueryBudget:
+    __slots__ = ("max_queries", "constant")
+
+    def __init__(self, max_queries: int, constant: bool = True):
+        self.max_queries = max_queries
+        self.constant = constant
+
+    def __repr__(self):
+        return f"QueryBudget({self.max_queries}, constant={self.constant})"
+
+
+# {route name: {HTTP method: budget}}
+QUERY_BUDGETS = {
+    "contacts-view": {
+        "GET": QueryBudget(1),
+        "POST": QueryBudget(4),
+    },
+    "contacts-export": {
+        "GET": QueryBudget(1),
+    },
+    "contacts-import": {
+        "POST": QueryBudget(1),
+    },
+    "contacts-import-detail": {
+        "GET": QueryBudget(1),
+    },
+    "contacts-detail": {
+        "GET": QueryBudget(1),
+        "PUT": QueryBudget(2),
+        "DELETE": QueryBudget(4),
+    },
+    "send-message": {
+        "POST": QueryBudget(13, constant=False),
+    },
+    "message-logs": {
+        "GET": QueryBudget(2),
+    },
+    "message-logs-export": {
+        "GET": QueryBudget(1),
+    },
+    "mmessage-log-detail": {
+        "GET": QueryBudget(2),
+    },
+    "resend-message": {
+        "POST": QueryBudget(87, constant=False),
+    },
+    "edit-resend-message": {
+        "POST": QueryBudget(84, constant=False),
+    },
+    "template-view": {
+        "GET": QueryBudget(1),
+        "POST": QueryBudget(4),
+    },
+    "template-detail": {
+        "GET": QueryBudget(1),
+        "PUT": QueryBudget(2),
+        "DELETE": QueryBudget(5),
+    },
+    "template-contacts": {
+        "GET": QueryBudget(2),
+        "POST": QueryBudget(66, constant=False),
+        "DELETE": QueryBudget(27, constant=False),
+    },
+    "send-template": {
+        "POST": QueryBudget(3),
+    },
+    "send-job-detail": {
+        "GET": QueryBudget(3),
+    },
+    "rate-limit": {
+        "GET": QueryBudget(1),
+    },
+    "delivery-reports": {
+        "POST": QueryBudget(51, constant=False),
+    },
+    "delivery-analytics": {
+        "GET": QueryBudget(2),
+    },
+    "dead-letters": {
+        "GET": QueryBudget(2),
+    },
+    "requeue-dead-letter": {
+        "POST": QueryBudget(11),
+    },
+}
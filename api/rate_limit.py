@@ -0,0 +1,105 @@
+import math
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ProviderRateBucket
+from .sms_backends import get_backend
+
+
+class RateLimited(Exception):
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__(f"Provider rate limit reached, retry after {retry_after:.1f}s")
+
+
+class TokenBucket:
+    """
+    Token bucket stored in one `ProviderRateBucket` row. Every process that
+    sends through the same provider account locks and refills the same row,
+    so the rate holds across workers and hosts.
+    """
+
+    def __init__(self, key: str, rate: float, capacity: int):
+        self.key = key
+        self.rate = rate
+        self.capacity = capacity
+
+    def refill(self, bucket, now):
+        elapsed = (now - bucket.updated_at).total_seconds()
+        return min(self.capacity, bucket.tokens + max(elapsed, 0) * self.rate)
+
+    def try_acquire(self, tokens: float):
+        """Take `tokens` if available. Returns 0, or the seconds until they will be."""
+        now = timezone.now()
+        with transaction.atomic():
+            bucket, _ = ProviderRateBucket.objects.select_for_update().get_or_create(
+                key=self.key, defaults={"tokens": self.capacity, "updated_at": now}
+            )
+            available = self.refill(bucket, now)
+            if available < tokens:
+                return (tokens - available) / self.rate
+            bucket.tokens = available - tokens
+            bucket.updated_at = now
+            bucket.save(update_fields=["tokens", "updated_at"])
+        return 0
+
+    def release(self, tokens: float):
+        """Give back `tokens` taken for messages that are not sent after all."""
+        now = timezone.now()
+        with transaction.atomic():
+            bucket = ProviderRateBucket.objects.select_for_update().filter(key=self.key).first()
+            if bucket is None:
+                return
+            bucket.tokens = min(self.capacity, self.refill(bucket, now) + tokens)
+            bucket.updated_at = now
+            bucket.save(update_fields=["tokens", "updated_at"])
+
+    def acquire(self, tokens: float, max_wait: float = math.inf):
+        """
+        Take `tokens`, sleeping while the bucket refills. Raises RateLimited
+        when that would take longer than `max_wait` seconds in total, after
+        giving back what was already taken. Requests larger than the bucket
+        are taken one bucketful at a time.
+        """
+        waited = taken = 0.0
+        while tokens > taken:
+            take = min(tokens - taken, self.capacity)
+            wait = self.try_acquire(take)
+            if wait == 0:
+                taken += take
+                continue
+            if waited + wait > max_wait:
+                if taken:
+                    self.release(taken)
+                raise RateLimited(retry_after=wait)
+            time.sleep(wait)
+            waited += wait
+
+    def fill_level(self):
+        bucket = ProviderRateBucket.objects.filter(key=self.key).first()
+        tokens = self.capacity if bucket is None else self.refill(bucket, timezone.now())
+        return {
+            "key": self.key,
+            "rate": self.rate,
+            "capacity": self.capacity,
+            "tokens": tokens,
+            "fill": tokens / self.capacity,
+        }
+
+
+def provider_bucket():
+    """The bucket of the provider account the configured SMS backend sends through."""
+    return TokenBucket(
+        key=get_backend().account_key,
+        rate=settings.SMS_RATE_LIMIT_PER_SECOND,
+        capacity=settings.SMS_RATE_LIMIT_BURST,
+    )
+
+
+def throttle(messages: int, max_wait: float = math.inf):
+    if settings.SMS_RATE_LIMIT_PER_SECOND <= 0:
+        return
+    provider_bucket().acquire(messages, max_wait=max_wait)
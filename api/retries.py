@@ -0,0 +1,152 @@
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from src.message_logs.models import RecipientLog, RetrySchedule, DeadLetter
+from .dispatch import dispatch, FAILED_STATUS
+from .counters import update_counters
+from .analytics import update_rollups
+
+
+def is_retryable(status: str):
+    return status in settings.SMS_RETRYABLE_STATUSES
+
+
+def backoff(attempts: int):
+    """
+    Delay before the next attempt: exponential in the attempts made so far,
+    capped at SMS_RETRY_MAX_DELAY, with half of it randomized so failed
+    batches do not come back in lockstep.
+    """
+    delay = min(
+        settings.SMS_RETRY_MAX_DELAY,
+        settings.SMS_RETRY_BASE_DELAY * 2 ** max(attempts - 1, 0),
+    )
+    return timedelta(seconds=delay / 2 + random.uniform(0, delay / 2))
+
+
+def schedule_retries(recipient_logs: list):
+    """
+    Schedule the next attempt of failed recipient logs, or move them to the
+    dead-letter store once SMS_RETRY_MAX_ATTEMPTS attempts were made. The
+    recipient logs must have their message log loaded.
+    """
+    now = timezone.now()
+    retry, dead = [], []
+    for recipient_log in recipient_logs:
+        if recipient_log.attempts >= settings.SMS_RETRY_MAX_ATTEMPTS:
+            dead.append(recipient_log)
+        else:
+            retry.append(recipient_log)
+
+    RetrySchedule.objects.bulk_create(
+        [
+            RetrySchedule(
+                recipient_log_id=recipient_log,
+                next_attempt_at=now + backoff(recipient_log.attempts),
+            )
+            for recipient_log in retry
+        ],
+        ignore_conflicts=True,
+    )
+    DeadLetter.objects.bulk_create(
+        [
+            DeadLetter(
+                recipient_log_id=recipient_log,
+                author_id_id=recipient_log.message_id.author_id_id,
+                phone=recipient_log.phone,
+                content=recipient_log.message_id.content,
+                attempts=recipient_log.attempts,
+                last_status=recipient_log.status,
+            )
+            for recipient_log in dead
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def claim_due_retries(limit: int):
+    """
+    Lease up to `limit` due retries by pushing their next attempt past the
+    send job lease, so concurrent workers skip them.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            RetrySchedule.objects.select_for_update(skip_locked=True)
+            .filter(next_attempt_at__lte=now)
+            .order_by("next_attempt_at")
+            .values_list("id", flat=True)[:limit]
+        )
+        RetrySchedule.objects.filter(id__in=ids).update(
+            next_attempt_at=now + timedelta(seconds=settings.SEND_JOB_LEASE_SECONDS)
+        )
+    return ids
+
+
+def run_due_retries(limit: int = None):
+    """
+    Send one batch of due retries. Recipients of the same message share
+    provider calls; each recipient log is updated in place with the new
+    outcome. Returns the number of retries processed.
+    """
+    ids = claim_due_retries(limit or settings.SMS_RETRY_BATCH_SIZE)
+    if not ids:
+        return 0
+
+    groups = {}
+    entries = RetrySchedule.objects.filter(id__in=ids).select_related(
+        "recipient_log_id__message_id__job_id"
+    )
+    for entry in entries:
+        recipient_log = entry.recipient_log_id
+        groups.setdefault(recipient_log.message_id.content, []).append(recipient_log)
+
+    chunk_size = settings.SEND_JOB_CHUNK_SIZE
+    chunks = [
+        (message, recipient_logs[i : i + chunk_size])
+        for message, recipient_logs in groups.items()
+        for i in range(0, len(recipient_logs), chunk_size)
+    ]
+    results = dispatch(
+        [(message, [r.phone for r in recipient_logs]) for message, recipient_logs in chunks]
+    )
+
+    now = timezone.now()
+    retried, changes = [], []
+    for (_, recipient_logs), result in zip(chunks, results):
+        by_number = {r.get("number"): r for r in result}
+        for recipient_log in recipient_logs:
+            recipient_data = by_number.get(recipient_log.phone, {"status": FAILED_STATUS})
+            changes.append(
+                (recipient_log.message_id, recipient_log.status, recipient_data.get("status"))
+            )
+            recipient_log.status = recipient_data.get("status")
+            recipient_log.provider_message_id = recipient_data.get("messageId")
+            recipient_log.attempts += 1
+            recipient_log.status_updated_at = now
+            retried.append(recipient_log)
+
+    with transaction.atomic():
+        RecipientLog.objects.bulk_update(
+            retried, ["status", "provider_message_id", "attempts", "status_updated_at"]
+        )
+        RetrySchedule.objects.filter(id__in=ids).delete()
+        update_counters(changes)
+        update_rollups(changes)
+        schedule_retries([r for r in retried if is_retryable(r.status)])
+    return len(ids)
+
+
+def requeue_dead_letter(dead_letter):
+    """Give a dead-lettered recipient a fresh set of attempts, starting now."""
+    with transaction.atomic():
+        RecipientLog.objects.filter(pk=dead_letter.recipient_log_id_id).update(attempts=0)
+        RetrySchedule.objects.update_or_create(
+            recipient_log_id_id=dead_letter.recipient_log_id_id,
+            defaults={"next_attempt_at": timezone.now()},
+        )
+        dead_letter.delete()
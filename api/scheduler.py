@@ -0,0 +1,99 @@
+import heapq
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from src.send_jobs.models import SendJob
+
+
+# arbitrary key of the advisory lock held by the active scheduler
+SCHEDULER_LOCK_ID = 7_310_001
+
+
+def try_acquire_leadership():
+    """
+    Take the scheduler advisory lock on this process' database connection.
+    The lock is held for the lifetime of the session, so a crashed leader
+    releases it when its connection drops. Databases without advisory locks
+    (SQLite in development) always grant leadership.
+    """
+    if connection.vendor != "postgresql":
+        return True
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_try_advisory_lock(%s)", [SCHEDULER_LOCK_ID])
+        return cursor.fetchone()[0]
+
+
+def release_leadership():
+    if connection.vendor != "postgresql":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_unlock(%s)", [SCHEDULER_LOCK_ID])
+
+
+class JobScheduler:
+    """
+    Releases scheduled send jobs to the workers when their `send_at` is due.
+
+    Jobs due within SEND_SCHEDULER_LOOKAHEAD seconds are kept in a min-heap
+    of (send_at, id). The table is only read on refresh, an indexed range scan
+    on (status, send_at) bounded by the lookahead, and in between the
+    scheduler sleeps until the earliest deadline. A job scheduled after the
+    last refresh is picked up by the next one, at most
+    SEND_SCHEDULER_REFRESH seconds later.
+    """
+
+    def __init__(self, lookahead: float = None, refresh: float = None):
+        self.lookahead = timedelta(
+            seconds=settings.SEND_SCHEDULER_LOOKAHEAD if lookahead is None else lookahead
+        )
+        self.refresh_interval = (
+            settings.SEND_SCHEDULER_REFRESH if refresh is None else refresh
+        )
+        self.heap = []
+        self.queued = set()
+        self.next_refresh = 0.0
+
+    def refresh(self):
+        """Load scheduled jobs due within the lookahead that are not queued yet."""
+        horizon = timezone.now() + self.lookahead
+        jobs = (
+            SendJob.objects.filter(status=SendJob.SCHEDULED, send_at__lte=horizon)
+            .exclude(pk__in=self.queued)
+            .values_list("send_at", "id")
+        )
+        for send_at, job_id in jobs:
+            heapq.heappush(self.heap, (send_at, job_id))
+            self.queued.add(job_id)
+        self.next_refresh = time.monotonic() + self.refresh_interval
+
+    def release_due(self):
+        """Hand every due job to the workers. Returns the number released."""
+        now = timezone.now()
+        due = []
+        while self.heap and self.heap[0][0] <= now:
+            _, job_id = heapq.heappop(self.heap)
+            self.queued.discard(job_id)
+            due.append(job_id)
+        if not due:
+            return 0
+        # jobs cancelled or moved to a later send_at since they were loaded
+        # don't match, the later ones come back with the next refresh
+        return SendJob.objects.filter(
+            pk__in=due, status=SendJob.SCHEDULED, send_at__lte=now
+        ).update(status=SendJob.PENDING, updated_at=now)
+
+    def seconds_until_next(self):
+        until_refresh = max(self.next_refresh - time.monotonic(), 0)
+        if not self.heap:
+            return until_refresh
+        until_due = (self.heap[0][0] - timezone.now()).total_seconds()
+        return max(min(until_due, until_refresh), 0)
+
+    def run_once(self):
+        if time.monotonic() >= self.next_refresh:
+            self.refresh()
+        return self.release_due()
@@ -0,0 +1,80 @@
+from django.contrib.postgres.lookups import TrigramWordSimilar
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramWordSimilarity
+from django.db import connections
+from django.db.models import FloatField, Q
+from django.db.models.functions import Cast, Greatest, Upper
+
+from src.contacts.utils import normalize_phone_prefix
+
+
+# text search configuration of the message_log_content_search_idx index
+SEARCH_CONFIG = "english"
+
+
+def content_vector():
+    """The tsvector of a message log's content, the expression the GIN index is built on."""
+    return SearchVector("content", config=SEARCH_CONFIG)
+
+
+def supports_full_text(queryset):
+    return connections[queryset.db].vendor == "postgresql"
+
+
+def search_message_logs(queryset, q: str):
+    """
+    Message logs of `queryset` whose content matches the search `q`.
+
+    On PostgreSQL `q` is a web search query ("promo -test", "black friday")
+    matched through the GIN index on the content's tsvector, and the rows
+    are annotated with their `rank`. Other databases have no text index, so
+    every word of `q` is matched as a case-insensitive substring and the
+    rows are not ranked. Returns the queryset and whether it is ranked.
+    """
+    if supports_full_text(queryset):
+        query = SearchQuery(q, config=SEARCH_CONFIG, search_type="websearch")
+        matches = queryset.alias(search=content_vector()).filter(search=query)
+        # double precision, so a rank read back from a cursor compares equal
+        return matches.annotate(rank=Cast(SearchRank(content_vector(), query), FloatField())), True
+
+    for word in q.split():
+        queryset = queryset.filter(content__icontains=word)
+    return queryset, False
+
+
+def search_contacts(queryset, search: str):
+    """
+    Contacts of `queryset` matching the type-ahead `search`: a name or email
+    starting with it, or a phone number starting with the number typed.
+
+    On PostgreSQL names and emails also match fuzzily, when `search` is
+    close to one of their words ("jon" finds "John Doe"), through the
+    trigram GIN index of contact_search_idx, and the rows are annotated with
+    their `rank`. Other databases match the start of any word of the name
+    instead. Returns the queryset and whether it is ranked.
+    """
+    phone_prefix = normalize_phone_prefix(search)
+    matches = Q(phone_e164__startswith=phone_prefix) if phone_prefix else Q()
+    # a number matches on the phone alone, so it is not ranked
+    if phone_prefix and not any(char.isalpha() for char in search):
+        return queryset.filter(matches), False
+
+    if supports_full_text(queryset):
+        # the expressions contact_search_idx is built on
+        term = search.upper()
+        name, email = Upper("full_name"), Upper("email")
+        matches |= (
+            Q(search_name__startswith=term)
+            | Q(search_email__startswith=term)
+            | Q(TrigramWordSimilar(name, term))
+            | Q(TrigramWordSimilar(email, term))
+        )
+        rank = Greatest(TrigramWordSimilarity(term, name), TrigramWordSimilarity(term, email))
+        queryset = queryset.alias(search_name=name, search_email=email).filter(matches)
+        return queryset.annotate(rank=Cast(rank, FloatField())), True
+
+    matches |= (
+        Q(full_name__istartswith=search)
+        | Q(full_name__icontains=" " + search)
+        | Q(email__istartswith=search)
+    )
+    return queryset.filter(matches), False
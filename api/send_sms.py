@@ -1,18 +1,20 @@
-import africastalking
-from decouple import config
-from rest_framework.response import Response
-from rest_framework import status
+from django.conf import settings
 
-africastalking.initialize(
-    username=config('AFRICASTALKING_USERNAME'),
-    api_key=config('AFRICASTALKING_API_KEY')
-)
+from .rate_limit import throttle
+from .sms_backends import get_backend, SMSBackendError
 
 
-sms = africastalking.SMS
-def send_sms(message: str, to: list, sender: str=None):
-    try:
-        return sms.send(message, to, sender)
-    except Exception as e:
-        return Response(status=status.HTTP_400_BAD_REQUEST, data={'error': str(e)})
+def send_sms(message: str, to: list, sender: str=None, max_wait: float=None):
+    """
+    Send `message` to every number in `to` through the configured
+    SMS_BACKEND and return one result per recipient. Raises SMSBackendError
+    when the provider rejects the request.
 
+    Every send first takes one token per recipient from the shared provider
+    rate limiter, waiting at most `max_wait` seconds (SMS_RATE_LIMIT_MAX_WAIT
+    by default) before raising RateLimited.
+    """
+    if max_wait is None:
+        max_wait = settings.SMS_RATE_LIMIT_MAX_WAIT
+    throttle(len(to), max_wait=max_wait)
+    return get_backend().send_batch(message, to, sender)
@@ -1,12 +1,20 @@
 from src.accounts.models import UserAccount
-from src.contacts.models import Contact
-from src.message_logs.models import MessageLog, RecipientLog
+from src.contacts.models import Contact, ContactImport
+from src.message_logs.models import MessageLog, RecipientLog, DeadLetter
 from src.msg_templates.models import Template
+from src.send_jobs.models import SendJob
+from src.contacts.utils import normalize_phone
 from rest_framework import serializers
 from django.contrib.auth.hashers import make_password
 
 
 
+def validate_phone_number(value):
+    if normalize_phone(value) is None:
+        raise serializers.ValidationError("Enter a valid phone number, starting with its country code: +233xxxxxxxxx")
+    return value.strip()
+
+
 class UserAccountSerializer(serializers.ModelSerializer):
     class Meta:
         model = UserAccount
@@ -18,6 +26,9 @@ class ContactSerializer(serializers.ModelSerializer):
         model = Contact
         fields = ['full_name', 'email', 'phone', 'info']
 
+    def validate_phone(self, value):
+        return validate_phone_number(value)
+
 
 class ContactCreateSerializer(serializers.ModelSerializer):
     full_name = serializers.CharField(required=True)
@@ -30,6 +41,9 @@ class ContactCreateSerializer(serializers.ModelSerializer):
         model = Contact
         fields = ['full_name', 'email', 'phone', 'info', 'created_by']
 
+    def validate_phone(self, value):
+        return validate_phone_number(value)
+
 
 class ContactUpdateSerializer(serializers.ModelSerializer):
     full_name = serializers.CharField(required=False)
@@ -41,6 +55,19 @@ class ContactUpdateSerializer(serializers.ModelSerializer):
         model = Contact
         fields = ['full_name', 'email', 'phone', 'info']
 
+    def validate_phone(self, value):
+        return validate_phone_number(value)
+
+
+class ContactImportUploadSerializer(serializers.Serializer):
+    file = serializers.FileField(required=True)
+
+
+class ContactImportSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ContactImport
+        fields = ['id', 'file_format', 'status', 'processed_rows', 'created_count', 'updated_count', 'error_count', 'errors', 'error', 'created_at', 'started_at', 'finished_at']
+
 
 # MEssage log serializer and its related serializers
 class ContactDetailSerializer(serializers.ModelSerializer):
@@ -62,8 +89,7 @@ class MessageLogDetailSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = MessageLog
-        fields = ['id', 'content', 'sent_at', 'recipients']
-        depth = 1
+        fields = ['id', 'content', 'sent_at', 'total_count', 'success_count', 'failed_count', 'pending_count', 'recipients']
 
     def to_representation(self, instance):
         data = super().to_representation(instance)
@@ -71,23 +97,10 @@ class MessageLogDetailSerializer(serializers.ModelSerializer):
 
 
 
-class RecipientLogSerializer(serializers.ModelSerializer):
-    contact = serializers.SerializerMethodField()
-    
-    class Meta:
-        model = RecipientLog
-        fields = ['contact', 'status']
-    
-    def get_contact(self, obj):
-        return str(obj.contact_id)
-
-
 class MessageLogSerializer(serializers.ModelSerializer):
-    recipients = RecipientLogSerializer(source='recipientlog_set', many=True, read_only=True)
-    
     class Meta:
         model = MessageLog
-        fields = ['id', 'content', 'sent_at', 'recipients']
+        fields = ['id', 'content', 'sent_at', 'total_count', 'success_count', 'failed_count', 'pending_count']
         
     def to_representation(self, instance):
         data = super().to_representation(instance)
@@ -108,6 +121,21 @@ class ResentLogMessageSerializer(serializers.ModelSerializer):
         fields = ['content', 'sent_at']
             
 
+# Send job serializer, reports progress and per-recipient outcomes
+class SendJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SendJob
+        fields = ['id', 'kind', 'status', 'total', 'processed', 'error', 'send_at', 'rate_per_minute', 'created_at', 'started_at', 'finished_at']
+
+
+class DeadLetterSerializer(serializers.ModelSerializer):
+    message_id = serializers.IntegerField(source='recipient_log_id.message_id_id', read_only=True)
+
+    class Meta:
+        model = DeadLetter
+        fields = ['id', 'message_id', 'phone', 'content', 'attempts', 'last_status', 'created_at']
+
+
 # Template serializer and its related serializers  
 class TemplateSerializer(serializers.ModelSerializer):
     class Meta:
@@ -136,11 +164,33 @@ class ResendEditedMessageLogSerializer(serializers.Serializer):
     content = serializers.CharField(required=True)
     
     
-class SendMessageSerializer(serializers.Serializer):
+class SendOptionsSerializer(serializers.Serializer):
+    send_at = serializers.DateTimeField(required=False, allow_null=True)
+    rate_per_minute = serializers.IntegerField(required=False, allow_null=True, min_value=1)
+    transliterate = serializers.BooleanField(required=False, default=False)
+    dry_run = serializers.BooleanField(required=False, default=False)
+
+
+class SendMessageSerializer(SendOptionsSerializer):
     message = serializers.CharField(required=True)
     contacts = serializers.ListField(required=True)
     
 
+class RateLimitSerializer(serializers.Serializer):
+    key = serializers.CharField()
+    rate = serializers.FloatField()
+    capacity = serializers.IntegerField()
+    tokens = serializers.FloatField()
+    fill = serializers.FloatField()
+    
+
+class DeliveryReportSerializer(serializers.Serializer):
+    id = serializers.CharField(max_length=100)
+    status = serializers.CharField(max_length=100)
+    phoneNumber = serializers.CharField(required=False)
+    failureReason = serializers.CharField(required=False, allow_blank=True)
+    
+
 class ContactBodySerializer(serializers.Serializer):
     contacts = serializers.ListField(required=True)
     
@@ -0,0 +1,32 @@
+import threading
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from .base import BaseSMSBackend, SMSBackendError
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """
+    Return the process-wide instance of `settings.SMS_BACKEND`. Backends are
+    built on first use so that nothing talks to a provider at import time.
+    """
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = import_string(settings.SMS_BACKEND)()
+    return _backend
+
+
+@receiver(setting_changed)
+def reset_backend(*, setting, **kwargs):
+    global _backend
+    if setting.startswith(("SMS_", "AFRICASTALKING_")):
+        _backend = None
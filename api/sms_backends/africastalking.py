@@ -0,0 +1,87 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from .base import BaseSMSBackend, SMSBackendError
+
+
+PRODUCTION_URL = "https://api.africastalking.com/version1/messaging"
+SANDBOX_URL = "https://api.sandbox.africastalking.com/version1/messaging"
+
+
+class SMSBackend(BaseSMSBackend):
+    """
+    Africa's Talking backend. Requests go through one keep-alive session per
+    process, so consecutive sends reuse pooled TLS connections instead of
+    opening a new one per call. Credentials are read on first send.
+    """
+
+    def __init__(self):
+        self._session = None
+        self._lock = threading.Lock()
+
+    @property
+    def username(self):
+        return settings.AFRICASTALKING_USERNAME
+
+    @property
+    def account_key(self):
+        return f"africastalking:{self.username}"
+
+    @property
+    def url(self):
+        return SANDBOX_URL if self.username == "sandbox" else PRODUCTION_URL
+
+    @property
+    def session(self):
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = self.build_session()
+        return self._session
+
+    def build_session(self):
+        if not settings.AFRICASTALKING_USERNAME or not settings.AFRICASTALKING_API_KEY:
+            raise ImproperlyConfigured(
+                "AFRICASTALKING_USERNAME and AFRICASTALKING_API_KEY must be set"
+            )
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=settings.SMS_HTTP_POOL_SIZE
+        )
+        session.mount("https://", adapter)
+        session.headers.update(
+            {
+                "Accept": "application/json",
+                "ApiKey": settings.AFRICASTALKING_API_KEY,
+            }
+        )
+        return session
+
+    def send_batch(self, message: str, numbers: list, sender: str = None):
+        data = {
+            "username": self.username,
+            "to": ",".join(numbers),
+            "message": message,
+            "bulkSMSMode": 1,
+        }
+        if sender:
+            data["from"] = sender
+
+        try:
+            response = self.session.post(
+                self.url, data=data, timeout=settings.SMS_HTTP_TIMEOUT
+            )
+        except requests.RequestException as e:
+            raise SMSBackendError(str(e)) from e
+        if not 200 <= response.status_code < 300:
+            raise SMSBackendError(response.text)
+
+        try:
+            payload = response.json()
+        except ValueError as e:
+            raise SMSBackendError(response.text) from e
+        return payload.get("SMSMessageData", {}).get("Recipients", [])
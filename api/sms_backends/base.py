@@ -0,0 +1,21 @@
+class SMSBackendError(Exception):
+    pass
+
+
+class BaseSMSBackend:
+    """
+    Interface every SMS backend implements.
+
+    `send_batch` sends one message to a list of numbers and returns one
+    result per number, shaped like the provider recipients:
+    ``{"number": ..., "status": ..., "messageId": ..., "cost": ...}``.
+    Provider or transport failures raise `SMSBackendError`.
+    """
+
+    def send_batch(self, message: str, numbers: list, sender: str = None):
+        raise NotImplementedError("SMS backends must implement send_batch()")
+
+    @property
+    def account_key(self):
+        # identifies the provider account the backend sends through
+        return self.__class__.__module__
@@ -0,0 +1,198 @@
+import math
+import unicodedata
+from collections import Counter
+from itertools import islice
+
+from django.conf import settings
+
+from src.contacts.models import Contact
+from .templating import get_compiled_template
+
+
+GSM7 = "GSM-7"
+UCS2 = "UCS-2"
+
+# GSM 03.38 default alphabet, one septet each
+GSM7_BASIC = frozenset(
+    "@£$¥èéùìòÇ\nØø\rÅåΔ_ΦΓΛΩΠΨΣΘΞÆæßÉ !\"#¤%&'()*+,-./0123456789:;<=>?"
+    "¡ABCDEFGHIJKLMNOPQRSTUVWXYZÄÖÑÜ§¿abcdefghijklmnopqrstuvwxyzäöñüà"
+)
+# extension table, sent as an escape septet plus the character
+GSM7_EXTENDED = frozenset("^{}\\[~]|€\f")
+GSM7_CHARACTERS = GSM7_BASIC | GSM7_EXTENDED
+
+# (single message, per segment of a concatenated message)
+SEGMENT_LIMITS = {
+    GSM7: (160, 153),
+    UCS2: (70, 67),
+}
+
+TRANSLITERATIONS = str.maketrans(
+    {
+        "‘": "'",
+        "’": "'",
+        "‚": "'",
+        "‛": "'",
+        "′": "'",
+        "´": "'",
+        "`": "'",
+        "“": '"',
+        "”": '"',
+        "„": '"',
+        "‟": '"',
+        "″": '"',
+        "«": '"',
+        "»": '"',
+        "–": "-",
+        "—": "-",
+        "―": "-",
+        "−": "-",
+        "‐": "-",
+        "‑": "-",
+        "…": "...",
+        "\u00a0": " ",  # no-break space
+        "\u2002": " ",
+        "\u2003": " ",
+        "\u2009": " ",
+        "\u200b": "",  # zero width space
+        "\ufeff": "",
+        "\t": " ",
+        "•": "-",
+        "·": ".",
+        "×": "x",
+        "÷": "/",
+        "¢": "c",
+        "®": "(R)",
+        "©": "(C)",
+        "™": "TM",
+        "º": "o",
+        "ª": "a",
+        "ç": "Ç",
+    }
+)
+
+
+class SegmentInfo:
+    __slots__ = ("encoding", "length", "segments", "non_gsm_characters")
+
+    def __init__(self, encoding, length, segments, non_gsm_characters):
+        self.encoding = encoding
+        self.length = length
+        self.segments = segments
+        self.non_gsm_characters = non_gsm_characters
+
+    def as_dict(self):
+        return {
+            "encoding": self.encoding,
+            "length": self.length,
+            "segments": self.segments,
+            "non_gsm_characters": self.non_gsm_characters,
+        }
+
+
+def count_segments(length: int, encoding: str):
+    single, multipart = SEGMENT_LIMITS[encoding]
+    if length <= single:
+        return 1
+    return math.ceil(length / multipart)
+
+
+def analyze(message: str):
+    """
+    Work out how `message` is encoded on the wire and how many segments it
+    takes. `length` is in septets for GSM-7 (extension characters count
+    twice) and in UTF-16 code units for UCS-2. The characters forcing UCS-2
+    are listed in `non_gsm_characters`.
+    """
+    characters = set(message)
+    non_gsm = characters - GSM7_CHARACTERS
+    if not non_gsm:
+        length = len(message) + sum(
+            message.count(character) for character in characters & GSM7_EXTENDED
+        )
+        return SegmentInfo(GSM7, length, count_segments(length, GSM7), [])
+
+    # characters outside the BMP are sent as surrogate pairs
+    length = len(message) + sum(
+        message.count(character) for character in non_gsm if ord(character) > 0xFFFF
+    )
+    return SegmentInfo(UCS2, length, count_segments(length, UCS2), sorted(non_gsm))
+
+
+def transliterate(message: str):
+    """
+    Rewrite common non-GSM characters (typographic quotes and dashes, odd
+    spaces, accented letters) to GSM-7 equivalents. Characters with no
+    equivalent, such as emoji or non-Latin scripts, are left alone.
+    """
+    message = message.translate(TRANSLITERATIONS)
+    non_gsm = set(message) - GSM7_CHARACTERS
+    if not non_gsm:
+        return message
+
+    replacements = {}
+    for character in non_gsm:
+        stripped = "".join(
+            c for c in unicodedata.normalize("NFKD", character) if not unicodedata.combining(c)
+        )
+        if stripped and set(stripped) <= GSM7_CHARACTERS:
+            replacements[character] = stripped
+    return message.translate(str.maketrans(replacements)) if replacements else message
+
+
+def estimate_cost(segments: int):
+    return round(segments * settings.SMS_SEGMENT_COST, 4)
+
+
+def estimate_message(message: str, recipients: int):
+    info = analyze(message)
+    segments = info.segments * recipients
+    return {
+        **info.as_dict(),
+        "messages": recipients,
+        "total_segments": segments,
+        "estimated_cost": estimate_cost(segments),
+    }
+
+
+def estimate_template(template, apply_transliteration: bool = False, chunk_size: int = 2000):
+    """
+    Render `template` for every contact linked to it, without sending, and
+    total the segments. Identical renders are analyzed once.
+    """
+    compiled = get_compiled_template(template)
+    rows = (
+        Contact.objects.filter(contacttemplate__template_id=template)
+        .values("id", *compiled.fields)
+        .iterator(chunk_size=chunk_size)
+    )
+
+    renders = Counter()
+    while True:
+        batch = list(islice(rows, chunk_size))
+        if not batch:
+            break
+        renders.update(compiled.render_many(batch))
+
+    messages = segments = 0
+    encodings = Counter()
+    non_gsm = set()
+    max_segments = 0
+    for message, count in renders.items():
+        if apply_transliteration:
+            message = transliterate(message)
+        info = analyze(message)
+        messages += count
+        segments += info.segments * count
+        encodings[info.encoding] += count
+        non_gsm.update(info.non_gsm_characters)
+        max_segments = max(max_segments, info.segments)
+
+    return {
+        "messages": messages,
+        "total_segments": segments,
+        "max_segments": max_segments,
+        "encodings": dict(encodings),
+        "non_gsm_characters": sorted(non_gsm),
+        "estimated_cost": estimate_cost(segments),
+    }
@@ -0,0 +1,103 @@
+import re
+from itertools import starmap
+from operator import itemgetter
+
+from src.contacts.models import Contact
+
+
+PLACEHOLDER_PATTERN = re.compile(r"<(\w+)>")
+COMPILED_CACHE_SIZE = 512
+
+# every concrete Contact field can be used as a <placeholder>
+CONTACT_FIELDS = frozenset(field.name for field in Contact._meta.concrete_fields)
+NULLABLE_FIELDS = frozenset(field.name for field in Contact._meta.concrete_fields if field.null)
+
+
+class CompiledTemplate:
+    """
+    A template parsed once into literal text and placeholder slots.
+
+    Rendering is a single str.format call over the slot values of a row, the
+    way the rows come out of `Contact.objects.values(*compiled.fields)`.
+    Unknown placeholders are kept as literal text and NULL values render as
+    an empty string.
+    """
+
+    __slots__ = ("tokens", "fields", "_format", "_getter")
+
+    def __init__(self, content: str):
+        tokens, slots = [], []
+        position = 0
+        for match in PLACEHOLDER_PATTERN.finditer(content):
+            field = match.group(1)
+            if field not in CONTACT_FIELDS:
+                continue
+            if match.start() > position:
+                tokens.append((False, content[position : match.start()]))
+            tokens.append((True, field))
+            slots.append(field)
+            position = match.end()
+        if position < len(content):
+            tokens.append((False, content[position:]))
+
+        self.tokens = tuple(tokens)
+        self.fields = tuple(dict.fromkeys(slots))
+        self._format = "".join(
+            "{%d}" % self.fields.index(value)
+            if is_field
+            else value.replace("{", "{{").replace("}", "}}")
+            for is_field, value in self.tokens
+        )
+        self._getter = build_row_getter(self.fields) if self.fields else None
+
+    def render(self, row: dict):
+        if self._getter is None:
+            return self._format.format()
+        return self._format.format(*self._getter(row))
+
+    def render_many(self, rows):
+        if self._getter is None:
+            message = self._format.format()
+            return [message for _ in rows]
+        return list(starmap(self._format.format, map(self._getter, rows)))
+
+
+def build_row_getter(fields):
+    """
+    Build a function returning the values of the given slots of a row as a
+    tuple, `operator.itemgetter` over the row. NULL values render as an
+    empty string; only getters reading a nullable column pay for the check.
+    """
+    for field in fields:
+        if field not in CONTACT_FIELDS:
+            raise ValueError(f"Unknown contact field: {field}")
+    getter = itemgetter(*fields)
+    if len(fields) == 1:
+        # itemgetter of a single item returns the value, not a tuple
+        single = getter
+        getter = lambda row: (single(row),)
+    if NULLABLE_FIELDS.isdisjoint(fields):
+        return getter
+    return lambda row: tuple("" if value is None else value for value in getter(row))
+
+
+_compiled_templates = {}
+
+
+def compile_template(content: str):
+    return CompiledTemplate(content)
+
+
+def get_compiled_template(template):
+    """
+    Return the compiled form of a `Template`, cached by its id and
+    `updated_at` so an edit to the template invalidates the entry.
+    """
+    key = (template.pk, template.updated_at)
+    compiled = _compiled_templates.get(key)
+    if compiled is None:
+        if len(_compiled_templates) >= COMPILED_CACHE_SIZE:
+            _compiled_templates.clear()
+        compiled = compile_template(template.content)
+        _compiled_templates[key] = compiled
+    return compiled
@@ -3,9 +3,14 @@ from . import views
 
 urlpatterns = [
     path('contacts', views.ContactView.as_view(), name='contacts-view'),
+    # outside contacts/, where they would shadow the contacts named "export" or "import"
+    path('contacts-export', views.ContactExportView.as_view(), name='contacts-export'),
+    path('contact-imports', views.ContactImportView.as_view(), name='contacts-import'),
+    path('contact-imports/<uuid:importId>', views.ContactImportDetailView.as_view(), name='contacts-import-detail'),
     path('contacts/<str:contactFullName>', views.ContactDetailView.as_view(), name='contacts-detail'),
     path('send-message', views.SendMessageView.as_view(), name='send-message'),
     path('message-logs', views.MessageLogView.as_view(), name='message-logs'),
+    path('message-logs/export', views.MessageLogExportView.as_view(), name='message-logs-export'),
     path('message-logs/<int:messageId>', views.MessageLogDetailVIew.as_view(), name='mmessage-log-detail'),
     path('message-logs/<int:messageId>/resend', views.ResendLogMessage.as_view(), name='resend-message'),
     path('message-logs/<int:messageId>/edit-resend', views.EditResendLogMessage.as_view(), name='edit-resend-message'),
@@ -13,5 +18,11 @@ urlpatterns = [
     path('templates/<str:templateName>', views.TemplateDetailView.as_view(), name='template-detail'),
     path('templates/<str:templateName>/contacts', views.TemplateContactView.as_view(), name='template-contacts'),
     path('templates/<str:templateName>/send', views.SendTemplateMessage.as_view(), name='send-template'),
+    path('send-jobs/<uuid:jobId>', views.SendJobDetailView.as_view(), name='send-job-detail'),
+    path('rate-limit', views.RateLimitView.as_view(), name='rate-limit'),
+    path('delivery-reports', views.DeliveryReportView.as_view(), name='delivery-reports'),
+    path('analytics/deliveries', views.DeliveryAnalyticsView.as_view(), name='delivery-analytics'),
+    path('dead-letters', views.DeadLetterView.as_view(), name='dead-letters'),
+    path('dead-letters/<int:deadLetterId>/requeue', views.RequeueDeadLetterView.as_view(), name='requeue-dead-letter'),
     
 ]
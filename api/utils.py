@@ -1,8 +1,11 @@
 from src.message_logs.models import MessageLog, RecipientLog
 from src.contacts.models import Contact
-from .send_sms import send_sms
-from rest_framework.response import Response
-from rest_framework import status
+from src.msg_templates.models import ContactTemplate
+from src.contacts.utils import phone_lookup, phone_lookup_key, phone_lookup_value
+from django.db import transaction
+from .retries import schedule_retries, is_retryable
+from .counters import update_counters
+from .analytics import update_rollups
 
 
 def clean_contacts(contacts):
@@ -24,45 +27,160 @@ def clean_contacts(contacts):
     return contact_lists
 
 
+RECIPIENT_LOOKUP_CHUNK_SIZE = 900
+
+
+def lookup_contact_ids(phone_numbers: list, user):
+    """
+    Map phone_lookup_key() numbers to the ids of the user's contacts, with
+    one query per RECIPIENT_LOOKUP_CHUNK_SIZE numbers.
+    """
+    contact_ids = {}
+    for i in range(0, len(phone_numbers), RECIPIENT_LOOKUP_CHUNK_SIZE):
+        contact_ids.update(
+            Contact.objects.filter(
+                phone_lookup(phone_numbers[i : i + RECIPIENT_LOOKUP_CHUNK_SIZE]),
+                created_by=user,
+            ).values_list(phone_lookup_value(), "id")
+        )
+    return contact_ids
+
+
+def resolve_recipients(recipients: list, user):
+    """
+    Resolve the numbers of `recipients` to the user's contacts. Returns the
+    numbers of the contacts found, normalized unless the contact's number
+    could not be, in request order and without repeats, and the recipients
+    that matched no contact.
+    """
+    normalized = {recipient: phone_lookup_key(recipient) for recipient in recipients}
+    wanted = list(dict.fromkeys(n for n in normalized.values() if n is not None))
+    known = lookup_contact_ids(wanted, user)
+
+    phone_numbers = [n for n in wanted if n in known]
+    unknown = [r for r, n in normalized.items() if n not in known]
+    return phone_numbers, unknown
+
+
+def add_contacts_to_template(recipients: list, template, user):
+    """
+    Associate the contacts with the numbers in `recipients` to `template`
+    with a constant number of queries per chunk: one to resolve the numbers,
+    one to find the existing associations and one bulk insert. Returns the
+    recipients already associated and the ones that matched no contact.
+    """
+    normalized = {recipient: phone_lookup_key(recipient) for recipient in recipients}
+    contact_ids = lookup_contact_ids(
+        list(dict.fromkeys(n for n in normalized.values() if n is not None)), user
+    )
+    ids = list(contact_ids.values())
+
+    associated = set()
+    for i in range(0, len(ids), RECIPIENT_LOOKUP_CHUNK_SIZE):
+        associated.update(
+            ContactTemplate.objects.filter(
+                template_id=template, contact_id__in=ids[i : i + RECIPIENT_LOOKUP_CHUNK_SIZE]
+            ).values_list("contact_id", flat=True)
+        )
+
+    # ignore_conflicts covers a concurrent request adding the same contacts
+    ContactTemplate.objects.bulk_create(
+        [
+            ContactTemplate(contact_id_id=contact_id, template_id=template)
+            for contact_id in set(ids) - associated
+        ],
+        batch_size=RECIPIENT_LOOKUP_CHUNK_SIZE,
+        ignore_conflicts=True,
+    )
+
+    unknown = [r for r, n in normalized.items() if n not in contact_ids]
+    already_associated = [
+        r for r, n in normalized.items() if n in contact_ids and contact_ids[n] in associated
+    ]
+    return already_associated, unknown
+
+
+def remove_contacts_from_template(recipients: list, template, user):
+    """
+    Remove the contacts with the numbers in `recipients` from `template`
+    with one SELECT and one set-based DELETE per chunk of numbers. Returns
+    the number of associations removed and the recipients that were not
+    associated with the template.
+    """
+    normalized = {recipient: phone_lookup_key(recipient) for recipient in recipients}
+    phone_numbers = list(dict.fromkeys(n for n in normalized.values() if n is not None))
+
+    removed, matched = 0, set()
+    with transaction.atomic():
+        for i in range(0, len(phone_numbers), RECIPIENT_LOOKUP_CHUNK_SIZE):
+            associations = ContactTemplate.objects.filter(
+                phone_lookup(phone_numbers[i : i + RECIPIENT_LOOKUP_CHUNK_SIZE], "contact_id__"),
+                template_id=template,
+                contact_id__created_by=user,
+            )
+            matched.update(
+                associations.values_list(phone_lookup_value("contact_id__"), flat=True)
+            )
+            deleted, _ = associations.delete()
+            removed += deleted
+
+    unmatched = [r for r, n in normalized.items() if n not in matched]
+    return removed, unmatched
+
+
 def save_new_contact(phone_number, user):
     return Contact.objects.create(phone=phone_number, created_by=user)
 
 
-def create_message_logs(message: str, user):
-    messageLogObject = MessageLog.objects.create(content=message, author_id=user)
+def create_message_logs(message: str, user, job=None):
+    messageLogObject = MessageLog.objects.create(
+        content=message, author_id=user, job_id=job
+    )
     return messageLogObject
 
 
-def create_recipient_log(messageLogInstance, response: dict, user):
-    for recipient_data in response.get("SMSMessageData", {}).get("Recipients", []):
-        print("response here: ", response)
-        recipient_number = recipient_data.get("number")
-        if recipient_number:
-            recipient_status = recipient_data.get("status")
+def create_recipient_log(messageLogInstance, results: list, user):
+    return create_recipient_logs([(messageLogInstance, results)], user)
+
 
-            recipient_contact = Contact.objects.filter(
-                phone=recipient_number, created_by=user
-            ).first()
-            if recipient_contact:
-                recipient_log = RecipientLog.objects.create(
+def create_recipient_logs(deliveries: list, user):
+    """
+    Write one RecipientLog per recipient result for every
+    `(messageLogInstance, results)` pair of `deliveries` using one query to
+    resolve the numbers to contacts and one bulk insert, whatever the number
+    of recipients. Numbers that are not in the user's contacts are logged
+    without a contact, failed recipients are scheduled for a retry.
+    """
+    deliveries = [
+        (messageLogInstance, [r for r in results if r.get("number")])
+        for messageLogInstance, results in deliveries
+    ]
+    numbers = {r["number"] for _, results in deliveries for r in results}
+    if not numbers:
+        return []
+
+    normalized = {number: phone_lookup_key(number) for number in numbers}
+    contact_ids = dict(
+        Contact.objects.filter(
+            phone_lookup(set(normalized.values()) - {None}), created_by=user
+        ).values_list(phone_lookup_value(), "id")
+    )
+    with transaction.atomic():
+        recipient_logs = RecipientLog.objects.bulk_create(
+            [
+                RecipientLog(
                     message_id=messageLogInstance,
-                    contact_id=recipient_contact,
-                    status=recipient_status,
+                    contact_id_id=contact_ids.get(normalized[recipient_data["number"]]),
+                    phone=recipient_data["number"],
+                    status=recipient_data.get("status"),
+                    provider_message_id=recipient_data.get("messageId"),
                 )
-                recipient_log.save()
-            else:
-                return Response(status=status.HTTP_400_BAD_REQUEST)
-        else:
-            return Response(status=status.HTTP_400_BAD_REQUEST)
-
-
-def generate_personalized_message(template_message: str, contact: Contact):
-    if "<full_name>" in template_message:
-        template_message = template_message.replace("<full_name>", contact.full_name)
-    if "<email>" in template_message:
-        template_message = template_message.replace("<email>", contact.email)
-    if "<phone>" in template_message:
-        template_message = template_message.replace("<phone>", contact.phone)
-    if "<info>" in template_message:
-        template_message = template_message.replace("<info>", contact.info)
-    return template_message
+                for messageLogInstance, results in deliveries
+                for recipient_data in results
+            ]
+        )
+        changes = [(r.message_id, None, r.status) for r in recipient_logs]
+        update_counters(changes)
+        update_rollups(changes)
+        schedule_retries([r for r in recipient_logs if is_retryable(r.status)])
+    return recipient_logs
@@ -1,19 +1,33 @@
+import functools
+import math
+from datetime import timedelta
+
 from django.contrib.auth import get_user_model
-from src.contacts.models import Contact
-from src.message_logs.models import MessageLog, RecipientLog
+from src.contacts.models import Contact, ContactImport
+from src.message_logs.models import MessageLog, RecipientLog, DeadLetter
 from src.msg_templates.models import Template, ContactTemplate
+from src.send_jobs.models import SendJob
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.throttling import UserRateThrottle
-from rest_framework.parsers import MultiPartParser, FormParser, FileUploadParser
+from rest_framework.parsers import (
+    MultiPartParser,
+    FormParser,
+    FileUploadParser,
+    JSONParser,
+)
 
+from django.conf import settings
 from django.db import IntegrityError
-from datetime import datetime
 from django.db import transaction
-from django.core.paginator import Paginator, EmptyPage
+from django.utils.crypto import constant_time_compare
+from django.utils.dateparse import parse_datetime, parse_date
+from django.utils import timezone
+from django.db.models import Sum
+from django.db.models.functions import Coalesce
 from django.utils.decorators import method_decorator
 from django.views.decorators.cache import cache_page
 from django.views.decorators.vary import vary_on_headers
@@ -27,6 +41,18 @@ from drf_spectacular.utils import (
 from drf_spectacular.types import OpenApiTypes
 
 from .send_sms import send_sms
+from .jobs import enqueue_quick_send, enqueue_template_send
+from .rate_limit import RateLimited, provider_bucket
+from .delivery_reports import store_delivery_reports
+from .retries import requeue_dead_letter
+from .idempotency import idempotent, IDEMPOTENCY_HEADER
+from .dedupe import drop_recent_duplicates, mark_sent
+from .sms_encoding import transliterate, estimate_message, estimate_template
+from .contact_import import import_format
+from .exports import export_response, EXPORT_FORMATS, EXPORT_CHUNK_SIZE
+from .pagination import KeysetPagination, PaginationError, pagination_parameters
+from .analytics import delivery_summary, GROUP_BY_FIELDS
+from .search import search_message_logs, search_contacts
 from .serializers import (
     ContactSerializer,
     MessageLogSerializer,
@@ -38,19 +64,93 @@ from .serializers import (
     TemplateCreateSerializer,
     ResendEditedMessageLogSerializer,
     SendMessageSerializer,
+    SendOptionsSerializer,
     ContactBodySerializer,
     TemplateBodySerializer,
+    SendJobSerializer,
+    RecipientLogDetailSerializer,
+    RateLimitSerializer,
+    DeliveryReportSerializer,
+    DeadLetterSerializer,
+    ContactImportUploadSerializer,
+    ContactImportSerializer,
 )
 from .utils import (
     clean_contacts,
+    resolve_recipients,
+    add_contacts_to_template,
+    remove_contacts_from_template,
     create_message_logs,
     create_recipient_log,
-    generate_personalized_message,
 )
 
 
 User = get_user_model
-PAGE_SIZE = 10
+
+# sort fields of each list, all backed by a (owner, field, id) index
+CONTACT_ORDERINGS = ("created_at", "full_name")
+TEMPLATE_ORDERINGS = ("created_at", "name")
+MESSAGE_LOG_ORDERINGS = ("sent_at",)
+DEAD_LETTER_ORDERINGS = ("created_at",)
+SEND_JOB_RECIPIENT_ORDERINGS = ("id",)
+# ranked searches can also be ordered by relevance
+RANKED_CONTACT_ORDERINGS = CONTACT_ORDERINGS + ("rank",)
+RANKED_MESSAGE_LOG_ORDERINGS = MESSAGE_LOG_ORDERINGS + ("rank",)
+
+EXPORT_PARAMETERS = [
+    OpenApiParameter(
+        name="file_format",
+        description="csv (default) or ndjson. The response is gzipped when the client sends Accept-Encoding: gzip",
+        location=OpenApiParameter.QUERY,
+        required=False,
+        type=OpenApiTypes.STR,
+    ),
+    OpenApiParameter(
+        name="created_after",
+        description="Only rows created at or after this ISO 8601 datetime",
+        location=OpenApiParameter.QUERY,
+        required=False,
+        type=OpenApiTypes.DATETIME,
+    ),
+    OpenApiParameter(
+        name="created_before",
+        description="Only rows created before this ISO 8601 datetime",
+        location=OpenApiParameter.QUERY,
+        required=False,
+        type=OpenApiTypes.DATETIME,
+    ),
+]
+
+
+def export_params(request):
+    """Read the shared export query parameters, raising ValueError on bad input."""
+    export_format = request.query_params.get("file_format", "csv")
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"file_format must be one of {sorted(EXPORT_FORMATS)}")
+    bounds = {}
+    for name in ("created_after", "created_before"):
+        value = request.query_params.get(name)
+        if value:
+            bounds[name] = parse_datetime(value)
+            if bounds[name] is None:
+                raise ValueError(f"{name} must be an ISO 8601 datetime")
+    return export_format, bounds.get("created_after"), bounds.get("created_before")
+
+IDEMPOTENCY_PARAMETER = OpenApiParameter(
+    name=IDEMPOTENCY_HEADER,
+    location=OpenApiParameter.HEADER,
+    description="Client-generated key; retries with the same key replay the first response",
+    required=False,
+    type=OpenApiTypes.STR,
+)
+
+
+def rate_limited_response(error: RateLimited):
+    return Response(
+        {"message": "SMS provider rate limit reached, try again later"},
+        status=status.HTTP_429_TOO_MANY_REQUESTS,
+        headers={"Retry-After": str(math.ceil(error.retry_after))},
+    )
 
 
 class ContactView(APIView):
@@ -66,20 +166,14 @@ class ContactView(APIView):
             type=OpenApiTypes.STR,
         ),
         OpenApiParameter(
-            name="ordering",
-            description="Order response by field",
+            name="search",
+            description="Type-ahead search: contacts whose name, email or phone number starts with it. "
+            "On PostgreSQL names and emails also match fuzzily and results are ordered by relevance (`-rank`) unless another ordering is given",
             location=OpenApiParameter.QUERY,
             required=False,
             type=OpenApiTypes.STR,
         ),
-        OpenApiParameter(
-            name="page",
-            description="Page number",
-            location=OpenApiParameter.QUERY,
-            required=False,
-            type=OpenApiTypes.STR,
-        ),
-    ]
+    ] + pagination_parameters(CONTACT_ORDERINGS, "-created_at")
 
     @extend_schema(
         operation_id="get all contacts",
@@ -93,33 +187,27 @@ class ContactView(APIView):
     @method_decorator(vary_on_headers("Authorization"))
     def get(self, request):
         user = request.user
-        ordering = request.query_params.get("ordering")
 
         contacts = Contact.objects.filter(created_by=user)
 
         # Filter by phone number if provided in query parameters
         phone_number = request.query_params.get("phone", None)
         if phone_number:
-            formatted_phone_number = "+" + phone_number
-            contacts = contacts.filter(phone=formatted_phone_number)
-
-        # Ordering by field if provided in query parameters
-        if ordering:
-            contacts = contacts.order_by(ordering)
-
-        page_number = request.query_params.get("page", 1)
-        paginator = Paginator(contacts, PAGE_SIZE)
-
+            contacts = contacts.with_phone(phone_number)
+
+        paginator = KeysetPagination(CONTACT_ORDERINGS, "-created_at")
+        search = request.query_params.get("search", "").strip()
+        if search:
+            contacts, ranked = search_contacts(contacts, search)
+            if ranked:
+                paginator = KeysetPagination(RANKED_CONTACT_ORDERINGS, "-rank")
         try:
-            contacts_page = paginator.page(page_number)
-        except EmptyPage:
-            return Response(
-                {"message": "Requested page does not exist"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
+            contacts_page = paginator.paginate_queryset(contacts, request)
+        except PaginationError as e:
+            return Response({"message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
         serializer = ContactSerializer(contacts_page, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return paginator.get_paginated_response(serializer.data)
 
     @extend_schema(
         request=(ContactSerializer),
@@ -135,9 +223,11 @@ class ContactView(APIView):
         request_data["created_by"] = user.id
 
         # Check if a contact with the same phone number and user already exists
-        existing_contact = Contact.objects.filter(
-            phone=request_data["phone"], created_by=user
-        ).exists()
+        existing_contact = (
+            Contact.objects.with_phone(request_data.get("phone"))
+            .filter(created_by=user)
+            .exists()
+        )
         if existing_contact:
             return Response(
                 {"message": "Contact already exist"}, status=status.HTTP_409_CONFLICT
@@ -151,6 +241,123 @@ class ContactView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class ContactImportView(APIView):
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser, FormParser]
+
+    @extend_schema(
+        summary="Import contacts from a file",
+        description="Upload a CSV (or XLSX) file whose first row names the columns: full_name, phone and optionally email and info. "
+        "The file is imported in the background, contacts with a phone number already in your contacts are updated. "
+        "Follow the progress at /api/contact-imports/<import_id>",
+        request=ContactImportUploadSerializer(),
+        tags=["contacts"],
+    )
+    def post(self, request):
+        user = request.user
+        serializer = ContactImportUploadSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        upload = serializer.validated_data["file"]
+        file_format = import_format(upload.name)
+        if file_format is None:
+            return Response(
+                {"message": "Unsupported file type, upload a .csv or .xlsx file"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        contact_import = ContactImport.objects.create(
+            created_by=user, file=upload, file_format=file_format
+        )
+        return Response(
+            {"message": "Contacts queued for import", "import_id": str(contact_import.id)},
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+
+class ContactImportDetailView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    parameters = [
+        OpenApiParameter(
+            name="importId",
+            location=OpenApiParameter.PATH,
+            description="Contact import ID",
+            type=OpenApiTypes.UUID,
+        )
+    ]
+
+    @extend_schema(
+        summary="Get a contact import",
+        description="Get the progress of a contact import and the rows it rejected",
+        parameters=parameters,
+        request=None,
+        responses={200: ContactImportSerializer},
+        tags=["contacts"],
+    )
+    def get(self, request, importId=None):
+        try:
+            contact_import = ContactImport.objects.get(pk=importId, created_by=request.user)
+        except ContactImport.DoesNotExist:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+
+        serializer = ContactImportSerializer(contact_import)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class ContactExportView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    parameters = EXPORT_PARAMETERS + [
+        OpenApiParameter(
+            name="template",
+            description="Only contacts associated with this template",
+            location=OpenApiParameter.QUERY,
+            required=False,
+            type=OpenApiTypes.STR,
+        ),
+    ]
+
+    @extend_schema(
+        summary="Export contacts",
+        description="Download all your contacts as CSV or NDJSON in one streamed response",
+        parameters=parameters,
+        request=None,
+        responses={(200, "text/csv"): OpenApiTypes.STR},
+        tags=["contacts"],
+    )
+    def get(self, request):
+        try:
+            export_format, created_after, created_before = export_params(request)
+        except ValueError as e:
+            return Response({"message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        contacts = Contact.objects.filter(created_by=request.user)
+        if created_after:
+            contacts = contacts.filter(created_at__gte=created_after)
+        if created_before:
+            contacts = contacts.filter(created_at__lt=created_before)
+        template_name = request.query_params.get("template")
+        if template_name:
+            contacts = contacts.filter(
+                id__in=ContactTemplate.objects.filter(
+                    template_id__name=template_name.strip(),
+                    template_id__created_by=request.user,
+                ).values("contact_id")
+            )
+
+        fields = ["full_name", "email", "info", "created_at", "phone"]
+        rows = (
+            contacts.annotate(number=Coalesce("phone_e164", "phone"))
+            .order_by("created_at", "id")
+            .values_list("full_name", "email", "info", "created_at", "number")
+        )
+        return export_response(
+            request, "contacts", fields, rows.iterator(chunk_size=EXPORT_CHUNK_SIZE), export_format
+        )
+
+
 class ContactDetailView(APIView):
     permission_classes = [IsAuthenticated]
     # parser_classes = [MultiPartParser, FormParser]
@@ -213,6 +420,15 @@ class ContactDetailView(APIView):
         except Contact.DoesNotExist:
             return Response(status=status.HTTP_404_NOT_FOUND)
 
+        phone = request.data.get("phone")
+        if (
+            phone is not None
+            and user_contacts.with_phone(phone).exclude(pk=contact.pk).exists()
+        ):
+            return Response(
+                {"message": "Contact already exist"}, status=status.HTTP_409_CONFLICT
+            )
+
         serializer = ContactSerializer(contact, data=request.data, partial=True)
         if serializer.is_valid():
             try:
@@ -252,22 +468,7 @@ class TemplateView(APIView):
     throttle_classes = [UserRateThrottle]
     # parser_classes = [MultiPartParser, FormParser, FileUploadParser]
 
-    paramters = [
-        OpenApiParameter(
-            name="ordering",
-            description="Order response by field",
-            location=OpenApiParameter.QUERY,
-            required=False,
-            type=OpenApiTypes.STR,
-        ),
-        OpenApiParameter(
-            name="page",
-            description="Page number",
-            location=OpenApiParameter.QUERY,
-            required=False,
-            type=OpenApiTypes.STR,
-        ),
-    ]
+    paramters = pagination_parameters(TEMPLATE_ORDERINGS, "-created_at")
 
     @extend_schema(
         summary="List all templates",
@@ -281,26 +482,17 @@ class TemplateView(APIView):
     @method_decorator(vary_on_headers("Authorization"))
     def get(self, request):
         user = request.user
-        ordering = request.query_params.get("ordering")
 
         templates = Template.objects.filter(created_by=user)
 
-        # Ordering by field if provided in query parameters
-        if ordering:
-            templates = templates.order_by(ordering)
-
-        page_number = request.query_params.get("page", 1)
-        paginator = Paginator(templates, PAGE_SIZE)
+        paginator = KeysetPagination(TEMPLATE_ORDERINGS, "-created_at")
         try:
-            templates_page = paginator.page(page_number)
-        except EmptyPage:
-            return Response(
-                {"message": "Requested page does not exist"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
+            templates_page = paginator.paginate_queryset(templates, request)
+        except PaginationError as e:
+            return Response({"message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        serializer = TemplateSerializer(templates, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        serializer = TemplateSerializer(templates_page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
     @extend_schema(
         summary="Create a template",
@@ -336,8 +528,7 @@ class TemplateView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
         return Response(
-            {"message": "Template created successfully!"},
-            serializer.data,
+            {"message": "Template created successfully!", **serializer.data},
             status=status.HTTP_201_CREATED,
         )
 
@@ -454,8 +645,9 @@ class TemplateContactView(APIView):
     @extend_schema(
         summary="Get contacts associated with a template",
         description="Get contacts associated with a template by specifying template name",
-        parameters=parameters,
+        parameters=parameters + pagination_parameters(CONTACT_ORDERINGS, "-created_at"),
         request=None,
+        responses={200: ContactSerializer},
         tags=["template-contacts"],
     )
     def get(self, request, templateName=None):
@@ -471,16 +663,16 @@ class TemplateContactView(APIView):
         except Template.DoesNotExist:
             return Response(status=status.HTTP_404_NOT_FOUND)
 
-        contact_template_objects = ContactTemplate.objects.filter(template_id=template)
-        contacts = Contact.objects.filter(
-            pk__in=contact_template_objects.values_list("contact_id", flat=True)
-        )
+        contacts = Contact.objects.filter(created_by=user, contacttemplate__template_id=template)
 
-        if contacts.exists():
-            serializer = ContactSerializer(contacts, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
-        else:
-            return Response(status=status.HTTP_404_NOT_FOUND)
+        paginator = KeysetPagination(CONTACT_ORDERINGS, "-created_at")
+        try:
+            contacts_page = paginator.paginate_queryset(contacts, request)
+        except PaginationError as e:
+            return Response({"message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = ContactSerializer(contacts_page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
     @extend_schema(
         summary="Associate contacts with a template",
@@ -511,49 +703,34 @@ class TemplateContactView(APIView):
             )
 
         recipient_lists = clean_contacts(contacts)
-        phoneNotInContacts, contactAlreadyIntemplateContacts = False, False
-        phoneNotInContacts_list, contactAlreadyIntemplateContacts_list = [], []
-
-        for recipient in recipient_lists:
-            contact = None
-            try:
-                contact = Contact.objects.get(phone=recipient, created_by=user)
-            except Contact.DoesNotExist:
-                phoneNotInContacts = True
-                phoneNotInContacts_list.append(recipient)
-
-            if contact:
-                try:
-                    contact_template, created = ContactTemplate.objects.get_or_create(
-                        template_id=template, contact_id=contact
-                    )
-                    if not created:
-                        contactAlreadyIntemplateContacts = True
-                        contactAlreadyIntemplateContacts_list.append(recipient)
-                except IntegrityError:
-                    return Response(
-                        {"message": "Integrity error occurred"},
-                        status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    )
+        contactAlreadyIntemplateContacts_list, phoneNotInContacts_list = add_contacts_to_template(
+            recipient_lists, template, user
+        )
+        phoneNotInContacts = bool(phoneNotInContacts_list)
+        contactAlreadyIntemplateContacts = bool(contactAlreadyIntemplateContacts_list)
 
         if contactAlreadyIntemplateContacts and phoneNotInContacts:
             return Response(
                 {
-                    "message": f"Phone number(s) {contactAlreadyIntemplateContacts_list} already associated with template and {phoneNotInContacts_list} not in your contacts"
+                    "message": f"Phone number(s) {contactAlreadyIntemplateContacts_list} already associated with template and {phoneNotInContacts_list} not in your contacts",
+                    "already_associated": contactAlreadyIntemplateContacts_list,
+                    "unknown": phoneNotInContacts_list,
                 },
                 status=status.HTTP_400_BAD_REQUEST,
             )
         if phoneNotInContacts:
             return Response(
                 {
-                    "message": f"Phone number(s) {phoneNotInContacts_list} not in your contacts, try saving them first."
+                    "message": f"Phone number(s) {phoneNotInContacts_list} not in your contacts, try saving them first.",
+                    "unknown": phoneNotInContacts_list,
                 },
                 status=status.HTTP_400_BAD_REQUEST,
             )
         if contactAlreadyIntemplateContacts:
             return Response(
                 {
-                    "message": f"Phone number(s) {contactAlreadyIntemplateContacts_list} already associated with template"
+                    "message": f"Phone number(s) {contactAlreadyIntemplateContacts_list} already associated with template",
+                    "already_associated": contactAlreadyIntemplateContacts_list,
                 },
                 status=status.HTTP_400_BAD_REQUEST,
             )
@@ -565,6 +742,7 @@ class TemplateContactView(APIView):
     @extend_schema(
         summary="Remove contact(s) from a template",
         description='Remove a list of contacts from a template. Format: ["+233xxxxxxxxx", ...]. Specify the template name.\
+        Responds with the number of contacts removed and the numbers that were not associated with the template.\
         For some wierd reason, the contacts request body required to perform this operation doesn\'t show, try using a different client.',
         request=ContactBodySerializer(),
         tags=["template-contacts"],
@@ -584,15 +762,11 @@ class TemplateContactView(APIView):
             return Response(status=status.HTTP_404_NOT_FOUND)
 
         recipient_lists = clean_contacts(contacts)
-        for recipient in recipient_lists:
-            try:
-                contact_template = ContactTemplate.objects.get(
-                    template_id=template, contact_id__phone=recipient
-                )
-                contact_template.delete()
-            except ContactTemplate.DoesNotExist:
-                return Response(status=status.HTTP_404_NOT_FOUND)
-        return Response(status=status.HTTP_204_NO_CONTENT)
+        removed, unmatched = remove_contacts_from_template(recipient_lists, template, user)
+        return Response(
+            {"removed": removed, "unmatched": len(unmatched), "unmatched_numbers": unmatched},
+            status=status.HTTP_200_OK,
+        )
 
 
 class MessageLogView(APIView):
@@ -600,13 +774,6 @@ class MessageLogView(APIView):
     parser_classes = [MultiPartParser, FormParser]
 
     parameters = [
-        OpenApiParameter(
-            name="ordering",
-            description="Order response by field",
-            location=OpenApiParameter.QUERY,
-            required=False,
-            type=OpenApiTypes.STR,
-        ),
         OpenApiParameter(
             name="content",
             description="Message content",
@@ -615,13 +782,14 @@ class MessageLogView(APIView):
             type=OpenApiTypes.STR,
         ),
         OpenApiParameter(
-            name="page",
-            description="Page number",
+            name="q",
+            description="Search message content. On PostgreSQL this is a web search query "
+            '(`promo "black friday" -test`) and results are ordered by relevance (`-rank`) unless another ordering is given',
             location=OpenApiParameter.QUERY,
             required=False,
             type=OpenApiTypes.STR,
         ),
-    ]
+    ] + pagination_parameters(MESSAGE_LOG_ORDERINGS, "-sent_at")
 
     @extend_schema(
         operation_id="get all message logs",
@@ -635,10 +803,9 @@ class MessageLogView(APIView):
     @method_decorator(vary_on_headers("Authorization"))
     def get(self, request):
         user = request.user
-        ordering = request.query_params.get("ordering")
 
         messages = MessageLog.objects.filter(author_id=user)
-        if not messages:
+        if not messages.exists():
             return Response([], status=status.HTTP_404_NOT_FOUND)
 
         # Filter by message content if provided in query parameters
@@ -646,20 +813,85 @@ class MessageLogView(APIView):
         if content:
             messages = messages.filter(content=content.strip())
 
-        # Ordering by sent_date if provided in query parameters
-        if ordering:
-            messages = messages.order_by(ordering)
+        paginator = KeysetPagination(MESSAGE_LOG_ORDERINGS, "-sent_at")
+        q = request.query_params.get("q", "").strip()
+        if q:
+            messages, ranked = search_message_logs(messages, q)
+            if ranked:
+                paginator = KeysetPagination(RANKED_MESSAGE_LOG_ORDERINGS, "-rank")
+        try:
+            messages_page = paginator.paginate_queryset(messages, request)
+        except PaginationError as e:
+            return Response({"message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        page_number = request.query_params.get("page", 1)
-        paginator = Paginator(messages, PAGE_SIZE)
+        serializer = MessageLogSerializer(messages_page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
-        try:
-            contacts_page = paginator.page(page_number)
-        except EmptyPage:
-            return Response(status=status.HTTP_404_NOT_FOUND)
 
-        serializer = MessageLogSerializer(contacts_page, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+class MessageLogExportView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    parameters = EXPORT_PARAMETERS + [
+        OpenApiParameter(
+            name="content",
+            description="Message content",
+            location=OpenApiParameter.QUERY,
+            required=False,
+            type=OpenApiTypes.STR,
+        ),
+        OpenApiParameter(
+            name="status",
+            description="Only recipients with this delivery status",
+            location=OpenApiParameter.QUERY,
+            required=False,
+            type=OpenApiTypes.STR,
+        ),
+    ]
+
+    @extend_schema(
+        summary="Export message logs",
+        description="Download your message logs as CSV or NDJSON, one row per recipient with its delivery status",
+        parameters=parameters,
+        request=None,
+        responses={(200, "text/csv"): OpenApiTypes.STR},
+        tags=["message_logs"],
+    )
+    def get(self, request):
+        try:
+            export_format, created_after, created_before = export_params(request)
+        except ValueError as e:
+            return Response({"message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        recipients = RecipientLog.objects.filter(message_id__author_id=request.user)
+        if created_after:
+            recipients = recipients.filter(message_id__sent_at__gte=created_after)
+        if created_before:
+            recipients = recipients.filter(message_id__sent_at__lt=created_before)
+        content = request.query_params.get("content")
+        if content:
+            recipients = recipients.filter(message_id__content=content.strip())
+        recipient_status = request.query_params.get("status")
+        if recipient_status:
+            recipients = recipients.filter(status=recipient_status)
+
+        fields = ["message_id", "content", "sent_at", "full_name", "status", "attempts", "status_updated_at", "phone"]
+        rows = (
+            recipients.annotate(number=Coalesce("phone", "contact_id__phone_e164"))
+            .order_by("message_id", "id")
+            .values_list(
+                "message_id",
+                "message_id__content",
+                "message_id__sent_at",
+                "contact_id__full_name",
+                "status",
+                "attempts",
+                "status_updated_at",
+                "number",
+            )
+        )
+        return export_response(
+            request, "message-logs", fields, rows.iterator(chunk_size=EXPORT_CHUNK_SIZE), export_format
+        )
 
 
 class MessageLogDetailVIew(APIView):
@@ -688,7 +920,7 @@ class MessageLogDetailVIew(APIView):
         try:
             if messageId is None:
                 return Response(status=status.HTTP_400_BAD_REQUEST)
-            message = MessageLog.objects.get(pk=messageId, author_id=user)
+            message = MessageLog.objects.with_recipients().get(pk=messageId, author_id=user)
 
             serializer = MessageLogDetailSerializer(message)
             return Response(serializer.data, status=status.HTTP_200_OK)
@@ -727,13 +959,15 @@ class ResendLogMessage(APIView):
         except MessageLog.DoesNotExist:
             return Response(status=status.HTTP_404_NOT_FOUND)
 
-        associated_contacts = RecipientLog.objects.filter(message_id=message).exclude(
-            contact_id=None
+        associated_contacts = (
+            RecipientLog.objects.filter(message_id=message)
+            .exclude(contact_id=None)
+            .select_related("contact_id")
         )
 
         try:
             recipient_numbers = [
-                contact.contact_id.phone
+                contact.contact_id.phone_e164 or contact.contact_id.phone
                 for contact in associated_contacts
                 if contact.contact_id
             ]
@@ -742,13 +976,15 @@ class ResendLogMessage(APIView):
                     {"message": "No contacts associated with message"},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
-            response = send_sms(message=message.content, to=recipient_numbers)
+            results = send_sms(message=message.content, to=recipient_numbers)
             messageId = create_message_logs(message=message.content, user=user)
             create_recipient_log(
-                messageLogInstance=messageId, response=response, user=user
+                messageLogInstance=messageId, results=results, user=user
             )
 
             return Response(status=status.HTTP_204_NO_CONTENT)
+        except RateLimited as e:
+            return rate_limited_response(e)
         except Exception as e:
             return Response(status=status.HTTP_400_BAD_REQUEST)
 
@@ -784,10 +1020,12 @@ class EditResendLogMessage(APIView):
             )
 
         message_content = request.data.get("content")
-        associated_contacts = RecipientLog.objects.filter(message_id=original_message)
+        associated_contacts = RecipientLog.objects.filter(
+            message_id=original_message
+        ).select_related("contact_id")
         try:
             recipient_numbers = [
-                contact.contact_id.phone
+                contact.contact_id.phone_e164 or contact.contact_id.phone
                 for contact in associated_contacts
                 if contact.contact_id
             ]
@@ -796,12 +1034,14 @@ class EditResendLogMessage(APIView):
                     {"message": "Message contact(s) could be deleted!"},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
-            response = send_sms(message=message_content, to=recipient_numbers)
+            results = send_sms(message=message_content, to=recipient_numbers)
             messageId = create_message_logs(message=message_content, user=user)
             create_recipient_log(
-                messageLogInstance=messageId, response=response, user=user
+                messageLogInstance=messageId, results=results, user=user
             )
 
+        except RateLimited as e:
+            return rate_limited_response(e)
         except Exception as e:
             return Response(status=status.HTTP_400_BAD_REQUEST)
 
@@ -816,11 +1056,16 @@ class SendMessageView(APIView):
 
     @extend_schema(
         summary="Send a quick message",
-        description="Send a quick message to one or more contacts. Contact(s) must be a list",
+        description="Send a quick message to one or more contacts. Contact(s) must be a list. "
+        "Contacts sent the same message within the dedupe window are skipped and listed in `duplicates`. "
+        "Optionally schedule it for `send_at` and pace it at `rate_per_minute` messages. "
+        "With `dry_run` nothing is sent and the encoding, segments and cost are estimated instead",
+        parameters=[IDEMPOTENCY_PARAMETER],
         request=SendMessageSerializer(),
         responses=None,
         tags=["send-message"],
     )
+    @idempotent
     def post(self, request):
         user = request.user
         request_data = request.data.copy()
@@ -828,40 +1073,55 @@ class SendMessageView(APIView):
         contacts = request_data.get("contacts", [])
         if not message or not contacts:
             return Response(status=status.HTTP_400_BAD_REQUEST)
+        options = SendOptionsSerializer(data=request_data)
+        if not options.is_valid():
+            return Response(options.errors, status=status.HTTP_400_BAD_REQUEST)
+        options = options.validated_data
+        dry_run = options.pop("dry_run")
+        if options.pop("transliterate"):
+            message = transliterate(message)
 
         recipient_lists = clean_contacts(contacts)
-        phone_numbers = []
-        for recipient in recipient_lists:
-            try:
-                contact = Contact.objects.get(phone=recipient, created_by=user)
-                phone_numbers.append(contact.phone)
-            except Contact.DoesNotExist:
-                return Response(
-                    {
-                        "message": f"Contact with phone number {recipient} not found in your contacts"
-                    },
-                    status=status.HTTP_404_NOT_FOUND,
-                )
-        try:
-            if not phone_numbers:
-                return Response(
-                    {"message": "No contacts found"}, status=status.HTTP_404_NOT_FOUND
-                )
-            response = send_sms(message=message, to=phone_numbers)
-            messageLog = create_message_logs(message=message, user=user)
-            create_recipient_log(
-                messageLogInstance=messageLog, response=response, user=user
+        phone_numbers, unknown = resolve_recipients(recipient_lists, user)
+        if unknown:
+            return Response(
+                {
+                    "message": f"Contact(s) with phone number(s) {unknown} not found in your contacts",
+                    "unknown": unknown,
+                },
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        if not phone_numbers:
+            return Response(
+                {"message": "No contacts found"}, status=status.HTTP_404_NOT_FOUND
+            )
+        if dry_run:
+            return Response(
+                estimate_message(message, len(phone_numbers)), status=status.HTTP_200_OK
             )
 
-            return Response(status=status.HTTP_204_NO_CONTENT)
-        except Exception as e:
-            return Response(status=status.HTTP_400_BAD_REQUEST)
+        phone_numbers, duplicates = drop_recent_duplicates(user, message, phone_numbers)
+        if not phone_numbers:
+            return Response(
+                {"message": "Message was already sent to these contacts", "duplicates": duplicates},
+                status=status.HTTP_200_OK,
+            )
+        job = enqueue_quick_send(
+            user=user, message=message, phone_numbers=phone_numbers, **options
+        )
+        # only once the job is committed, a failed request must not drop its retry
+        transaction.on_commit(functools.partial(mark_sent, user, message, phone_numbers))
+
+        return Response(
+            {"message": "Message queued for sending", "job_id": str(job.id), "duplicates": duplicates},
+            status=status.HTTP_202_ACCEPTED,
+        )
 
 
 class SendTemplateMessage(APIView):
     permission_classes = [IsAuthenticated]
     throttle_classes = [UserRateThrottle]
-    parser_classes = [MultiPartParser, FormParser]
+    parser_classes = [JSONParser, FormParser, MultiPartParser]
 
     parameters = [
         OpenApiParameter(
@@ -869,16 +1129,20 @@ class SendTemplateMessage(APIView):
             location=OpenApiParameter.PATH,
             description="Template Name",
             type=OpenApiTypes.STR,
-        )
+        ),
+        IDEMPOTENCY_PARAMETER,
     ]
 
     @extend_schema(
         summary="Send a message using a template",
-        description="Send a message using a template by specifying its name",
+        description="Send a message using a template by specifying its name. "
+        "Optionally schedule it for `send_at` and pace it at `rate_per_minute` messages. "
+        "With `dry_run` nothing is sent and the encoding, segments and cost are estimated instead",
         parameters=parameters,
-        request=None,
+        request=SendOptionsSerializer(),
         tags=["send-message-template"],
     )
+    @idempotent
     def post(self, request, templateName=None):
         user = request.user
         try:
@@ -889,27 +1153,248 @@ class SendTemplateMessage(APIView):
         except Template.DoesNotExist:
             return Response(status=status.HTTP_404_NOT_FOUND)
 
-        contacts = ContactTemplate.objects.filter(template_id=template)
-        if len(contacts) == 0:
+        options = SendOptionsSerializer(data=request.data)
+        if not options.is_valid():
+            return Response(options.errors, status=status.HTTP_400_BAD_REQUEST)
+        options = options.validated_data
+        dry_run = options.pop("dry_run")
+
+        total = ContactTemplate.objects.filter(template_id=template).count()
+        if total == 0:
             return Response(status=status.HTTP_400_BAD_REQUEST)
-        for contact_template in contacts:
-            contact = contact_template.contact_id
+        if dry_run:
+            return Response(
+                estimate_template(template, apply_transliteration=options["transliterate"]),
+                status=status.HTTP_200_OK,
+            )
+        job = enqueue_template_send(user=user, template=template, total=total, **options)
+
+        return Response(
+            {"message": "Template message queued for sending", "job_id": str(job.id)},
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+
+class SendJobDetailView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    parameters = [
+        OpenApiParameter(
+            name="jobId",
+            location=OpenApiParameter.PATH,
+            description="Send job ID",
+            type=OpenApiTypes.UUID,
+        )
+    ] + pagination_parameters(SEND_JOB_RECIPIENT_ORDERINGS, "id")
+
+    @extend_schema(
+        summary="Get a send job",
+        description="Get the progress of a queued send, the recipient counts by outcome and "
+        "one page of the recipients delivered so far",
+        parameters=parameters,
+        request=None,
+        responses={200: SendJobSerializer},
+        tags=["send-jobs"],
+    )
+    def get(self, request, jobId=None):
+        user = request.user
+        try:
+            job = SendJob.objects.get(pk=jobId, created_by=user)
+        except SendJob.DoesNotExist:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+
+        recipients = RecipientLog.objects.filter(message_id__job_id=job).select_related("contact_id")
+        paginator = KeysetPagination(SEND_JOB_RECIPIENT_ORDERINGS, "id")
+        try:
+            recipients_page = paginator.paginate_queryset(recipients, request)
+        except PaginationError as e:
+            return Response({"message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        data = SendJobSerializer(job).data
+        # the message log counters, so a poll never reads every recipient
+        data["counts"] = MessageLog.objects.filter(job_id=job).aggregate(
+            total=Sum("total_count", default=0),
+            success=Sum("success_count", default=0),
+            failed=Sum("failed_count", default=0),
+            pending=Sum("pending_count", default=0),
+        )
+        data["recipients"] = paginator.get_paginated_response(
+            RecipientLogDetailSerializer(recipients_page, many=True).data
+        ).data
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class RateLimitView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        summary="Get the provider rate limit",
+        description="Current fill level of the token bucket shared by every worker sending through the SMS provider account",
+        request=None,
+        responses={200: RateLimitSerializer},
+        tags=["send-message"],
+    )
+    def get(self, request):
+        serializer = RateLimitSerializer(provider_bucket().fill_level())
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class DeliveryReportView(APIView):
+    # called by the SMS provider, authenticated by the shared callback token
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    parser_classes = [JSONParser, FormParser, MultiPartParser]
+
+    @extend_schema(
+        summary="Receive delivery reports",
+        description="Delivery report callback for the SMS provider. Accepts one report (id, status) or a JSON list of reports. "
+        "Reports are stored, then applied to the recipient logs in batches by the send worker.",
+        parameters=[
+            OpenApiParameter(
+                name="token",
+                description="Callback token, the DLR_CALLBACK_TOKEN setting. Reports are refused while it is not set",
+                location=OpenApiParameter.QUERY,
+                required=True,
+                type=OpenApiTypes.STR,
+            )
+        ],
+        request=DeliveryReportSerializer(many=True),
+        responses=None,
+        tags=["delivery-reports"],
+    )
+    def post(self, request):
+        # without a configured token anyone could post statuses, and a failure triggers paid re-sends
+        token = settings.DLR_CALLBACK_TOKEN
+        if not token or not constant_time_compare(request.query_params.get("token", ""), token):
+            return Response(status=status.HTTP_403_FORBIDDEN)
+
+        reports = request.data if isinstance(request.data, list) else [request.data]
+        serializer = DeliveryReportSerializer(data=reports, many=True)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        store_delivery_reports(
+            (report["id"], report["status"]) for report in serializer.validated_data
+        )
+        return Response(status=status.HTTP_200_OK)
+
+
+class DeadLetterView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    parameters = pagination_parameters(DEAD_LETTER_ORDERINGS, "-created_at")
+
+    @extend_schema(
+        summary="List dead letters",
+        description="List recipients whose delivery failed after every retry",
+        parameters=parameters,
+        request=None,
+        responses={200: DeadLetterSerializer},
+        tags=["dead-letters"],
+    )
+    def get(self, request):
+        user = request.user
+        dead_letters = DeadLetter.objects.filter(author_id=user).select_related("recipient_log_id")
+
+        paginator = KeysetPagination(DEAD_LETTER_ORDERINGS, "-created_at")
+        try:
+            dead_letters_page = paginator.paginate_queryset(dead_letters, request)
+        except PaginationError as e:
+            return Response({"message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = DeadLetterSerializer(dead_letters_page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+
+class DeliveryAnalyticsView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    parameters = [
+        OpenApiParameter(
+            name="start",
+            description="First day, YYYY-MM-DD. Defaults to 29 days before end",
+            location=OpenApiParameter.QUERY,
+            required=False,
+            type=OpenApiTypes.DATE,
+        ),
+        OpenApiParameter(
+            name="end",
+            description="Last day, YYYY-MM-DD. Defaults to today",
+            location=OpenApiParameter.QUERY,
+            required=False,
+            type=OpenApiTypes.DATE,
+        ),
+        OpenApiParameter(
+            name="group_by",
+            description="day (default), template or status",
+            location=OpenApiParameter.QUERY,
+            required=False,
+            type=OpenApiTypes.STR,
+        ),
+    ]
+
+    @extend_schema(
+        summary="Delivery analytics",
+        description="Recipients of your messages by delivery outcome and success rate, in total and per day, template or status. "
+        "Messages are counted on the day they were sent",
+        parameters=parameters,
+        request=None,
+        tags=["analytics"],
+    )
+    def get(self, request):
+        group_by = request.query_params.get("group_by", "day")
+        if group_by not in GROUP_BY_FIELDS:
+            return Response(
+                {"message": f"group_by must be one of: {', '.join(GROUP_BY_FIELDS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        dates = {}
+        for name in ("start", "end"):
+            value = request.query_params.get(name)
             try:
-                template_content = template.content
-                personalized_message = generate_personalized_message(
-                    template_message=template_content, contact=contact
-                )
-                response = send_sms(message=personalized_message, to=[contact.phone])
-                messageLog = create_message_logs(
-                    message=personalized_message, user=user
-                )
-                create_recipient_log(
-                    messageLogInstance=messageLog, response=response, user=user
+                dates[name] = parse_date(value) if value else None
+            except ValueError:
+                dates[name] = None
+            if value and dates[name] is None:
+                return Response(
+                    {"message": f"{name} must be a valid YYYY-MM-DD date"},
+                    status=status.HTTP_400_BAD_REQUEST,
                 )
+        end = dates["end"] or timezone.localdate()
+        start = dates["start"] or end - timedelta(days=29)
+        if start > end:
+            return Response(
+                {"message": "start must not be after end"}, status=status.HTTP_400_BAD_REQUEST
+            )
 
-                template.last_sent = datetime.now()
-                template.save()
-            except Exception as e:
-                return Response(status=status.HTTP_400_BAD_REQUEST)
+        return Response(delivery_summary(request.user, start, end, group_by), status=status.HTTP_200_OK)
 
-        return Response(status=status.HTTP_204_NO_CONTENT)
+
+class RequeueDeadLetterView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    parameters = [
+        OpenApiParameter(
+            name="deadLetterId",
+            location=OpenApiParameter.PATH,
+            description="Dead letter ID",
+            type=OpenApiTypes.INT,
+        )
+    ]
+
+    @extend_schema(
+        summary="Requeue a dead letter",
+        description="Schedule a dead-lettered recipient for a new round of delivery attempts",
+        parameters=parameters,
+        request=None,
+        tags=["dead-letters"],
+    )
+    def post(self, request, deadLetterId=None):
+        user = request.user
+        try:
+            dead_letter = DeadLetter.objects.get(pk=deadLetterId, author_id=user)
+        except DeadLetter.DoesNotExist:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+
+        requeue_dead_letter(dead_letter)
+        return Response(status=status.HTTP_202_ACCEPTED)
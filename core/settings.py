@@ -1,5 +1,5 @@
 from pathlib import Path
-from decouple import config
+from decouple import config, Csv
 from datetime import timedelta
 import os
 from typing import Dict, Any
@@ -39,6 +39,7 @@ INSTALLED_APPS = [
     "src.contacts",
     "src.message_logs",
     "src.msg_templates",
+    "src.send_jobs",
     "api",
     # "drf_yasg", # swagger
     "drf_spectacular",
@@ -131,6 +132,10 @@ STATICFILES_DIR = BASE_DIR / "static"
 
 STATIC_ROOT = BASE_DIR / "staticfiles_build/static"
 
+# uploaded contact imports; must be shared storage when workers run on other hosts
+MEDIA_URL = "media/"
+MEDIA_ROOT = config("MEDIA_ROOT", default=str(BASE_DIR / "media"))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
@@ -169,6 +174,76 @@ DJOSER = {
     },
 }
 
+# country code given to phone numbers entered in national format (0xx...)
+DEFAULT_PHONE_COUNTRY_CODE = config("DEFAULT_PHONE_COUNTRY_CODE", default="233")
+
+# SMS provider configuration
+SMS_BACKEND = config(
+    "SMS_BACKEND", default="api.sms_backends.africastalking.SMSBackend"
+)
+AFRICASTALKING_USERNAME = config("AFRICASTALKING_USERNAME", default="")
+AFRICASTALKING_API_KEY = config("AFRICASTALKING_API_KEY", default="")
+SMS_HTTP_POOL_SIZE = config("SMS_HTTP_POOL_SIZE", default=10, cast=int)
+SMS_HTTP_TIMEOUT = config("SMS_HTTP_TIMEOUT", default=30, cast=int)
+# provider calls in flight per worker, keep below SMS_HTTP_POOL_SIZE
+SMS_DISPATCH_CONCURRENCY = config("SMS_DISPATCH_CONCURRENCY", default=8, cast=int)
+# shared provider rate limit, a rate of 0 disables it
+SMS_RATE_LIMIT_PER_SECOND = config("SMS_RATE_LIMIT_PER_SECOND", default=50, cast=float)
+SMS_RATE_LIMIT_BURST = config("SMS_RATE_LIMIT_BURST", default=500, cast=int)
+# longest an API request waits for tokens before answering 429
+SMS_RATE_LIMIT_MAX_WAIT = config("SMS_RATE_LIMIT_MAX_WAIT", default=2, cast=float)
+# price of one SMS segment, used by send estimates
+SMS_SEGMENT_COST = config("SMS_SEGMENT_COST", default=0.0, cast=float)
+
+# delivery report callbacks, stored on receipt and applied by the send worker in
+# batches of DLR_BATCH_SIZE; a report whose recipient log is not written yet is
+# tried again every DLR_RETRY_INTERVAL seconds. The provider must call back with
+# ?token=DLR_CALLBACK_TOKEN; reports are refused while it is empty
+DLR_CALLBACK_TOKEN = config("DLR_CALLBACK_TOKEN", default="")
+DLR_BATCH_SIZE = config("DLR_BATCH_SIZE", default=500, cast=int)
+DLR_RETRY_INTERVAL = config("DLR_RETRY_INTERVAL", default=5.0, cast=float)
+DLR_UNMATCHED_RETRIES = config("DLR_UNMATCHED_RETRIES", default=3, cast=int)
+
+# recipient statuses counted as delivered or failed by the message log
+# counters, together with SMS_RETRYABLE_STATUSES; any other is pending
+SMS_SUCCESS_STATUSES = config("SMS_SUCCESS_STATUSES", default="Success,Delivered", cast=Csv())
+SMS_FAILED_STATUSES = config(
+    "SMS_FAILED_STATUSES",
+    default="Failed,Rejected,UserInBlacklist,InvalidPhoneNumber,InvalidSenderId,UserAccountSuspended",
+    cast=Csv(),
+)
+
+# failed deliveries are retried with exponential backoff, then dead-lettered
+SMS_RETRYABLE_STATUSES = config(
+    "SMS_RETRYABLE_STATUSES",
+    default="Failed,InsufficientBalance,RiskHold,CouldNotRoute,InternalServerError,GatewayError,RejectedByGateway",
+    cast=Csv(),
+)
+SMS_RETRY_MAX_ATTEMPTS = config("SMS_RETRY_MAX_ATTEMPTS", default=5, cast=int)
+SMS_RETRY_BASE_DELAY = config("SMS_RETRY_BASE_DELAY", default=60, cast=int)
+SMS_RETRY_MAX_DELAY = config("SMS_RETRY_MAX_DELAY", default=3600, cast=int)
+SMS_RETRY_BATCH_SIZE = config("SMS_RETRY_BATCH_SIZE", default=500, cast=int)
+
+# responses to send requests carrying an Idempotency-Key header are kept this
+# many hours and replayed to retries
+IDEMPOTENCY_KEY_TTL = config("IDEMPOTENCY_KEY_TTL", default=24, cast=int)
+# minutes during which an identical message to the same number is dropped,
+# 0 disables it. Needs a cache shared by the API and the workers
+SMS_DEDUPE_WINDOW = config("SMS_DEDUPE_WINDOW", default=0, cast=int)
+
+# contact imports are upserted in batches of CONTACT_IMPORT_BATCH_SIZE rows and
+# keep the first CONTACT_IMPORT_MAX_ERRORS rejected rows for the error report
+CONTACT_IMPORT_BATCH_SIZE = config("CONTACT_IMPORT_BATCH_SIZE", default=5000, cast=int)
+CONTACT_IMPORT_MAX_ERRORS = config("CONTACT_IMPORT_MAX_ERRORS", default=1000, cast=int)
+
+# send job worker configuration
+SEND_JOB_LEASE_SECONDS = config("SEND_JOB_LEASE_SECONDS", default=300, cast=int)
+SEND_JOB_CHUNK_SIZE = config("SEND_JOB_CHUNK_SIZE", default=500, cast=int)
+# the scheduler keeps jobs due within SEND_SCHEDULER_LOOKAHEAD seconds in
+# memory and reads the table again every SEND_SCHEDULER_REFRESH seconds
+SEND_SCHEDULER_LOOKAHEAD = config("SEND_SCHEDULER_LOOKAHEAD", default=600, cast=int)
+SEND_SCHEDULER_REFRESH = config("SEND_SCHEDULER_REFRESH", default=30, cast=float)
+
 DOMAIN = "localhost:5173"
 SITE_NAME = config("SITE_NAME")
 
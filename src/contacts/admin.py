@@ -1,10 +1,16 @@
 from django.contrib import admin
-from .models import Contact
+from .models import Contact, ContactImport
 
 @admin.register(Contact)
 class ContactAdmin(admin.ModelAdmin):
-    list_display = ('full_name', 'phone', 'email', 'created_by', 'created_at', 'updated_at')
+    list_display = ('full_name', 'phone', 'phone_e164', 'email', 'created_by', 'created_at', 'updated_at')
     list_display_links = ('phone',)
     search_fields = ('name', 'email')
     ordering = ('-created_at',)
-    
\ No newline at end of file
+    
+
+@admin.register(ContactImport)
+class ContactImportAdmin(admin.ModelAdmin):
+    list_display = ('id', 'created_by', 'file_format', 'status', 'processed_rows', 'created_count', 'updated_count', 'error_count', 'created_at')
+    list_filter = ('status', 'file_format')
+    ordering = ('-created_at',)
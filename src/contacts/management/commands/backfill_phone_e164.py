@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+
+from src.contacts.models import Contact
+from src.contacts.utils import normalize_phone
+
+
+class Command(BaseCommand):
+    help = "Fill Contact.phone_e164 for contacts saved before the column existed."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of contacts updated per query",
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Normalize every contact again, not only the ones missing a value",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        contacts = Contact.objects.order_by("pk")
+        if not options["all"]:
+            contacts = contacts.filter(phone_e164__isnull=True)
+
+        updated = invalid = 0
+        last_pk = None
+        while True:
+            # keyset pagination, updated rows may leave the filtered set
+            batch = contacts if last_pk is None else contacts.filter(pk__gt=last_pk)
+            batch = list(batch.only("pk", "phone")[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+
+            changed = []
+            for contact in batch:
+                contact.phone_e164 = normalize_phone(contact.phone)
+                if contact.phone_e164 is None:
+                    invalid += 1
+                else:
+                    changed.append(contact)
+            Contact.objects.bulk_update(changed, ["phone_e164"])
+            updated += len(changed)
+
+        self.stdout.write(f"Normalized {updated} phone numbers")
+        if invalid:
+            self.stdout.write(
+                self.style.WARNING(f"{invalid} phone numbers could not be normalized")
+            )
@@ -0,0 +1,45 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.db import migrations
+from django.db.models import F
+from django.db.models.functions import Upper
+
+
+# must stay the expressions api.search.search_contacts() queries with; btree_gin
+# lets created_by lead the index, so a search only reads one user's entries
+def contact_search_index():
+    return GinIndex(
+        F('created_by'),
+        OpClass(Upper('full_name'), name='gin_trgm_ops'),
+        OpClass(Upper('email'), name='gin_trgm_ops'),
+        OpClass(F('phone_e164'), name='gin_trgm_ops'),
+        name='contact_search_idx',
+    )
+
+
+def create_contact_search_index(apps, schema_editor):
+    # other databases search with unindexed prefix matches, see api.search
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    # needs the CREATE privilege on the database; the extensions are kept on rollback
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS btree_gin')
+    schema_editor.add_index(apps.get_model('contacts', 'Contact'), contact_search_index(), concurrently=True)
+
+
+def drop_contact_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.remove_index(apps.get_model('contacts', 'Contact'), contact_search_index(), concurrently=True)
+
+
+class Migration(migrations.Migration):
+    # the index is built concurrently so contact stays writable meanwhile
+    atomic = False
+
+    dependencies = [
+        ('contacts', '0004_contact_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_contact_search_index, drop_contact_search_index),
+    ]
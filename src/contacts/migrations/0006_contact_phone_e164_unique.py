@@ -0,0 +1,67 @@
+# Generated by Django 5.0.3 on 2026-10-17 23:49
+
+from django.conf import settings
+from django.db import migrations, models
+
+from src.contacts.utils import normalize_phone
+
+
+def merge_duplicate_contacts(apps, schema_editor):
+    """
+    Fill the numbers backfill_phone_e164 has not normalized yet, then merge
+    the contacts of a user sharing a normalized number into the oldest one:
+    its templates and recipient logs move to it before the others are
+    deleted.
+    """
+    Contact = apps.get_model('contacts', 'Contact')
+    ContactTemplate = apps.get_model('msg_templates', 'ContactTemplate')
+    RecipientLog = apps.get_model('message_logs', 'RecipientLog')
+
+    missing = list(Contact.objects.filter(phone_e164__isnull=True).only('pk', 'phone'))
+    for contact in missing:
+        contact.phone_e164 = normalize_phone(contact.phone)
+    Contact.objects.bulk_update(missing, ['phone_e164'], batch_size=1000)
+
+    duplicated = (
+        Contact.objects.filter(phone_e164__isnull=False)
+        .values('created_by', 'phone_e164')
+        .annotate(count=models.Count('pk'))
+        .filter(count__gt=1)
+    )
+    for number in duplicated:
+        keeper, *duplicates = (
+            Contact.objects.filter(created_by=number['created_by'], phone_e164=number['phone_e164'])
+            .order_by('created_at', 'pk')
+            .values_list('pk', flat=True)
+        )
+        for duplicate in duplicates:
+            kept_templates = list(ContactTemplate.objects.filter(contact_id=keeper).values_list('template_id', flat=True))
+            ContactTemplate.objects.filter(contact_id=duplicate).exclude(
+                template_id__in=kept_templates
+            ).update(contact_id=keeper)
+        # the templates already holding the oldest contact lose the duplicates
+        ContactTemplate.objects.filter(contact_id__in=duplicates).delete()
+        RecipientLog.objects.filter(contact_id__in=duplicates).update(contact_id=keeper)
+        Contact.objects.filter(pk__in=duplicates).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contacts', '0005_contact_search_index'),
+        ('message_logs', '0009_pendingdeliveryreport'),
+        ('msg_templates', '0002_template_keyset_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_contacts, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='contact',
+            constraint=models.UniqueConstraint(fields=('created_by', 'phone_e164'), name='contact_created_by_e164_uniq'),
+        ),
+        migrations.RemoveIndex(
+            model_name='contact',
+            name='contact_created_by_e164_idx',
+        ),
+    ]
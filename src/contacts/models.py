@@ -1,25 +1,109 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from .utils import normalize_phone, phone_lookup_key
 import uuid
 
 User = get_user_model()
 
+class ContactQuerySet(models.QuerySet):
+    def with_phone(self, phone):
+        # a number that can't be normalized matches the contacts saved with it as entered
+        phone_e164 = normalize_phone(phone)
+        if phone_e164 is not None:
+            return self.filter(phone_e164=phone_e164)
+        key = phone_lookup_key(phone)
+        if key is None:
+            return self.none()
+        return self.filter(phone_e164__isnull=True, phone=key)
+
+
 class Contact(models.Model):
     id = models.UUIDField(default=uuid.uuid4, unique=True, primary_key=True, editable=False)
     full_name = models.CharField(max_length=255)
     email = models.EmailField(max_length=100, unique=True, blank=True, null=True)
     phone = models.CharField(max_length=20)
+    # `phone` as entered, normalized by normalize_phone; every lookup by number goes through it
+    phone_e164 = models.CharField(max_length=16, blank=True, null=True, editable=False)
     info = models.TextField(blank=True, null=True)
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, db_column='created_by')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    objects = ContactQuerySet.as_manager()
     
     def __str__(self):
         return str(self.full_name)
+
+    def save(self, *args, **kwargs):
+        self.phone_e164 = normalize_phone(self.phone)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'phone' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'phone_e164'}
+        super().save(*args, **kwargs)
     
     class Meta:
         verbose_name = 'Contact'
         verbose_name_plural = 'Contacts'
         db_table = 'contact'
         unique_together = ('phone', 'created_by')
-    
\ No newline at end of file
+        constraints = [
+            # the same number written differently is still one contact
+            models.UniqueConstraint(fields=['created_by', 'phone_e164'], name='contact_created_by_e164_uniq'),
+        ]
+        indexes = [
+            # keyset pagination sort keys
+            models.Index(fields=['created_by', 'created_at', 'id'], name='contact_author_created_idx'),
+            models.Index(fields=['created_by', 'full_name', 'id'], name='contact_author_name_idx'),
+        ]
+    
+
+
+class ContactImport(models.Model):
+    PENDING = 'PENDING'
+    RUNNING = 'RUNNING'
+    COMPLETED = 'COMPLETED'
+    FAILED = 'FAILED'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (COMPLETED, 'Completed'),
+        (FAILED, 'Failed'),
+    ]
+
+    CSV = 'csv'
+    XLSX = 'xlsx'
+    FORMAT_CHOICES = [
+        (CSV, 'CSV'),
+        (XLSX, 'Excel workbook'),
+    ]
+
+    id = models.UUIDField(default=uuid.uuid4, unique=True, primary_key=True, editable=False)
+    created_by = models.ForeignKey(User, on_delete=models.CASCADE, db_column='created_by')
+    file = models.FileField(upload_to='contact_imports/')
+    file_format = models.CharField(max_length=10, choices=FORMAT_CHOICES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING)
+    processed_rows = models.PositiveIntegerField(default=0)
+    created_count = models.PositiveIntegerField(default=0)
+    updated_count = models.PositiveIntegerField(default=0)
+    error_count = models.PositiveIntegerField(default=0)
+    # first CONTACT_IMPORT_MAX_ERRORS rejected rows: [{"row": 12, "error": "..."}]
+    errors = models.JSONField(default=list, blank=True)
+    error = models.TextField(blank=True, null=True)
+    # lease held by the worker currently processing the import
+    locked_by = models.CharField(max_length=255, blank=True, null=True)
+    locked_until = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return str(self.id)
+
+    class Meta:
+        verbose_name = 'Contact Import'
+        verbose_name_plural = 'Contact Imports'
+        db_table = 'contact_import'
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='contact_import_status_idx'),
+        ]
@@ -0,0 +1,72 @@
+import re
+
+from django.conf import settings
+from django.db.models import Q
+from django.db.models.functions import Coalesce
+
+
+PHONE_SEPARATORS = re.compile(r"[\s\-.()/]")
+# E.164 allows at most 15 digits after the "+"
+E164_PATTERN = re.compile(r"\+[1-9]\d{6,14}")
+PHONE_PREFIX_PATTERN = re.compile(r"\+[1-9]\d{0,14}")
+
+
+def normalize_phone(phone, country_code: str = None):
+    """
+    Return `phone` in E.164 form (`+233201234567`), or None when it can't be
+    read as a phone number. Separators are dropped, a `00` international
+    prefix becomes `+`, and a national number with a leading 0 gets the
+    DEFAULT_PHONE_COUNTRY_CODE. Digits without a prefix are taken as already
+    carrying their country code, which is how a `+` lost in a query string
+    arrives.
+    """
+    if phone is None:
+        return None
+    number = international_prefix(PHONE_SEPARATORS.sub("", str(phone)), country_code)
+    return number if E164_PATTERN.fullmatch(number) else None
+
+
+def phone_lookup_key(phone):
+    """
+    The value a contact with `phone` is looked up by: its E.164 form, or the
+    number as entered when it can't be normalized, since such contacts are
+    stored with no phone_e164.
+    """
+    if phone is None:
+        return None
+    return normalize_phone(phone) or str(phone).strip() or None
+
+
+def phone_lookup(keys, prefix: str = ""):
+    """
+    Q matching the contacts, through the relation `prefix` (`"contact_id__"`),
+    whose phone_lookup_key() is in `keys`. Both sides use a unique index.
+    """
+    return Q(**{f"{prefix}phone_e164__in": keys}) | Q(
+        **{f"{prefix}phone_e164__isnull": True, f"{prefix}phone__in": keys}
+    )
+
+
+def phone_lookup_value(prefix: str = ""):
+    """The phone_lookup_key() of a contact, as an expression."""
+    return Coalesce(f"{prefix}phone_e164", f"{prefix}phone")
+
+
+def normalize_phone_prefix(text: str, country_code: str = None):
+    """
+    The E.164 prefix of the numbers starting with the digits typed in
+    `text`, read like normalize_phone reads a full number, or None when
+    `text` isn't the start of a phone number.
+    """
+    number = international_prefix(PHONE_SEPARATORS.sub("", text), country_code)
+    return number if PHONE_PREFIX_PATTERN.fullmatch(number) else None
+
+
+def international_prefix(number: str, country_code: str = None):
+    if number.startswith("+"):
+        return number
+    if number.startswith("00"):
+        return "+" + number[2:]
+    if number.startswith("0"):
+        return "+" + (country_code or settings.DEFAULT_PHONE_COUNTRY_CODE) + number[1:]
+    return "+" + number
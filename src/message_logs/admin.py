@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import MessageLog, RecipientLog
+from .models import MessageLog, RecipientLog, RetrySchedule, PendingDeliveryReport, DeadLetter, DeliveryRollup
 
 @admin.register(MessageLog)
 class MessageAdmin(admin.ModelAdmin):
@@ -12,4 +12,31 @@ class MessageAdmin(admin.ModelAdmin):
 class ReceipientAdmin(admin.ModelAdmin):
     list_display = ('id', 'contact_id', 'message_id', 'status')
     search_fields = ('contact_id',)
-    ordering = ('-id',)
\ No newline at end of file
+    ordering = ('-id',)
+
+
+@admin.register(RetrySchedule)
+class RetryScheduleAdmin(admin.ModelAdmin):
+    list_display = ('id', 'recipient_log_id', 'next_attempt_at', 'created_at')
+    ordering = ('next_attempt_at',)
+
+
+@admin.register(PendingDeliveryReport)
+class PendingDeliveryReportAdmin(admin.ModelAdmin):
+    list_display = ('id', 'provider_message_id', 'status', 'attempts', 'next_attempt_at')
+    search_fields = ('provider_message_id',)
+    ordering = ('id',)
+
+
+@admin.register(DeadLetter)
+class DeadLetterAdmin(admin.ModelAdmin):
+    list_display = ('id', 'phone', 'author_id', 'attempts', 'last_status', 'created_at')
+    search_fields = ('phone',)
+    ordering = ('-created_at',)
+
+
+@admin.register(DeliveryRollup)
+class DeliveryRollupAdmin(admin.ModelAdmin):
+    list_display = ('id', 'author_id', 'day', 'status', 'template_id', 'count')
+    list_filter = ('status',)
+    ordering = ('-day',)
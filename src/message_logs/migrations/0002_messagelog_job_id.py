@@ -0,0 +1,20 @@
+# Generated by Django 5.0.3 on 2026-10-17 22:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('message_logs', '0001_initial'),
+        ('send_jobs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='messagelog',
+            name='job_id',
+            field=models.ForeignKey(blank=True, db_column='job_id', null=True, on_delete=django.db.models.deletion.SET_NULL, to='send_jobs.sendjob'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.3 on 2026-10-17 22:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('message_logs', '0002_messagelog_job_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipientlog',
+            name='provider_message_id',
+            field=models.CharField(blank=True, db_index=True, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='recipientlog',
+            name='status_updated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
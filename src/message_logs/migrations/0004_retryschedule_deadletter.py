@@ -0,0 +1,59 @@
+# Generated by Django 5.0.3 on 2026-10-17 22:31
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('message_logs', '0003_recipientlog_provider_message_id'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipientlog',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='recipientlog',
+            name='phone',
+            field=models.CharField(blank=True, max_length=20, null=True),
+        ),
+        migrations.CreateModel(
+            name='RetrySchedule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('next_attempt_at', models.DateTimeField(db_index=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('recipient_log_id', models.OneToOneField(db_column='recipient_log_id', on_delete=django.db.models.deletion.CASCADE, to='message_logs.recipientlog')),
+            ],
+            options={
+                'verbose_name': 'Retry Schedule',
+                'verbose_name_plural': 'Retry Schedules',
+                'db_table': 'retry_schedule',
+            },
+        ),
+        migrations.CreateModel(
+            name='DeadLetter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('phone', models.CharField(blank=True, max_length=20, null=True)),
+                ('content', models.TextField()),
+                ('attempts', models.PositiveSmallIntegerField()),
+                ('last_status', models.CharField(max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('author_id', models.ForeignKey(db_column='author_id', on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+                ('recipient_log_id', models.OneToOneField(db_column='recipient_log_id', on_delete=django.db.models.deletion.CASCADE, to='message_logs.recipientlog')),
+            ],
+            options={
+                'verbose_name': 'Dead Letter',
+                'verbose_name_plural': 'Dead Letters',
+                'db_table': 'dead_letter',
+                'indexes': [models.Index(fields=['author_id', '-created_at'], name='dead_letter_author_created_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.0.3 on 2026-10-17 22:48
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('message_logs', '0004_retryschedule_deadletter'),
+        ('send_jobs', '0003_sendjob_transliterate'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='messagelog',
+            index=models.Index(fields=['author_id', 'sent_at', 'id'], name='message_log_author_sent_idx'),
+        ),
+    ]
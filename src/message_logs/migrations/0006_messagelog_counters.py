@@ -0,0 +1,33 @@
+# Generated by Django 5.0.3 on 2026-10-17 22:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('message_logs', '0005_messagelog_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='messagelog',
+            name='failed_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='messagelog',
+            name='pending_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='messagelog',
+            name='success_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='messagelog',
+            name='total_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.0.3 on 2026-10-17 22:59
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('message_logs', '0006_messagelog_counters'),
+        ('msg_templates', '0002_template_keyset_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeliveryRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('status', models.CharField(blank=True, default='', max_length=100)),
+                ('template_key', models.CharField(blank=True, default='', max_length=36)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('author_id', models.ForeignKey(db_column='author_id', on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+                ('template_id', models.ForeignKey(blank=True, db_column='template_id', null=True, on_delete=django.db.models.deletion.SET_NULL, to='msg_templates.template')),
+            ],
+            options={
+                'verbose_name': 'Delivery Rollup',
+                'verbose_name_plural': 'Delivery Rollups',
+                'db_table': 'delivery_rollup',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='deliveryrollup',
+            constraint=models.UniqueConstraint(fields=('author_id', 'day', 'status', 'template_key'), name='delivery_rollup_key_uniq'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+
+# must stay the expression api.search.content_vector() queries with
+def content_search_index():
+    return GinIndex(SearchVector('content', config='english'), name='message_log_content_search_idx')
+
+
+def create_content_search_index(apps, schema_editor):
+    # other databases search with substring matches, see api.search
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.add_index(apps.get_model('message_logs', 'MessageLog'), content_search_index(), concurrently=True)
+
+
+def drop_content_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.remove_index(apps.get_model('message_logs', 'MessageLog'), content_search_index(), concurrently=True)
+
+
+class Migration(migrations.Migration):
+    # the index is built concurrently so message_log stays writable meanwhile
+    atomic = False
+
+    dependencies = [
+        ('message_logs', '0007_deliveryrollup'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_content_search_index, drop_content_search_index),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.0.3 on 2026-10-17 23:41
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('message_logs', '0008_messagelog_content_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingDeliveryReport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('provider_message_id', models.CharField(max_length=100)),
+                ('status', models.CharField(max_length=100)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Pending Delivery Report',
+                'verbose_name_plural': 'Pending Delivery Reports',
+                'db_table': 'pending_delivery_report',
+            },
+        ),
+    ]
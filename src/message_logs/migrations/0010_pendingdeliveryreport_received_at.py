@@ -0,0 +1,19 @@
+# Generated by Django 5.0.3 on 2026-10-18 00:06
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('message_logs', '0009_pendingdeliveryreport'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pendingdeliveryreport',
+            name='received_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -1,14 +1,35 @@
 from django.db import models
+from django.utils import timezone
 from src.contacts.models import Contact
 from django.contrib.auth import get_user_model
 from src.msg_templates.models import Template
+from src.send_jobs.models import SendJob
 
 User = get_user_model()
 
+class MessageLogQuerySet(models.QuerySet):
+    def with_recipients(self):
+        # one query for the recipients of every log and their contacts, not one per log and recipient
+        return self.prefetch_related(
+            models.Prefetch(
+                'recipientlog_set',
+                queryset=RecipientLog.objects.select_related('contact_id').order_by('id'),
+            )
+        )
+
+
 class MessageLog(models.Model):   
     content = models.TextField(max_length=255)
     author_id = models.ForeignKey(User, on_delete=models.PROTECT, db_column='author_id')
     sent_at = models.DateTimeField(auto_now_add=True)
+    job_id = models.ForeignKey(SendJob, on_delete=models.SET_NULL, null=True, blank=True, db_column='job_id')
+    # recipient counters, kept up to date by api.counters as recipient logs are written
+    total_count = models.PositiveIntegerField(default=0)
+    success_count = models.PositiveIntegerField(default=0)
+    failed_count = models.PositiveIntegerField(default=0)
+    pending_count = models.PositiveIntegerField(default=0)
+
+    objects = MessageLogQuerySet.as_manager()
     
     def __str__(self):
         return str(self.id)
@@ -17,12 +38,20 @@ class MessageLog(models.Model):
         verbose_name = 'Message Log'
         verbose_name_plural = 'Message Logs'
         db_table = 'message_log'
+        indexes = [
+            # keyset pagination sort key
+            models.Index(fields=['author_id', 'sent_at', 'id'], name='message_log_author_sent_idx'),
+        ]
         
     
 class RecipientLog(models.Model):   
     contact_id = models.ForeignKey(Contact, on_delete=models.SET_NULL, null=True, db_column='contact_id')
     message_id = models.ForeignKey(MessageLog, on_delete=models.CASCADE, db_column='message_id')
+    phone = models.CharField(max_length=20, blank=True, null=True)
     status = models.CharField(max_length=100, default='PENDING')
+    attempts = models.PositiveSmallIntegerField(default=1)
+    provider_message_id = models.CharField(max_length=100, blank=True, null=True, db_index=True)
+    status_updated_at = models.DateTimeField(blank=True, null=True)
     
     def __str__(self):
         return str(self.contact_id)
@@ -31,4 +60,81 @@ class RecipientLog(models.Model):
         verbose_name = 'Recipient Log'
         verbose_name_plural = 'Recipient Logs'
         db_table = 'recipient_log'
-        
+
+
+class RetrySchedule(models.Model):
+    # failed recipient waiting for its next delivery attempt
+    recipient_log_id = models.OneToOneField(RecipientLog, on_delete=models.CASCADE, db_column='recipient_log_id')
+    next_attempt_at = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return str(self.recipient_log_id_id)
+
+    class Meta:
+        verbose_name = 'Retry Schedule'
+        verbose_name_plural = 'Retry Schedules'
+        db_table = 'retry_schedule'
+
+
+class PendingDeliveryReport(models.Model):
+    # provider delivery report stored on receipt, applied to its recipient log by the send worker
+    provider_message_id = models.CharField(max_length=100)
+    status = models.CharField(max_length=100)
+    # tries that found no recipient log, the report may arrive before its send is logged
+    attempts = models.PositiveSmallIntegerField(default=0)
+    # when the callback got it, orders it against the other reports of the message
+    received_at = models.DateTimeField(default=timezone.now)
+    next_attempt_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return self.provider_message_id
+
+    class Meta:
+        verbose_name = 'Pending Delivery Report'
+        verbose_name_plural = 'Pending Delivery Reports'
+        db_table = 'pending_delivery_report'
+
+
+class DeadLetter(models.Model):
+    # recipient that exhausted its delivery attempts
+    recipient_log_id = models.OneToOneField(RecipientLog, on_delete=models.CASCADE, db_column='recipient_log_id')
+    author_id = models.ForeignKey(User, on_delete=models.CASCADE, db_column='author_id')
+    phone = models.CharField(max_length=20, blank=True, null=True)
+    content = models.TextField()
+    attempts = models.PositiveSmallIntegerField()
+    last_status = models.CharField(max_length=100)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return str(self.id)
+
+    class Meta:
+        verbose_name = 'Dead Letter'
+        verbose_name_plural = 'Dead Letters'
+        db_table = 'dead_letter'
+        indexes = [
+            models.Index(fields=['author_id', '-created_at'], name='dead_letter_author_created_idx'),
+        ]
+
+
+class DeliveryRollup(models.Model):
+    # recipients per (author, day sent, status, template), maintained by api.analytics
+    author_id = models.ForeignKey(User, on_delete=models.CASCADE, db_column='author_id')
+    day = models.DateField()
+    status = models.CharField(max_length=100, blank=True, default='')
+    template_id = models.ForeignKey(Template, on_delete=models.SET_NULL, null=True, blank=True, db_column='template_id')
+    # template id as text, '' for quick sends; the key keeps a deleted template's rows apart
+    template_key = models.CharField(max_length=36, blank=True, default='')
+    count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.day} {self.status}: {self.count}'
+
+    class Meta:
+        verbose_name = 'Delivery Rollup'
+        verbose_name_plural = 'Delivery Rollups'
+        db_table = 'delivery_rollup'
+        constraints = [
+            models.UniqueConstraint(fields=['author_id', 'day', 'status', 'template_key'], name='delivery_rollup_key_uniq'),
+        ]
@@ -23,6 +23,11 @@ class Template(models.Model):
         verbose_name_plural = 'Templates'
         db_table = 'template'
         unique_together = ('name', 'created_by')
+        indexes = [
+            # keyset pagination sort keys
+            models.Index(fields=['created_by', 'created_at', 'id'], name='template_author_created_idx'),
+            models.Index(fields=['created_by', 'name', 'id'], name='template_author_name_idx'),
+        ]
         
         
 class ContactTemplate(models.Model):
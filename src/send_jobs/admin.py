@@ -0,0 +1,8 @@
+from django.contrib import admin
+from .models import SendJob
+
+@admin.register(SendJob)
+class SendJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'created_by', 'status', 'processed', 'total', 'send_at', 'created_at', 'finished_at')
+    list_filter = ('status', 'kind')
+    ordering = ('-created_at',)
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.3 on 2026-10-17 22:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('send_jobs', '0002_sendjob_send_at_rate_per_minute'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sendjob',
+            name='transliterate',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.3 on 2026-10-17 23:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('send_jobs', '0003_sendjob_transliterate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sendjob',
+            name='last_contact_id',
+            field=models.UUIDField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,66 @@
+from django.db import models
+from django.contrib.auth import get_user_model
+from src.msg_templates.models import Template
+import uuid
+
+User = get_user_model()
+
+class SendJob(models.Model):
+    QUICK = 'QUICK'
+    TEMPLATE = 'TEMPLATE'
+    KIND_CHOICES = [
+        (QUICK, 'Quick send'),
+        (TEMPLATE, 'Template send'),
+    ]
+
+    SCHEDULED = 'SCHEDULED'
+    PENDING = 'PENDING'
+    RUNNING = 'RUNNING'
+    COMPLETED = 'COMPLETED'
+    FAILED = 'FAILED'
+    STATUS_CHOICES = [
+        (SCHEDULED, 'Scheduled'),
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (COMPLETED, 'Completed'),
+        (FAILED, 'Failed'),
+    ]
+
+    id = models.UUIDField(default=uuid.uuid4, unique=True, primary_key=True, editable=False)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    created_by = models.ForeignKey(User, on_delete=models.CASCADE, db_column='created_by')
+    template_id = models.ForeignKey(Template, on_delete=models.SET_NULL, null=True, blank=True, db_column='template_id')
+    message = models.TextField(blank=True, null=True)
+    recipients = models.JSONField(default=list, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING)
+    total = models.PositiveIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    # template jobs resume after the last contact they sent to, in id order
+    last_contact_id = models.UUIDField(blank=True, null=True)
+    attempts = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True, null=True)
+    # scheduled jobs are released to the workers at send_at; paced jobs send
+    # rate_per_minute recipients, then are scheduled again a minute later
+    send_at = models.DateTimeField(blank=True, null=True)
+    rate_per_minute = models.PositiveIntegerField(blank=True, null=True)
+    # rewrite rendered messages to GSM-7 where possible
+    transliterate = models.BooleanField(default=False)
+    # lease held by the worker currently processing the job
+    locked_by = models.CharField(max_length=255, blank=True, null=True)
+    locked_until = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return str(self.id)
+
+    class Meta:
+        verbose_name = 'Send Job'
+        verbose_name_plural = 'Send Jobs'
+        db_table = 'send_job'
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='send_job_status_created_idx'),
+            models.Index(fields=['status', 'send_at'], name='send_job_status_send_at_idx'),
+        ]
@@ -0,0 +1,149 @@
+from datetime import timedelta
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from src.message_logs.models import MessageLog, RecipientLog, DeliveryRollup
+from src.msg_templates.models import Template
+from src.send_jobs.models import SendJob
+from api.analytics import update_rollups, backfill_rollups, delivery_summary
+from api.delivery_reports import apply_delivery_reports
+from api.utils import create_recipient_log
+
+User = get_user_model()
+
+
+def rollups():
+    return sorted(
+        (rollup.status, rollup.template_key, rollup.count)
+        for rollup in DeliveryRollup.objects.all()
+    )
+
+
+@override_settings(SMS_BACKEND='api.sms_backends.locmem.SMSBackend')
+class DeliveryRollupTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='test_user', password='password', email='test@mail.com')
+        self.template = Template.objects.create(name='Promo', content='Hi', created_by=self.user)
+        job = SendJob.objects.create(kind=SendJob.TEMPLATE, created_by=self.user, template_id=self.template)
+        self.message_log = MessageLog.objects.create(content='Hi', author_id=self.user, job_id=job)
+        self.quick_log = MessageLog.objects.create(content='Hello', author_id=self.user)
+
+    def send(self, message_log, *statuses):
+        results = [
+            {'number': f'+2332000000{i:02d}', 'status': status, 'messageId': f'ATXid_{message_log.id}_{i}'}
+            for i, status in enumerate(statuses)
+        ]
+        create_recipient_log(message_log, results, self.user)
+
+    def test_sends_are_rolled_up_by_status_and_template(self):
+        self.send(self.message_log, 'Sent', 'Sent', 'Failed')
+        self.send(self.quick_log, 'Sent')
+        template_key = str(self.template.id)
+        self.assertEqual(rollups(), [('Failed', template_key, 1), ('Sent', '', 1), ('Sent', template_key, 2)])
+
+    def test_delivery_reports_move_recipients_between_rollups(self):
+        self.send(self.quick_log, 'Sent', 'Sent')
+        apply_delivery_reports({f'ATXid_{self.quick_log.id}_0': ('Delivered', timezone.now())})
+        self.assertEqual(rollups(), [('Delivered', '', 1), ('Sent', '', 1)])
+
+    def test_drifted_rollups_do_not_go_negative(self):
+        update_rollups([(self.quick_log, 'Sent', 'Delivered')])
+        self.assertEqual(rollups(), [('Delivered', '', 1), ('Sent', '', 0)])
+
+    def test_rollups_outlive_their_template(self):
+        self.send(self.message_log, 'Sent')
+        template_key = str(self.template.id)
+        self.template.delete()
+        self.assertEqual(rollups(), [('Sent', template_key, 1)])
+        self.assertIsNone(DeliveryRollup.objects.get().template_id)
+
+    def test_backfill_rebuilds_rollups(self):
+        self.send(self.message_log, 'Delivered', 'Failed')
+        RecipientLog.objects.create(message_id=self.quick_log, status='Delivered')
+        DeliveryRollup.objects.filter(status='Failed').update(count=5)
+        expected = [('Delivered', '', 1), ('Delivered', str(self.template.id), 1), ('Failed', str(self.template.id), 1)]
+
+        self.assertEqual(backfill_rollups(), 3)
+        self.assertEqual(rollups(), expected)
+
+        out = StringIO()
+        call_command('backfill_delivery_rollups', '--since', timezone.localdate().isoformat(), stdout=out)
+        self.assertIn('Wrote 3 delivery rollups', out.getvalue())
+        self.assertEqual(rollups(), expected)
+
+    def test_backfill_since_keeps_older_days(self):
+        self.send(self.quick_log, 'Sent')
+        tomorrow = timezone.localdate() + timedelta(days=1)
+        self.assertEqual(backfill_rollups(since=tomorrow), 0)
+        self.assertEqual(rollups(), [('Sent', '', 1)])
+
+    def test_summary_reads_rollups_only(self):
+        self.send(self.message_log, 'Delivered', 'Failed', 'Sent', 'Sent')
+        today = timezone.localdate()
+        with self.assertNumQueries(2):
+            summary = delivery_summary(self.user, today, today, 'template')
+        self.assertEqual(
+            summary['totals'],
+            {'total': 4, 'success': 1, 'failed': 1, 'pending': 2, 'success_rate': 0.25},
+        )
+        self.assertEqual(summary['results'][0]['template_id'], str(self.template.id))
+        self.assertEqual(summary['results'][0]['template'], 'Promo')
+
+
+class DeliveryAnalyticsViewTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='test_user', password='password', email='test@mail.com')
+        self.other_user = User.objects.create_user(username='other_user', password='password', email='other@mail.com')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('delivery-analytics')
+        self.today = timezone.localdate()
+        DeliveryRollup.objects.bulk_create(
+            [
+                DeliveryRollup(author_id=self.user, day=self.today, status='Delivered', count=3),
+                DeliveryRollup(author_id=self.user, day=self.today, status='Failed', count=1),
+                DeliveryRollup(author_id=self.user, day=self.today - timedelta(days=1), status='Sent', count=2),
+                DeliveryRollup(author_id=self.user, day=self.today - timedelta(days=40), status='Delivered', count=7),
+                DeliveryRollup(author_id=self.other_user, day=self.today, status='Delivered', count=9),
+            ]
+        )
+
+    def test_defaults_to_the_last_30_days_by_day(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['group_by'], 'day')
+        self.assertEqual(response.data['start'], self.today - timedelta(days=29))
+        self.assertEqual(response.data['totals']['total'], 6)
+        self.assertEqual(
+            [(row['day'], row['total'], row['success'], row['pending']) for row in response.data['results']],
+            [(self.today - timedelta(days=1), 2, 0, 2), (self.today, 4, 3, 0)],
+        )
+
+    def test_group_by_status_within_range(self):
+        start = (self.today - timedelta(days=60)).isoformat()
+        response = self.client.get(self.url, {'start': start, 'end': self.today.isoformat(), 'group_by': 'status'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(row['status'], row['total']) for row in response.data['results']],
+            [('Delivered', 10), ('Failed', 1), ('Sent', 2)],
+        )
+        self.assertEqual(response.data['totals']['success_rate'], round(10 / 13, 4))
+
+    def test_empty_range(self):
+        response = self.client.get(self.url, {'start': '2000-01-01', 'end': '2000-01-31'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'], [])
+        self.assertEqual(response.data['totals']['total'], 0)
+        self.assertIsNone(response.data['totals']['success_rate'])
+
+    def test_invalid_parameters(self):
+        for params in ({'group_by': 'contact'}, {'start': 'yesterday'}, {'end': '2024-02-30'}, {'start': '2024-02-02', 'end': '2024-02-01'}):
+            with self.subTest(params=params):
+                response = self.client.get(self.url, params)
+                self.assertEqual(response.status_code, 400)
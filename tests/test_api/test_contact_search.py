@@ -0,0 +1,61 @@
+from unittest import skipUnless
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from src.contacts.models import Contact
+
+User = get_user_model()
+
+
+class ContactSearchTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='test_user', password='password', email='test@mail.com')
+        self.client.force_authenticate(user=self.user)
+        Contact.objects.bulk_create(
+            [
+                Contact(full_name='John Doe', email='jdoe@example.com', phone='0201234567', phone_e164='+233201234567', created_by=self.user),
+                Contact(full_name='Johnny Mensah', phone='0241112222', phone_e164='+233241112222', created_by=self.user),
+                Contact(full_name='Ama Johnson', email='ama@example.com', phone='0209998888', phone_e164='+233209998888', created_by=self.user),
+                Contact(full_name='Kofi Annan', email='kofi@johnsmail.com', phone='0551234567', phone_e164='+233551234567', created_by=self.user),
+            ]
+        )
+        other = User.objects.create_user(username='other_user', password='password', email='other@mail.com')
+        Contact.objects.create(full_name='John Other', phone='0201234567', created_by=other)
+
+    def search(self, search, **params):
+        cache.clear()
+        response = self.client.get('/api/contacts', {'search': search, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return sorted(contact['full_name'] for contact in response.data['results'])
+
+    def test_names_match_by_prefix(self):
+        self.assertEqual(self.search('john'), ['Ama Johnson', 'John Doe', 'Johnny Mensah'])
+        self.assertEqual(self.search('MENS'), ['Johnny Mensah'])
+
+    def test_emails_match_by_prefix(self):
+        self.assertEqual(self.search('kofi@'), ['Kofi Annan'])
+
+    def test_phones_match_by_prefix_in_any_format(self):
+        self.assertEqual(self.search('020'), ['Ama Johnson', 'John Doe'])
+        self.assertEqual(self.search('+233 24'), ['Johnny Mensah'])
+        self.assertEqual(self.search('233551'), ['Kofi Annan'])
+
+    def test_no_match(self):
+        self.assertEqual(self.search('zz'), [])
+
+    def test_search_combines_with_pagination(self):
+        response = self.client.get('/api/contacts', {'search': 'john', 'ordering': 'full_name', 'page_size': 2})
+        names = [contact['full_name'] for contact in response.data['results']]
+        response = self.client.get(response.data['next'])
+        names += [contact['full_name'] for contact in response.data['results']]
+        self.assertEqual(names, ['Ama Johnson', 'John Doe', 'Johnny Mensah'])
+        self.assertIsNone(response.data['next'])
+
+    @skipUnless(connection.vendor == 'postgresql', 'trigram search')
+    def test_names_match_fuzzily_and_are_ranked(self):
+        self.assertIn('John Doe', self.search('jhon'))
+        response = self.client.get('/api/contacts', {'search': 'john doe'})
+        self.assertEqual(response.data['results'][0]['full_name'], 'John Doe')
@@ -0,0 +1,84 @@
+from datetime import timedelta
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from src.message_logs.models import MessageLog, RecipientLog, RetrySchedule
+from api.counters import status_counter, update_counters, reconcile_counters
+from api.delivery_reports import apply_delivery_reports
+from api.retries import run_due_retries
+from api.sms_backends import locmem
+from api.utils import create_recipient_log
+
+User = get_user_model()
+
+
+def counters(message_log):
+    message_log.refresh_from_db()
+    return (message_log.total_count, message_log.success_count, message_log.failed_count, message_log.pending_count)
+
+
+@override_settings(SMS_BACKEND='api.sms_backends.locmem.SMSBackend', SMS_RETRY_MAX_ATTEMPTS=3)
+class MessageLogCountersTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        locmem.outbox.clear()
+        self.user = User.objects.create_user(username='test_user', password='password', email='test@mail.com')
+        self.message_log = MessageLog.objects.create(content='Hello', author_id=self.user)
+
+    def send(self, *statuses):
+        results = [
+            {'number': f'+23320000000{i}', 'status': status, 'messageId': f'ATXid_{i}'}
+            for i, status in enumerate(statuses)
+        ]
+        create_recipient_log(self.message_log, results, self.user)
+
+    def test_statuses_are_classified(self):
+        self.assertEqual(
+            [status_counter(status) for status in ('Success', 'Delivered', 'Failed', 'Rejected', 'RiskHold', 'Sent', None)],
+            ['success_count', 'success_count', 'failed_count', 'failed_count', 'failed_count', 'pending_count', 'pending_count'],
+        )
+
+    def test_new_recipients_are_counted(self):
+        self.send('Success', 'Failed', 'Sent')
+        self.assertEqual(counters(self.message_log), (3, 1, 1, 1))
+
+    def test_delivery_reports_move_recipients_between_counters(self):
+        self.send('Sent', 'Sent', 'Sent')
+        apply_delivery_reports({'ATXid_0': ('Delivered', timezone.now()), 'ATXid_1': ('Rejected', timezone.now())})
+        self.assertEqual(counters(self.message_log), (3, 1, 1, 1))
+
+    def test_retries_move_recipients_between_counters(self):
+        self.send('Failed', 'Success')
+        RetrySchedule.objects.update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(run_due_retries(), 1)
+        self.assertEqual(counters(self.message_log), (2, 2, 0, 0))
+
+    def test_messages_with_the_same_deltas_share_an_update(self):
+        other = MessageLog.objects.create(content='Hi', author_id=self.user)
+        changes = [(self.message_log, None, 'Success'), (other, None, 'Success'), (other, None, 'Failed')]
+        with self.assertNumQueries(2):
+            update_counters(changes)
+        self.assertEqual(counters(self.message_log), (1, 1, 0, 0))
+        self.assertEqual(counters(other), (2, 1, 1, 0))
+
+    def test_drifted_counters_do_not_go_negative(self):
+        update_counters([(self.message_log, 'Sent', 'Delivered')])
+        self.assertEqual(counters(self.message_log), (0, 1, 0, 0))
+
+    def test_reconcile_fixes_drift(self):
+        self.send('Success', 'Failed', 'Sent')
+        RecipientLog.objects.create(message_id=self.message_log, status='Delivered')
+        untouched = MessageLog.objects.create(content='Hi', author_id=self.user)
+
+        self.assertEqual(reconcile_counters(batch_size=1, dry_run=True), 1)
+        self.assertEqual(counters(self.message_log), (3, 1, 1, 1))
+
+        out = StringIO()
+        call_command('reconcile_message_counters', '--batch-size', '1', stdout=out)
+        self.assertIn('Fixed the counters of 1 message logs', out.getvalue())
+        self.assertEqual(counters(self.message_log), (4, 2, 1, 1))
+        self.assertEqual(counters(untouched), (0, 0, 0, 0))
+        self.assertEqual(reconcile_counters(), 0)
@@ -0,0 +1,46 @@
+import threading
+import time
+
+from django.test import SimpleTestCase, override_settings
+from api.dispatch import dispatch
+from api.sms_backends import SMSBackendError
+from api.sms_backends.locmem import SMSBackend as LocmemBackend
+
+
+class SlowBackend(LocmemBackend):
+    in_flight = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def send_batch(self, message, numbers, sender=None):
+        cls = SlowBackend
+        with cls.lock:
+            cls.in_flight += 1
+            cls.peak = max(cls.peak, cls.in_flight)
+        time.sleep(0.01)
+        with cls.lock:
+            cls.in_flight -= 1
+        if message == 'fail':
+            raise SMSBackendError('rejected')
+        return super().send_batch(message, numbers, sender)
+
+
+@override_settings(SMS_BACKEND='tests.test_api.test_dispatch.SlowBackend', SMS_RATE_LIMIT_PER_SECOND=0)
+class DispatchTestCase(SimpleTestCase):
+    def setUp(self):
+        SlowBackend.peak = 0
+
+    def test_results_keep_batch_order(self):
+        batches = [(f'Hi {i}', [f'+2332000000{i:02d}']) for i in range(20)]
+        results = dispatch(batches, concurrency=4)
+        self.assertEqual([r[0]['number'] for r in results], [numbers[0] for _, numbers in batches])
+
+    def test_concurrency_is_bounded(self):
+        dispatch([(f'Hi {i}', ['+233200000001']) for i in range(20)], concurrency=3)
+        self.assertGreater(SlowBackend.peak, 1)
+        self.assertLessEqual(SlowBackend.peak, 3)
+
+    def test_provider_error_fails_the_batch_recipients(self):
+        results = dispatch([('Hi', ['+233200000001']), ('fail', ['+233200000002', '+233200000003'])], concurrency=2)
+        self.assertEqual(results[0][0]['status'], 'Success')
+        self.assertEqual([(r['number'], r['status']) for r in results[1]], [('+233200000002', 'Failed'), ('+233200000003', 'Failed')])
@@ -0,0 +1,142 @@
+from datetime import timedelta
+from unittest import mock
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.test import override_settings
+from django.utils import timezone
+from src.contacts.models import Contact
+from src.message_logs.models import MessageLog
+from src.msg_templates.models import Template, ContactTemplate
+from src.send_jobs.models import SendJob
+from api.models import IdempotencyKey
+from api.idempotency import purge_expired_keys
+from api.jobs import run_pending_jobs
+from api.sms_backends import locmem
+
+User = get_user_model()
+
+
+@override_settings(SMS_BACKEND='api.sms_backends.locmem.SMSBackend')
+class IdempotencyKeyTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='test_user', password='password', email='test@mail.com')
+        self.client.force_authenticate(user=self.user)
+        Contact.objects.create(full_name='John Doe', phone='+233200000001', created_by=self.user)
+        self.payload = {'message': 'Hello', 'contacts': ['+233200000001']}
+
+    def send(self, payload=None, key='key-1'):
+        return self.client.post('/api/send-message', payload or self.payload, format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_replays_the_first_response(self):
+        first = self.send()
+        second = self.send()
+        self.assertEqual(first.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(second.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+        self.assertEqual(SendJob.objects.count(), 1)
+
+    def test_different_keys_send_twice(self):
+        self.send(key='key-1')
+        self.send(key='key-2')
+        self.assertEqual(SendJob.objects.count(), 2)
+
+    def test_reused_key_with_another_payload_is_rejected(self):
+        self.send()
+        response = self.send({'message': 'Bye', 'contacts': ['+233200000001']})
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(SendJob.objects.count(), 1)
+
+    def test_keys_are_scoped_to_the_user(self):
+        self.send()
+        other = User.objects.create_user(username='other', password='password', email='other@mail.com')
+        Contact.objects.create(full_name='John Doe', phone='+233200000001', created_by=other)
+        self.client.force_authenticate(user=other)
+        self.assertNotIn('Idempotent-Replayed', self.send())
+        self.assertEqual(SendJob.objects.count(), 2)
+
+    def test_expired_key_starts_over(self):
+        self.send()
+        IdempotencyKey.objects.update(created_at=timezone.now() - timedelta(days=2))
+        self.assertNotIn('Idempotent-Replayed', self.send())
+        self.assertEqual(SendJob.objects.count(), 2)
+
+    def test_expired_keys_are_purged(self):
+        self.send(key='key-1')
+        self.send(key='key-2')
+        IdempotencyKey.objects.filter(key='key-1').update(created_at=timezone.now() - timedelta(days=2))
+        self.assertEqual(purge_expired_keys(), 1)
+        self.assertEqual(list(IdempotencyKey.objects.values_list('key', flat=True)), ['key-2'])
+
+    def test_template_send_is_replayed(self):
+        template = Template.objects.create(name='promo', content='Hi', created_by=self.user)
+        ContactTemplate.objects.create(contact_id=Contact.objects.get(created_by=self.user), template_id=template)
+        first = self.client.post('/api/templates/promo/send', HTTP_IDEMPOTENCY_KEY='key-1')
+        second = self.client.post('/api/templates/promo/send', HTTP_IDEMPOTENCY_KEY='key-1')
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(SendJob.objects.count(), 1)
+
+
+@override_settings(SMS_BACKEND='api.sms_backends.locmem.SMSBackend', SMS_DEDUPE_WINDOW=10)
+class DedupeWindowTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        locmem.outbox.clear()
+        self.user = User.objects.create_user(username='test_user', password='password', email='test@mail.com')
+        self.client.force_authenticate(user=self.user)
+        self.contact1 = Contact.objects.create(full_name='John Doe', phone='+233200000001', created_by=self.user)
+        self.contact2 = Contact.objects.create(full_name='Jane Doe', phone='+233200000002', created_by=self.user)
+
+    def send(self, contacts, message='Hello', **headers):
+        # the window is only marked once the job commits
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post('/api/send-message', {'message': message, 'contacts': contacts}, format='json', **headers)
+
+    def test_identical_quick_send_is_dropped(self):
+        self.send(['+233200000001'])
+        response = self.send(['+233200000001', '+233200000002'])
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['duplicates'], ['+233200000001'])
+        self.assertEqual(SendJob.objects.get(pk=response.data['job_id']).recipients, ['+233200000002'])
+
+        response = self.send(['+233200000002'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(SendJob.objects.count(), 2)
+
+    def test_other_message_is_not_dropped(self):
+        self.send(['+233200000001'])
+        response = self.send(['+233200000001'], message='Bye')
+        self.assertEqual(response.data['duplicates'], [])
+
+    @override_settings(SMS_DEDUPE_WINDOW=0)
+    def test_window_can_be_disabled(self):
+        self.send(['+233200000001'])
+        response = self.send(['+233200000001'])
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+
+    def test_failed_enqueue_does_not_drop_the_retry(self):
+        self.client.raise_request_exception = False
+        with mock.patch('api.views.enqueue_quick_send', side_effect=DatabaseError('connection lost')):
+            response = self.send(['+233200000001'], HTTP_IDEMPOTENCY_KEY='key-1')
+        self.assertEqual(response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        response = self.send(['+233200000001'], HTTP_IDEMPOTENCY_KEY='key-1')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['duplicates'], [])
+        self.assertEqual(SendJob.objects.count(), 1)
+
+    def test_identical_template_render_is_dropped(self):
+        template = Template.objects.create(name='promo', content='Hi <full_name>', created_by=self.user)
+        ContactTemplate.objects.create(contact_id=self.contact1, template_id=template)
+        self.client.post('/api/templates/promo/send')
+        run_pending_jobs('worker-1')
+        ContactTemplate.objects.create(contact_id=self.contact2, template_id=template)
+        self.client.post('/api/templates/promo/send')
+        run_pending_jobs('worker-1')
+
+        self.assertEqual([numbers for _, numbers, _ in locmem.outbox], [['+233200000001'], ['+233200000002']])
+        self.assertEqual(MessageLog.objects.count(), 2)
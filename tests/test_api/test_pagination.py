@@ -0,0 +1,109 @@
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.db.models.functions import Length
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from api.pagination import KeysetPagination
+from src.contacts.models import Contact
+from src.msg_templates.models import Template
+
+User = get_user_model()
+
+
+class KeysetPaginationTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='test_user', password='password', email='test@mail.com')
+        self.client.force_authenticate(user=self.user)
+        for i, name in enumerate(['Esi', 'Ama', 'Kofi', 'Yaw', 'Abena']):
+            Contact.objects.create(full_name=name, phone=f'+23320000000{i}', created_by=self.user)
+        other = User.objects.create_user(username='other_user', password='password', email='other@mail.com')
+        Contact.objects.create(full_name='Someone Else', phone='+233200000009', created_by=other)
+
+    def walk(self, url, params):
+        names, pages = [], []
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pages.append(response.data)
+            names += [contact['full_name'] for contact in response.data['results']]
+            if not response.data['next']:
+                return names, pages
+            response = self.client.get(response.data['next'])
+
+    def test_pages_are_walked_forward_and_back(self):
+        names, pages = self.walk('/api/contacts', {'ordering': 'full_name', 'page_size': 2})
+        self.assertEqual(names, ['Abena', 'Ama', 'Esi', 'Kofi', 'Yaw'])
+        self.assertEqual(len(pages), 3)
+        self.assertIsNone(pages[0]['previous'])
+
+        response = self.client.get(pages[-1]['previous'])
+        self.assertEqual([c['full_name'] for c in response.data['results']], ['Esi', 'Kofi'])
+        response = self.client.get(response.data['previous'])
+        self.assertEqual([c['full_name'] for c in response.data['results']], ['Abena', 'Ama'])
+        self.assertIsNone(response.data['previous'])
+        self.assertIsNotNone(response.data['next'])
+
+    def test_ties_are_broken_by_primary_key(self):
+        first = Contact.objects.filter(created_by=self.user).first()
+        Contact.objects.filter(created_by=self.user).update(created_at=first.created_at)
+        names, _ = self.walk('/api/contacts', {'page_size': 2})
+        self.assertEqual(sorted(names), ['Abena', 'Ama', 'Esi', 'Kofi', 'Yaw'])
+
+    def test_default_ordering_is_newest_first(self):
+        response = self.client.get('/api/contacts')
+        self.assertEqual([c['full_name'] for c in response.data['results']], ['Abena', 'Yaw', 'Kofi', 'Ama', 'Esi'])
+        self.assertIsNone(response.data['next'])
+
+    def test_deep_pages_do_not_count_or_offset(self):
+        _, pages = self.walk('/api/contacts', {'page_size': 2})
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(pages[1]['next'])
+        sql = ' '.join(query['sql'] for query in queries).upper()
+        self.assertNotIn('COUNT(', sql)
+        self.assertNotIn('OFFSET', sql)
+
+    def test_annotations_can_be_sort_fields(self):
+        contacts = Contact.objects.filter(created_by=self.user).annotate(name_length=Length('full_name'))
+        names, params = [], {'page_size': 2}
+        while True:
+            paginator = KeysetPagination(('name_length',), '-name_length')
+            request = Request(APIRequestFactory().get('/api/contacts', params))
+            names += [contact.full_name for contact in paginator.paginate_queryset(contacts, request)]
+            if not paginator.next_cursor:
+                break
+            params['cursor'] = paginator.next_cursor
+        self.assertEqual(names[:2], ['Abena', 'Kofi'])
+        self.assertEqual(sorted(names[2:]), ['Ama', 'Esi', 'Yaw'])
+
+    def test_unindexed_ordering_is_rejected(self):
+        response = self.client.get('/api/contacts', {'ordering': 'info'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_tampered_cursor_is_rejected(self):
+        response = self.client.get('/api/contacts', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_cursor_of_another_ordering_is_rejected(self):
+        _, pages = self.walk('/api/contacts', {'page_size': 2})
+        cursor = pages[0]['next'].split('cursor=')[1].split('&')[0]
+        response = self.client.get('/api/contacts', {'cursor': cursor, 'ordering': 'full_name'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_page_size_is_validated_and_capped(self):
+        self.assertEqual(self.client.get('/api/contacts', {'page_size': 0}).status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get('/api/contacts', {'page_size': 1000})
+        self.assertEqual(len(response.data['results']), 5)
+
+    def test_template_list_returns_one_page(self):
+        for i in range(12):
+            Template.objects.create(name=f'Template {i}', content='Hi', created_by=self.user)
+        response = self.client.get('/api/templates')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 10)
+        self.assertIsNotNone(response.data['next'])
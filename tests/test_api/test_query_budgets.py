@@ -0,0 +1,181 @@
+import re
+import shutil
+import tempfile
+from collections import Counter
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, reset_queries, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from api import urls
+from api.query_budgets import QUERY_BUDGETS
+from src.contacts.models import Contact, ContactImport
+from src.message_logs.models import MessageLog, RecipientLog, DeadLetter
+from src.msg_templates.models import Template, ContactTemplate
+from src.send_jobs.models import SendJob
+
+User = get_user_model()
+
+SIZES = (10, 1000, 10000)
+MEDIA_ROOT = tempfile.mkdtemp()
+LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+# routes authenticated by a query parameter rather than the user
+QUERY_STRINGS = {'delivery-reports': '?token=callback-token'}
+
+
+def duplicated_queries(queries):
+    """The statements run more than once, literals masked, most repeated first."""
+    statements = Counter(LITERALS.sub('?', query['sql']) for query in queries)
+    return [(count, sql) for sql, count in statements.most_common() if count > 1]
+
+
+def budget_failure(route, method, budget, counts, captured):
+    lines = [f'{method} {route}: {budget!r}, ran ' + ', '.join(f'{counts[size]} queries at {size} rows' for size in SIZES)]
+    for count, sql in duplicated_queries(captured)[:10]:
+        lines.append(f'  {count}x {sql[:300]}')
+    return '\n'.join(lines)
+
+
+@override_settings(
+    SMS_BACKEND='api.sms_backends.locmem.SMSBackend',
+    SMS_RATE_LIMIT_BURST=10 ** 6,
+    SMS_RATE_LIMIT_PER_SECOND=10 ** 6,
+    DLR_BATCH_SIZE=1000,
+    DLR_CALLBACK_TOKEN='callback-token',
+    MEDIA_ROOT=MEDIA_ROOT,
+)
+class QueryBudgetTestCase(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def seed(self, size):
+        user = User.objects.create_user(username='test_user', password='password', email='test@mail.com')
+        numbers = [f'+2332{i:08d}' for i in range(size)]
+        contacts = Contact.objects.bulk_create(
+            [Contact(full_name=f'Contact {i}', phone=number, phone_e164=number, created_by=user) for i, number in enumerate(numbers)]
+        )
+        promo = Template.objects.create(name='Promo', content='Hi <full_name>', created_by=user)
+        Template.objects.create(name='Empty', content='Hi', created_by=user)
+        Template.objects.create(name='Spare', content='Hi', created_by=user)
+        ContactTemplate.objects.bulk_create([ContactTemplate(contact_id=contact, template_id=promo) for contact in contacts])
+
+        job = SendJob.objects.create(kind=SendJob.QUICK, created_by=user, message='Hello', recipients=numbers, total=size)
+        logs = MessageLog.objects.bulk_create(
+            [MessageLog(content=f'Message {i}', author_id=user) for i in range(size // 10)]
+        )
+        RecipientLog.objects.bulk_create(
+            [RecipientLog(message_id=log, contact_id=contacts[i], status='Success') for log in logs for i in range(10)]
+        )
+        # the latest log, sent to every contact
+        broadcast = MessageLog.objects.create(content='Hello', author_id=user, job_id=job)
+        recipient_logs = RecipientLog.objects.bulk_create(
+            [
+                RecipientLog(message_id=broadcast, contact_id=contact, phone=contact.phone, status='Failed', provider_message_id=f'ATXid_{i}')
+                for i, contact in enumerate(contacts)
+            ]
+        )
+        dead_letters = DeadLetter.objects.bulk_create(
+            [
+                DeadLetter(recipient_log_id=recipient_log, author_id=user, phone=recipient_log.phone, content='Hello', attempts=3, last_status='Failed')
+                for recipient_log in recipient_logs[: size // 10]
+            ]
+        )
+        contact_import = ContactImport.objects.create(created_by=user, file='contact_imports/contacts.csv', file_format=ContactImport.CSV)
+        return {
+            'user': user,
+            'numbers': numbers,
+            'broadcast': broadcast,
+            'job': job,
+            'dead_letter': dead_letters[0],
+            'contact_import': contact_import,
+        }
+
+    def scenarios(self, seeded):
+        """(route, method, path kwargs, request data, expected status), run in order on the same data."""
+        numbers = seeded['numbers']
+        upload = SimpleUploadedFile('contacts.csv', b'full_name,phone\nJohn Doe,+233209999999\n', content_type='text/csv')
+        return [
+            ('contacts-view', 'GET', {}, None, 200),
+            ('contacts-view', 'POST', {}, {'full_name': 'New Contact', 'phone': '+233299999999'}, 201),
+            ('contacts-export', 'GET', {}, None, 200),
+            ('contacts-import', 'POST', {}, {'file': upload}, 202),
+            ('contacts-import-detail', 'GET', {'importId': seeded['contact_import'].id}, None, 200),
+            ('contacts-detail', 'GET', {'contactFullName': 'Contact 0'}, None, 200),
+            ('contacts-detail', 'PUT', {'contactFullName': 'Contact 0'}, {'info': 'VIP'}, 200),
+            ('send-message', 'POST', {}, {'message': 'Hello', 'contacts': numbers}, 202),
+            ('message-logs', 'GET', {}, None, 200),
+            ('message-logs-export', 'GET', {}, None, 200),
+            ('mmessage-log-detail', 'GET', {'messageId': seeded['broadcast'].id}, None, 200),
+            ('resend-message', 'POST', {'messageId': seeded['broadcast'].id}, None, 204),
+            ('edit-resend-message', 'POST', {'messageId': seeded['broadcast'].id}, {'content': 'Hello again'}, 204),
+            ('template-view', 'GET', {}, None, 200),
+            ('template-view', 'POST', {}, {'name': 'New', 'content': 'Hi'}, 201),
+            ('template-detail', 'GET', {'templateName': 'Promo'}, None, 200),
+            ('template-detail', 'PUT', {'templateName': 'Promo'}, {'content': 'Hello <full_name>'}, 200),
+            ('template-contacts', 'GET', {'templateName': 'Promo'}, None, 200),
+            ('template-contacts', 'POST', {'templateName': 'Empty'}, {'contacts': numbers}, 201),
+            ('send-template', 'POST', {'templateName': 'Promo'}, None, 202),
+            ('send-job-detail', 'GET', {'jobId': seeded['job'].id}, None, 200),
+            ('rate-limit', 'GET', {}, None, 200),
+            ('delivery-reports', 'POST', {}, [{'id': f'ATXid_{i}', 'status': 'Delivered'} for i in range(len(numbers))], 200),
+            ('delivery-analytics', 'GET', {}, None, 200),
+            ('dead-letters', 'GET', {}, None, 200),
+            ('requeue-dead-letter', 'POST', {'deadLetterId': seeded['dead_letter'].id}, None, 202),
+            ('template-contacts', 'DELETE', {'templateName': 'Promo'}, {'contacts': numbers}, 200),
+            ('template-detail', 'DELETE', {'templateName': 'Spare'}, None, 204),
+            ('contacts-detail', 'DELETE', {'contactFullName': 'Contact 1'}, None, 204),
+        ]
+
+    def request(self, client, method, path, data):
+        if method == 'GET':
+            return client.get(path)
+        multipart = data is not None and 'file' in data
+        return getattr(client, method.lower())(path, data, format='multipart' if multipart else 'json')
+
+    def run_scenarios(self, size):
+        """Seed `size` rows, run every scenario and return {(route, method): captured queries}."""
+        captured = {}
+        with transaction.atomic():
+            seeded = self.seed(size)
+            client = APIClient()
+            client.force_authenticate(user=seeded['user'])
+            for route, method, kwargs, data, expected_status in self.scenarios(seeded):
+                cache.clear()
+                # seeding alone can fill the connection's query log, which CaptureQueriesContext reads
+                reset_queries()
+                path = reverse(route, kwargs=kwargs) + QUERY_STRINGS.get(route, '')
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.request(client, method, path, data)
+                    if response.streaming:
+                        b''.join(response.streaming_content)
+                self.assertEqual(response.status_code, expected_status, f'{method} {route} at {size} rows')
+                captured[route, method] = queries.captured_queries
+            transaction.set_rollback(True)
+        return captured
+
+    def test_every_route_has_a_budget(self):
+        for pattern in urls.urlpatterns:
+            view_class = pattern.callback.view_class
+            methods = {
+                method.upper() for method in view_class.http_method_names
+                if method not in ('options', 'head') and hasattr(view_class, method)
+            }
+            self.assertEqual(set(QUERY_BUDGETS.get(pattern.name, {})), methods, pattern.name)
+
+    def test_queries_stay_within_budget(self):
+        runs = {size: self.run_scenarios(size) for size in SIZES}
+        for route, methods in QUERY_BUDGETS.items():
+            for method, budget in methods.items():
+                self.assertIn((route, method), runs[SIZES[0]], f'no scenario for {method} {route}')
+                counts = {size: len(runs[size][route, method]) for size in SIZES}
+                largest = runs[SIZES[-1]][route, method]
+                with self.subTest(route=route, method=method):
+                    failure = budget_failure(route, method, budget, counts, largest)
+                    self.assertLessEqual(max(counts.values()), budget.max_queries, failure)
+                    if budget.constant:
+                        self.assertEqual(len(set(counts.values())), 1, failure)
@@ -0,0 +1,59 @@
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from src.contacts.models import Contact
+from src.message_logs.models import MessageLog, RecipientLog
+from api.rate_limit import RateLimited, TokenBucket
+
+User = get_user_model()
+
+
+class TokenBucketTestCase(TestCase):
+    def test_tokens_are_taken_until_empty(self):
+        bucket = TokenBucket('test', rate=1, capacity=10)
+        bucket.acquire(4, max_wait=0)
+        self.assertAlmostEqual(bucket.fill_level()['tokens'], 6, places=1)
+        with self.assertRaises(RateLimited) as raised:
+            bucket.acquire(10, max_wait=0)
+        self.assertGreater(raised.exception.retry_after, 3)
+
+    def test_partial_take_is_given_back_when_limited(self):
+        bucket = TokenBucket('test', rate=0.01, capacity=5)
+        with self.assertRaises(RateLimited):
+            bucket.acquire(12, max_wait=0)
+        self.assertAlmostEqual(bucket.fill_level()['tokens'], 5, places=1)
+        bucket.acquire(5, max_wait=0)
+
+    def test_buckets_are_keyed_by_account(self):
+        TokenBucket('account-a', rate=1, capacity=5).acquire(5, max_wait=0)
+        TokenBucket('account-b', rate=1, capacity=5).acquire(5, max_wait=0)
+
+
+@override_settings(
+    SMS_BACKEND='api.sms_backends.locmem.SMSBackend',
+    SMS_RATE_LIMIT_PER_SECOND=0.01,
+    SMS_RATE_LIMIT_BURST=1,
+    SMS_RATE_LIMIT_MAX_WAIT=0,
+)
+class RateLimitViewTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='test_user', password='password', email='test@mail.com')
+        self.client.force_authenticate(user=self.user)
+
+    def test_fill_level(self):
+        response = self.client.get('/api/rate-limit')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['key'], 'locmem')
+        self.assertEqual(response.data['capacity'], 1)
+
+    def test_resend_answers_429_when_bucket_is_empty(self):
+        contact1 = Contact.objects.create(full_name='John Doe', phone='+233200000001', created_by=self.user)
+        contact2 = Contact.objects.create(full_name='Jane Doe', phone='+233200000002', created_by=self.user)
+        message = MessageLog.objects.create(content='Hello', author_id=self.user)
+        RecipientLog.objects.create(message_id=message, contact_id=contact1, status='Success')
+        RecipientLog.objects.create(message_id=message, contact_id=contact2, status='Success')
+
+        response = self.client.post(f'/api/message-logs/{message.id}/resend')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertGreater(int(response['Retry-After']), 0)
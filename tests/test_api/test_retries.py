@@ -0,0 +1,116 @@
+from datetime import timedelta
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from django.utils import timezone
+from src.message_logs.models import MessageLog, RecipientLog, RetrySchedule, DeadLetter
+from api.retries import backoff, run_due_retries
+from api.utils import create_recipient_log
+from api.jobs import enqueue_quick_send, run_pending_jobs
+from api.sms_backends import locmem, SMSBackendError
+from src.send_jobs.models import SendJob
+
+User = get_user_model()
+
+
+@override_settings(SMS_RETRY_BASE_DELAY=60, SMS_RETRY_MAX_DELAY=600)
+class BackoffTestCase(SimpleTestCase):
+    def test_delay_grows_and_is_capped(self):
+        for attempts, ceiling in [(1, 60), (2, 120), (3, 240), (10, 600)]:
+            delay = backoff(attempts).total_seconds()
+            self.assertGreaterEqual(delay, ceiling / 2)
+            self.assertLessEqual(delay, ceiling)
+
+
+@override_settings(SMS_BACKEND='api.sms_backends.locmem.SMSBackend', SMS_RETRY_MAX_ATTEMPTS=2)
+class RetryTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        locmem.outbox.clear()
+        self.user = User.objects.create_user(username='test_user', password='password', email='test@mail.com')
+        self.client.force_authenticate(user=self.user)
+        self.message_log = MessageLog.objects.create(content='Hello', author_id=self.user)
+
+    def fail(self, number='+233200000001'):
+        create_recipient_log(self.message_log, [{'number': number, 'status': 'Failed'}], self.user)
+        return RecipientLog.objects.get(message_id=self.message_log, phone=number)
+
+    def make_due(self):
+        RetrySchedule.objects.update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+
+    def test_failed_recipient_is_scheduled(self):
+        recipient_log = self.fail()
+        self.assertTrue(RetrySchedule.objects.filter(recipient_log_id=recipient_log).exists())
+
+    def test_successful_recipient_is_not_scheduled(self):
+        create_recipient_log(self.message_log, [{'number': '+233200000001', 'status': 'Success'}], self.user)
+        self.assertFalse(RetrySchedule.objects.exists())
+
+    def test_retry_is_not_sent_before_it_is_due(self):
+        self.fail()
+        self.assertEqual(run_due_retries(), 0)
+        self.assertEqual(locmem.outbox, [])
+
+    def test_due_retry_is_resent(self):
+        recipient_log = self.fail()
+        self.make_due()
+        self.assertEqual(run_due_retries(), 1)
+
+        recipient_log.refresh_from_db()
+        self.assertEqual(recipient_log.status, 'Success')
+        self.assertEqual(recipient_log.attempts, 2)
+        self.assertEqual(locmem.outbox, [('Hello', ['+233200000001'], None)])
+        self.assertFalse(RetrySchedule.objects.exists())
+
+    @override_settings(SMS_RETRY_MAX_ATTEMPTS=1)
+    def test_exhausted_recipient_is_dead_lettered(self):
+        recipient_log = self.fail()
+        self.assertFalse(RetrySchedule.objects.exists())
+        dead_letter = DeadLetter.objects.get(recipient_log_id=recipient_log)
+        self.assertEqual((dead_letter.phone, dead_letter.content, dead_letter.last_status), ('+233200000001', 'Hello', 'Failed'))
+
+    @override_settings(SMS_RETRY_MAX_ATTEMPTS=1)
+    def test_dead_letters_can_be_listed_and_requeued(self):
+        recipient_log = self.fail()
+        response = self.client.get('/api/dead-letters')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([d['phone'] for d in response.data['results']], ['+233200000001'])
+
+        response = self.client.post(f"/api/dead-letters/{response.data['results'][0]['id']}/requeue")
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertFalse(DeadLetter.objects.exists())
+
+        self.assertEqual(run_due_retries(), 1)
+        recipient_log.refresh_from_db()
+        self.assertEqual((recipient_log.status, recipient_log.attempts), ('Success', 1))
+
+    @override_settings(SMS_RETRY_MAX_ATTEMPTS=1)
+    def test_dead_letter_of_another_user_is_hidden(self):
+        self.fail()
+        other = User.objects.create_user(username='other', password='password', email='other@mail.com')
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self.client.get('/api/dead-letters').data['results'], [])
+        dead_letter = DeadLetter.objects.get()
+        response = self.client.post(f'/api/dead-letters/{dead_letter.id}/requeue')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class FailingBackend(locmem.SMSBackend):
+    def send_batch(self, message, numbers, sender=None):
+        raise SMSBackendError('unavailable')
+
+
+@override_settings(SMS_BACKEND='tests.test_api.test_retries.FailingBackend')
+class FailingJobTestCase(APITestCase):
+    def test_job_completes_and_schedules_its_failed_recipients(self):
+        user = User.objects.create_user(username='test_user', password='password', email='test@mail.com')
+        job = enqueue_quick_send(user, 'Hello', ['+233200000001', '+233200000002'])
+        run_pending_jobs('worker-1')
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, SendJob.COMPLETED)
+        logs = RecipientLog.objects.filter(message_id__job_id=job)
+        self.assertEqual([log.status for log in logs], ['Failed', 'Failed'])
+        self.assertEqual(RetrySchedule.objects.count(), 2)
@@ -0,0 +1,148 @@
+from datetime import timedelta
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from django.utils import timezone
+from src.contacts.models import Contact
+from src.msg_templates.models import Template, ContactTemplate
+from src.send_jobs.models import SendJob
+from api.jobs import run_pending_jobs
+from api.scheduler import JobScheduler, try_acquire_leadership
+from api.sms_backends import locmem
+
+User = get_user_model()
+
+
+@override_settings(SMS_BACKEND='api.sms_backends.locmem.SMSBackend', SEND_JOB_CHUNK_SIZE=2)
+class ScheduledSendTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        locmem.outbox.clear()
+        self.user = User.objects.create_user(username='test_user', password='password', email='test@mail.com')
+        self.client.force_authenticate(user=self.user)
+        self.numbers = [f'+23320000000{i}' for i in range(5)]
+        for i, number in enumerate(self.numbers):
+            Contact.objects.create(full_name=f'Contact {i}', phone=number, created_by=self.user)
+
+    def make_due(self, job):
+        SendJob.objects.filter(pk=job.pk).update(send_at=timezone.now() - timedelta(seconds=1))
+
+    def test_future_send_is_scheduled(self):
+        send_at = timezone.now() + timedelta(hours=1)
+        response = self.client.post('/api/send-message', {'message': 'Hello', 'contacts': self.numbers, 'send_at': send_at.isoformat()}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        job = SendJob.objects.get(pk=response.data['job_id'])
+        self.assertEqual((job.status, job.send_at), (SendJob.SCHEDULED, send_at))
+        self.assertEqual(run_pending_jobs('worker-1'), 0)
+
+    def test_past_send_at_is_sent_now(self):
+        send_at = timezone.now() - timedelta(hours=1)
+        response = self.client.post('/api/send-message', {'message': 'Hello', 'contacts': self.numbers, 'send_at': send_at.isoformat()}, format='json')
+        self.assertEqual(SendJob.objects.get(pk=response.data['job_id']).status, SendJob.PENDING)
+
+    def test_invalid_rate_is_rejected(self):
+        response = self.client.post('/api/send-message', {'message': 'Hello', 'contacts': self.numbers, 'rate_per_minute': 0}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_scheduler_releases_due_jobs_only(self):
+        later = SendJob.objects.create(kind=SendJob.QUICK, created_by=self.user, message='Later', recipients=self.numbers,
+                                       total=5, status=SendJob.SCHEDULED, send_at=timezone.now() + timedelta(minutes=5))
+        due = SendJob.objects.create(kind=SendJob.QUICK, created_by=self.user, message='Now', recipients=self.numbers,
+                                     total=5, status=SendJob.SCHEDULED, send_at=timezone.now() + timedelta(minutes=1))
+        scheduler = JobScheduler(lookahead=600, refresh=30)
+        self.assertEqual(scheduler.run_once(), 0)
+        self.assertEqual(len(scheduler.heap), 2)
+        self.assertLessEqual(scheduler.seconds_until_next(), 30)
+
+        self.make_due(due)
+        self.assertEqual(JobScheduler(lookahead=600, refresh=30).run_once(), 1)
+        self.assertEqual(SendJob.objects.get(pk=due.pk).status, SendJob.PENDING)
+        self.assertEqual(SendJob.objects.get(pk=later.pk).status, SendJob.SCHEDULED)
+
+    def test_rescheduled_job_is_not_released_early(self):
+        job = SendJob.objects.create(kind=SendJob.QUICK, created_by=self.user, message='Hello', recipients=self.numbers,
+                                     total=5, status=SendJob.SCHEDULED, send_at=timezone.now() - timedelta(seconds=1))
+        scheduler = JobScheduler(lookahead=600, refresh=30)
+        scheduler.refresh()
+        SendJob.objects.filter(pk=job.pk).update(send_at=timezone.now() + timedelta(hours=1))
+        self.assertEqual(scheduler.release_due(), 0)
+        self.assertEqual(SendJob.objects.get(pk=job.pk).status, SendJob.SCHEDULED)
+
+    def test_paced_quick_send_goes_out_in_slices(self):
+        response = self.client.post('/api/send-message', {'message': 'Hello', 'contacts': self.numbers, 'rate_per_minute': 3}, format='json')
+        job = SendJob.objects.get(pk=response.data['job_id'])
+
+        run_pending_jobs('worker-1')
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.processed), (SendJob.SCHEDULED, 3))
+        self.assertGreater(job.send_at, timezone.now() + timedelta(seconds=50))
+        self.assertEqual([numbers for _, numbers, _ in locmem.outbox], [self.numbers[:2], self.numbers[2:3]])
+
+        self.make_due(job)
+        JobScheduler().run_once()
+        run_pending_jobs('worker-1')
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.processed), (SendJob.COMPLETED, 5))
+
+    def test_paced_template_send_goes_out_in_slices(self):
+        template = Template.objects.create(name='promo', content='Hi <full_name>', created_by=self.user)
+        for contact in Contact.objects.all():
+            ContactTemplate.objects.create(contact_id=contact, template_id=template)
+        response = self.client.post('/api/templates/promo/send', {'rate_per_minute': 4})
+        job = SendJob.objects.get(pk=response.data['job_id'])
+
+        run_pending_jobs('worker-1')
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.processed), (SendJob.SCHEDULED, 4))
+        template.refresh_from_db()
+        self.assertIsNone(template.last_sent)
+
+        self.make_due(job)
+        JobScheduler().run_once()
+        run_pending_jobs('worker-1')
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.processed), (SendJob.COMPLETED, 5))
+        self.assertEqual(len(locmem.outbox), 5)
+
+    def test_template_send_options_can_be_posted_as_json(self):
+        template = Template.objects.create(name='promo', content='Hi <full_name>', created_by=self.user)
+        for contact in Contact.objects.all():
+            ContactTemplate.objects.create(contact_id=contact, template_id=template)
+        send_at = timezone.now() + timedelta(hours=1)
+        response = self.client.post(
+            '/api/templates/promo/send', {'send_at': send_at.isoformat(), 'rate_per_minute': 4}, format='json'
+        )
+        self.assertEqual(response.status_code, 202)
+        job = SendJob.objects.get(pk=response.data['job_id'])
+        self.assertEqual((job.status, job.send_at, job.rate_per_minute), (SendJob.SCHEDULED, send_at, 4))
+
+    def test_paced_template_send_resumes_after_the_last_contact_sent(self):
+        template = Template.objects.create(name='promo', content='Hi <full_name>', created_by=self.user)
+        contacts = list(Contact.objects.order_by('id')[:4])
+        for contact in contacts:
+            ContactTemplate.objects.create(contact_id=contact, template_id=template)
+        response = self.client.post('/api/templates/promo/send', {'rate_per_minute': 2})
+        job = SendJob.objects.get(pk=response.data['job_id'])
+
+        run_pending_jobs('worker-1')
+        job.refresh_from_db()
+        self.assertEqual(job.last_contact_id, contacts[1].id)
+        # an offset would now skip contacts[2]
+        ContactTemplate.objects.filter(contact_id=contacts[0]).delete()
+
+        # the second slice ends on the limit, a third finds nothing left
+        for _ in range(2):
+            self.make_due(job)
+            JobScheduler().run_once()
+            run_pending_jobs('worker-1')
+        job.refresh_from_db()
+        self.assertEqual(job.status, SendJob.COMPLETED)
+        self.assertCountEqual(
+            [number for _, numbers, _ in locmem.outbox for number in numbers],
+            [contact.phone for contact in contacts],
+        )
+
+    def test_leadership_without_advisory_locks(self):
+        self.assertTrue(try_acquire_leadership())
@@ -0,0 +1,32 @@
+from io import StringIO
+from unittest import mock
+from django.db import DatabaseError
+from django.test import SimpleTestCase
+from api.management.commands.run_send_worker import Command
+
+
+class Stop(Exception):
+    pass
+
+
+@mock.patch('api.management.commands.run_send_worker.run_pending_delivery_reports', return_value=0)
+@mock.patch('api.management.commands.run_send_worker.run_pending_imports', return_value=0)
+@mock.patch('api.management.commands.run_send_worker.run_due_retries', return_value=0)
+@mock.patch('api.management.commands.run_send_worker.run_pending_jobs')
+class SendWorkerTestCase(SimpleTestCase):
+    options = {'batch_size': 1, 'sleep': 2.0, 'once': False}
+
+    @mock.patch('api.management.commands.run_send_worker.time.sleep', side_effect=[None, Stop])
+    def test_failed_round_is_logged_and_the_worker_goes_on(self, sleep, run_pending_jobs, *_):
+        run_pending_jobs.side_effect = [DatabaseError('connection lost'), 0]
+        with self.assertLogs('api.management.commands.run_send_worker', 'ERROR') as logs, self.assertRaises(Stop):
+            Command(stdout=StringIO()).work(self.options)
+        self.assertEqual(run_pending_jobs.call_count, 2)
+        sleep.assert_called_with(2.0)
+        self.assertIn('connection lost', logs.output[0])
+
+    def test_once_stops_after_a_failed_round(self, run_pending_jobs, *_):
+        run_pending_jobs.side_effect = DatabaseError('connection lost')
+        with self.assertLogs('api.management.commands.run_send_worker', 'ERROR'):
+            Command(stdout=StringIO()).work({**self.options, 'once': True})
+        self.assertEqual(run_pending_jobs.call_count, 1)
@@ -0,0 +1,56 @@
+from unittest import mock
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, override_settings
+from api.send_sms import send_sms
+from api.sms_backends import get_backend, SMSBackendError, locmem
+from api.sms_backends.africastalking import SANDBOX_URL
+
+
+def provider_reply(status_code=201, payload=None):
+    response = mock.Mock(status_code=status_code, text='provider says no')
+    response.json.return_value = payload or {
+        'SMSMessageData': {'Recipients': [{'number': '+233200000001', 'status': 'Success', 'messageId': 'ATXid_1'}]}
+    }
+    return response
+
+
+@override_settings(SMS_BACKEND='api.sms_backends.locmem.SMSBackend', SMS_RATE_LIMIT_PER_SECOND=0)
+class LocmemBackendTestCase(SimpleTestCase):
+    def setUp(self):
+        locmem.outbox.clear()
+
+    def test_send_sms_uses_configured_backend(self):
+        results = send_sms('Hello', ['+233200000001', '+233200000002'])
+        self.assertEqual([r['number'] for r in results], ['+233200000001', '+233200000002'])
+        self.assertTrue(all(r['status'] == 'Success' for r in results))
+        self.assertEqual(locmem.outbox, [('Hello', ['+233200000001', '+233200000002'], None)])
+
+
+@override_settings(
+    SMS_BACKEND='api.sms_backends.africastalking.SMSBackend',
+    AFRICASTALKING_USERNAME='sandbox',
+    AFRICASTALKING_API_KEY='key',
+)
+class AfricasTalkingBackendTestCase(SimpleTestCase):
+    def test_session_is_reused_across_sends(self):
+        backend = get_backend()
+        with mock.patch('requests.Session.post', return_value=provider_reply()) as post:
+            backend.send_batch('Hello', ['+233200000001'])
+            session = backend.session
+            results = backend.send_batch('Hello', ['+233200000001'])
+
+        self.assertIs(backend.session, session)
+        self.assertEqual(post.call_count, 2)
+        self.assertEqual(post.call_args.args[0], SANDBOX_URL)
+        self.assertEqual(results[0]['messageId'], 'ATXid_1')
+
+    def test_provider_error_raises(self):
+        with mock.patch('requests.Session.post', return_value=provider_reply(status_code=401)):
+            with self.assertRaises(SMSBackendError):
+                get_backend().send_batch('Hello', ['+233200000001'])
+
+    @override_settings(AFRICASTALKING_API_KEY='')
+    def test_missing_credentials(self):
+        with self.assertRaises(ImproperlyConfigured):
+            get_backend().send_batch('Hello', ['+233200000001'])
@@ -0,0 +1,91 @@
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from src.contacts.models import Contact
+from src.msg_templates.models import Template, ContactTemplate
+from src.send_jobs.models import SendJob
+from api.jobs import run_pending_jobs
+from api.sms_encoding import analyze, transliterate, GSM7, UCS2
+from api.sms_backends import locmem
+
+User = get_user_model()
+
+
+class AnalyzeTestCase(SimpleTestCase):
+    def test_gsm7_single_segment(self):
+        info = analyze('a' * 160)
+        self.assertEqual((info.encoding, info.length, info.segments), (GSM7, 160, 1))
+
+    def test_gsm7_concatenated(self):
+        self.assertEqual(analyze('a' * 161).segments, 2)
+        self.assertEqual(analyze('a' * 306).segments, 2)
+        self.assertEqual(analyze('a' * 307).segments, 3)
+
+    def test_extension_characters_count_twice(self):
+        info = analyze('€' * 80 + '[')
+        self.assertEqual((info.encoding, info.length, info.segments), (GSM7, 162, 2))
+
+    def test_one_curly_quote_switches_to_ucs2(self):
+        info = analyze('It’s on sale ' + 'a' * 100)
+        self.assertEqual((info.encoding, info.segments), (UCS2, 2))
+        self.assertEqual(info.non_gsm_characters, ['’'])
+
+    def test_emoji_take_two_code_units(self):
+        info = analyze('😀' * 35)
+        self.assertEqual((info.encoding, info.length, info.segments), (UCS2, 70, 1))
+
+    def test_transliteration(self):
+        self.assertEqual(transliterate('“Don’t” — café… ﬁne façade'), '"Don\'t" - café... fine faÇade')
+        self.assertEqual(transliterate('Zoë Łódź'), 'Zoe Łodz')
+        self.assertEqual(analyze(transliterate('“Don’t” — café…')).encoding, GSM7)
+
+    def test_transliteration_keeps_characters_without_equivalent(self):
+        self.assertEqual(transliterate('Hi 😀 привет'), 'Hi 😀 привет')
+
+
+@override_settings(SMS_BACKEND='api.sms_backends.locmem.SMSBackend', SMS_SEGMENT_COST=0.02)
+class SendEstimateTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        locmem.outbox.clear()
+        self.user = User.objects.create_user(username='test_user', password='password', email='test@mail.com')
+        self.client.force_authenticate(user=self.user)
+        self.contact1 = Contact.objects.create(full_name='John Doe', phone='+233200000001', created_by=self.user)
+        self.contact2 = Contact.objects.create(full_name='Zoë Doe', phone='+233200000002', created_by=self.user)
+
+    def test_quick_send_dry_run(self):
+        response = self.client.post('/api/send-message', {'message': 'It’s here', 'contacts': ['+233200000001', '+233200000002'], 'dry_run': True}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['encoding'], UCS2)
+        self.assertEqual((response.data['messages'], response.data['total_segments']), (2, 2))
+        self.assertEqual(response.data['estimated_cost'], 0.04)
+        self.assertFalse(SendJob.objects.exists())
+
+    def test_quick_send_transliterates(self):
+        self.client.post('/api/send-message', {'message': 'It’s here', 'contacts': ['+233200000001'], 'transliterate': True}, format='json')
+        self.assertEqual(SendJob.objects.get().message, "It's here")
+
+    def test_template_dry_run(self):
+        template = Template.objects.create(name='promo', content='Hi <full_name> ' + 'a' * 150, created_by=self.user)
+        ContactTemplate.objects.create(contact_id=self.contact1, template_id=template)
+        ContactTemplate.objects.create(contact_id=self.contact2, template_id=template)
+
+        response = self.client.post('/api/templates/promo/send', {'dry_run': True})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['encodings'], {GSM7: 1, UCS2: 1})
+        self.assertEqual(response.data['non_gsm_characters'], ['ë'])
+        self.assertEqual((response.data['messages'], response.data['total_segments'], response.data['max_segments']), (2, 5, 3))
+
+        response = self.client.post('/api/templates/promo/send', {'dry_run': True, 'transliterate': True})
+        self.assertEqual(response.data['encodings'], {GSM7: 2})
+        self.assertEqual(response.data['total_segments'], 4)
+        self.assertFalse(SendJob.objects.exists())
+
+    def test_template_send_transliterates(self):
+        template = Template.objects.create(name='promo', content='Hi <full_name> — see you', created_by=self.user)
+        ContactTemplate.objects.create(contact_id=self.contact1, template_id=template)
+        self.client.post('/api/templates/promo/send', {'transliterate': True})
+        run_pending_jobs('worker-1')
+        self.assertEqual(locmem.outbox[0][0], 'Hi John Doe - see you')
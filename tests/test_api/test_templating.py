@@ -0,0 +1,46 @@
+from django.test import SimpleTestCase
+from api.templating import build_row_getter, compile_template, get_compiled_template
+from src.msg_templates.models import Template
+
+
+class CompiledTemplateTestCase(SimpleTestCase):
+    def test_placeholders_are_rendered(self):
+        compiled = compile_template('Hi <full_name>, call <phone>')
+        self.assertEqual(compiled.fields, ('full_name', 'phone'))
+        self.assertEqual(compiled.render({'full_name': 'John', 'phone': '+233200000001'}), 'Hi John, call +233200000001')
+
+    def test_null_values_render_empty(self):
+        compiled = compile_template('<full_name> <email> <info>')
+        self.assertEqual(compiled.render({'full_name': 'John', 'email': None, 'info': None}), 'John  ')
+
+    def test_row_getter_returns_a_tuple(self):
+        self.assertEqual(build_row_getter(('email',))({'email': None}), ('',))
+        self.assertEqual(build_row_getter(('full_name',))({'full_name': 'John'}), ('John',))
+        self.assertEqual(build_row_getter(('full_name', 'info'))({'full_name': 'John', 'info': None}), ('John', ''))
+        with self.assertRaises(ValueError):
+            build_row_getter(('full_name', 'password'))
+
+    def test_unknown_placeholders_and_braces_are_literal(self):
+        compiled = compile_template('{promo} <b>50%</b> for <full_name>')
+        self.assertEqual(compiled.fields, ('full_name',))
+        self.assertEqual(compiled.render({'full_name': 'John'}), '{promo} <b>50%</b> for John')
+
+    def test_any_contact_field_is_supported(self):
+        compiled = compile_template('Added on <created_at>')
+        self.assertEqual(compiled.fields, ('created_at',))
+
+    def test_render_many(self):
+        compiled = compile_template('Hello <full_name>')
+        rows = [{'full_name': 'John'}, {'full_name': 'Jane'}]
+        self.assertEqual(compiled.render_many(rows), ['Hello John', 'Hello Jane'])
+        self.assertEqual(compile_template('Hello').render_many(rows), ['Hello', 'Hello'])
+
+    def test_compiled_template_is_cached_until_updated(self):
+        template = Template(name='promo', content='Hi <full_name>')
+        template.updated_at = 1
+        compiled = get_compiled_template(template)
+        self.assertIs(get_compiled_template(template), compiled)
+
+        template.content = 'Bye <full_name>'
+        template.updated_at = 2
+        self.assertEqual(get_compiled_template(template).render({'full_name': 'John'}), 'Bye John')
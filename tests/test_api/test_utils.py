@@ -0,0 +1,75 @@
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.contrib.auth import get_user_model
+from src.contacts.models import Contact
+from src.message_logs.models import MessageLog, RecipientLog
+from src.msg_templates.models import Template, ContactTemplate
+from api.utils import add_contacts_to_template, create_recipient_log, remove_contacts_from_template, resolve_recipients
+
+User = get_user_model()
+
+
+def provider_response(numbers, status='Success'):
+    return [{'number': number, 'status': status} for number in numbers]
+
+
+class CreateRecipientLogTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='test_user', password='password', email='test@mail.com')
+        cls.numbers = [f'+2332000{i:05d}' for i in range(200)]
+        Contact.objects.bulk_create(
+            [Contact(full_name=f'Contact {i}', phone=number, phone_e164=number, created_by=cls.user) for i, number in enumerate(cls.numbers)]
+        )
+
+    def test_recipients_are_linked_to_contacts(self):
+        message_log = MessageLog.objects.create(content='Hello', author_id=self.user)
+        create_recipient_log(message_log, provider_response(self.numbers[:2] + ['+233999999999']), self.user)
+
+        logs = RecipientLog.objects.filter(message_id=message_log).select_related('contact_id').order_by('id')
+        self.assertEqual([log.contact_id.phone if log.contact_id else None for log in logs], self.numbers[:2] + [None])
+        self.assertTrue(all(log.status == 'Success' for log in logs))
+
+    def test_query_count_is_constant(self):
+        message_log = MessageLog.objects.create(content='Hello', author_id=self.user)
+        with CaptureQueriesContext(connection) as small:
+            create_recipient_log(message_log, provider_response(self.numbers[:10]), self.user)
+        with CaptureQueriesContext(connection) as large:
+            create_recipient_log(message_log, provider_response(self.numbers[:100]), self.user)
+
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(RecipientLog.objects.filter(message_id=message_log).count(), 110)
+
+    def test_provider_numbers_are_matched_normalized(self):
+        message_log = MessageLog.objects.create(content='Hello', author_id=self.user)
+        create_recipient_log(message_log, provider_response([self.numbers[0].lstrip('+'), '0' + self.numbers[1][4:]]), self.user)
+
+        logs = RecipientLog.objects.filter(message_id=message_log).select_related('contact_id').order_by('id')
+        self.assertEqual([log.contact_id.phone for log in logs], self.numbers[:2])
+
+
+class UnnormalizedContactTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='test_user', password='password', email='test@mail.com')
+        # saved before numbers were validated, its phone has no E.164 form
+        cls.legacy = Contact.objects.bulk_create([Contact(full_name='Legacy', phone='12345', created_by=cls.user)])[0]
+        cls.contact = Contact.objects.create(full_name='John Doe', phone='+233200000001', created_by=cls.user)
+
+    def test_numbers_that_cannot_be_normalized_match_as_entered(self):
+        self.assertEqual(resolve_recipients(['12345', '0200000001', '54321'], self.user), (['12345', '+233200000001'], ['54321']))
+        self.assertEqual(Contact.objects.with_phone(' 12345 ').get(), self.legacy)
+        self.assertFalse(Contact.objects.with_phone('+12345').exists())
+
+    def test_template_association(self):
+        template = Template.objects.create(name='promo', content='Hi', created_by=self.user)
+        self.assertEqual(add_contacts_to_template(['12345', '+233200000001'], template, self.user), ([], []))
+        self.assertEqual(ContactTemplate.objects.filter(template_id=template).count(), 2)
+        self.assertEqual(remove_contacts_from_template(['12345'], template, self.user), (1, []))
+        self.assertEqual(ContactTemplate.objects.get(template_id=template).contact_id, self.contact)
+
+    def test_recipient_logs_are_linked(self):
+        message_log = MessageLog.objects.create(content='Hello', author_id=self.user)
+        create_recipient_log(message_log, provider_response(['12345']), self.user)
+        self.assertEqual(RecipientLog.objects.get(message_id=message_log).contact_id, self.legacy)
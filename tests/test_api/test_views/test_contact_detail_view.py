@@ -0,0 +1,34 @@
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from src.contacts.models import Contact
+
+User = get_user_model()
+
+
+class ContactDetailViewTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='test_user', password='password', email='test@mail.com')
+        self.client.force_authenticate(user=self.user)
+        Contact.objects.create(full_name='John Doe', phone='+233201234567', created_by=self.user)
+        Contact.objects.create(full_name='Jane Doe', phone='+233241112222', created_by=self.user)
+
+    def test_update_to_a_number_written_differently_conflicts(self):
+        response = self.client.put('/api/contacts/Jane Doe', {'phone': '020 123 4567'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(Contact.objects.get(full_name='Jane Doe').phone_e164, '+233241112222')
+
+    def test_update_keeping_its_own_number(self):
+        response = self.client.put('/api/contacts/John Doe', {'phone': '020 123 4567', 'info': 'VIP'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Contact.objects.get(full_name='John Doe').info, 'VIP')
+
+    def test_contacts_named_like_the_contact_routes_are_reachable(self):
+        for name in ('export', 'import', 'imports'):
+            Contact.objects.create(full_name=name, phone=f'+23320000{len(name):04d}', created_by=self.user)
+            response = self.client.get(f'/api/contacts/{name}')
+            self.assertEqual(response.status_code, status.HTTP_200_OK, name)
+            self.assertEqual(response.data['full_name'], name)
+            self.assertEqual(self.client.delete(f'/api/contacts/{name}').status_code, status.HTTP_204_NO_CONTENT)
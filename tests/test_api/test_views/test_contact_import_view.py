@@ -0,0 +1,117 @@
+import shutil
+import tempfile
+from io import BytesIO
+import openpyxl
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from src.contacts.models import Contact, ContactImport
+from api.contact_import import run_pending_imports
+
+User = get_user_model()
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, CONTACT_IMPORT_BATCH_SIZE=2)
+class ContactImportViewTestCase(APITestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='test_user', password='password', email='test@mail.com')
+        self.client.force_authenticate(user=self.user)
+
+    def upload(self, content, name='contacts.csv'):
+        upload = SimpleUploadedFile(name, content.encode('utf-8-sig'), content_type='text/csv')
+        return self.client.post('/api/contact-imports', {'file': upload}, format='multipart')
+
+    def run_import(self, content):
+        response = self.upload(content)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(run_pending_imports('worker-1'), 1)
+        return self.client.get(f"/api/contact-imports/{response.data['import_id']}").data
+
+    def test_contacts_are_imported(self):
+        result = self.run_import(
+            'Full Name,Phone,Email,Info\n'
+            'John Doe,020 123 4567,john@mail.com,VIP\n'
+            'Jane Doe,+233240000000,,\n'
+            '"Doe, Jim",0270000000,,"multi\nline"\n'
+        )
+        self.assertEqual(result['status'], ContactImport.COMPLETED)
+        self.assertEqual((result['processed_rows'], result['created_count'], result['error_count']), (3, 3, 0))
+        john = Contact.objects.get(phone_e164='+233201234567')
+        self.assertEqual((john.full_name, john.email, john.info, john.created_by), ('John Doe', 'john@mail.com', 'VIP', self.user))
+        self.assertEqual(Contact.objects.get(phone_e164='+233270000000').info, 'multi\nline')
+
+    def test_existing_contacts_are_updated_and_duplicates_collapsed(self):
+        Contact.objects.create(full_name='Old Name', phone='020 123 4567', created_by=self.user)
+        result = self.run_import(
+            'full_name,phone\n'
+            'New Name,+233201234567\n'
+            'Jane Doe,0240000000\n'
+            'Jane Again,+233 24 000 0000\n'
+        )
+        # the last row falls in the second batch and updates the contact created by the first
+        self.assertEqual((result['created_count'], result['updated_count']), (1, 2))
+        self.assertEqual(Contact.objects.get(phone='020 123 4567').full_name, 'New Name')
+        self.assertEqual(Contact.objects.get(phone_e164='+233240000000').full_name, 'Jane Again')
+        self.assertEqual(Contact.objects.count(), 2)
+
+    def test_xlsx_workbooks_are_imported(self):
+        workbook = openpyxl.Workbook()
+        workbook.active.append(['Name', 'Mobile', 'Email', 'Notes'])
+        workbook.active.append(['John Doe', '020 123 4567', 'john@mail.com', None])
+        # numbers typed in a spreadsheet are read back as numbers
+        workbook.active.append(['Jane Doe', 233240000000, None, 'VIP'])
+        content = BytesIO()
+        workbook.save(content)
+        upload = SimpleUploadedFile('contacts.xlsx', content.getvalue())
+        response = self.client.post('/api/contact-imports', {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(run_pending_imports('worker-1'), 1)
+
+        result = self.client.get(f"/api/contact-imports/{response.data['import_id']}").data
+        self.assertEqual(result['status'], ContactImport.COMPLETED)
+        self.assertEqual((result['processed_rows'], result['created_count'], result['error_count']), (2, 2, 0))
+        john = Contact.objects.get(phone_e164='+233201234567')
+        self.assertEqual((john.full_name, john.email, john.info), ('John Doe', 'john@mail.com', None))
+        self.assertEqual(Contact.objects.get(phone_e164='+233240000000').info, 'VIP')
+
+    def test_invalid_rows_are_reported(self):
+        other = User.objects.create_user(username='other', password='password', email='other@mail.com')
+        Contact.objects.create(full_name='Taken', phone='+233200000009', email='taken@mail.com', created_by=other)
+        result = self.run_import(
+            'full_name,phone,email\n'
+            ',+233201234567,\n'
+            'John Doe,not a phone,\n'
+            'Jane Doe,+233240000000,not an email\n'
+            'Jim Doe,+233270000000,taken@mail.com\n'
+            'Joe Doe,+233280000000,\n'
+        )
+        self.assertEqual(result['status'], ContactImport.COMPLETED)
+        self.assertEqual((result['created_count'], result['error_count']), (1, 4))
+        self.assertEqual([e['row'] for e in result['errors']], [2, 3, 4, 5])
+        self.assertIn('belongs to another contact', result['errors'][3]['error'])
+
+    def test_missing_columns_fail_the_import(self):
+        result = self.run_import('name,email\nJohn Doe,john@mail.com\n')
+        self.assertEqual(result['status'], ContactImport.FAILED)
+        self.assertIn('phone', result['error'])
+
+    def test_unsupported_file_is_rejected(self):
+        response = self.upload('hello', name='contacts.txt')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(ContactImport.objects.exists())
+
+    def test_import_of_another_user_is_hidden(self):
+        response = self.upload('full_name,phone\nJohn Doe,+233201234567\n')
+        other = User.objects.create_user(username='other', password='password', email='other@mail.com')
+        self.client.force_authenticate(user=other)
+        response = self.client.get(f"/api/contact-imports/{response.data['import_id']}")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
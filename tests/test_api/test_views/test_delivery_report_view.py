@@ -0,0 +1,121 @@
+from unittest import mock
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, connection
+from django.test import override_settings
+from django.utils import timezone
+from django.test.utils import CaptureQueriesContext
+from src.message_logs.models import MessageLog, RecipientLog, RetrySchedule
+from api.delivery_reports import run_pending_delivery_reports
+from src.message_logs.models import PendingDeliveryReport
+
+User = get_user_model()
+
+URL = '/api/delivery-reports?token=secret'
+
+
+@override_settings(DLR_BATCH_SIZE=1000, DLR_RETRY_INTERVAL=0, DLR_CALLBACK_TOKEN='secret')
+class DeliveryReportViewTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='test_user', password='password', email='test@mail.com')
+        self.message = MessageLog.objects.create(content='Hello', author_id=self.user)
+        RecipientLog.objects.bulk_create(
+            [RecipientLog(message_id=self.message, status='Success', provider_message_id=f'ATXid_{i}') for i in range(50)]
+        )
+
+    def test_reports_are_stored_then_applied_in_batch(self):
+        for i in range(50):
+            response = self.client.post(URL, {'id': f'ATXid_{i}', 'status': 'Delivered'})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(PendingDeliveryReport.objects.count(), 50)
+        self.assertFalse(RecipientLog.objects.filter(status='Delivered').exists())
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(run_pending_delivery_reports(), 50)
+        # the reports read and delete, the batch read and write, the delivery rollups insert and update, plus savepoints
+        self.assertLessEqual(len(queries), 10)
+        self.assertEqual(RecipientLog.objects.filter(status='Delivered').count(), 50)
+        self.assertFalse(PendingDeliveryReport.objects.exists())
+        self.assertEqual(run_pending_delivery_reports(), 0)
+
+    def test_later_report_replaces_the_earlier_one(self):
+        self.client.post(URL, {'id': 'ATXid_1', 'status': 'Sent'})
+        self.client.post(URL, {'id': 'ATXid_1', 'status': 'Delivered'})
+        self.assertEqual(run_pending_delivery_reports(), 2)
+        self.assertEqual(RecipientLog.objects.get(provider_message_id='ATXid_1').status, 'Delivered')
+        self.assertFalse(PendingDeliveryReport.objects.exists())
+
+    def test_reports_are_kept_when_applying_fails(self):
+        self.client.post(URL, {'id': 'ATXid_1', 'status': 'Delivered'})
+        with mock.patch('api.delivery_reports.apply_delivery_reports', side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                run_pending_delivery_reports()
+        self.assertEqual(PendingDeliveryReport.objects.count(), 1)
+        self.assertEqual(run_pending_delivery_reports(), 1)
+        self.assertEqual(RecipientLog.objects.get(provider_message_id='ATXid_1').status, 'Delivered')
+
+    def test_json_list_of_reports(self):
+        reports = [{'id': 'ATXid_1', 'status': 'Failed'}, {'id': 'ATXid_2', 'status': 'Delivered'}]
+        response = self.client.post(URL, reports, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        run_pending_delivery_reports()
+        self.assertEqual(RecipientLog.objects.get(provider_message_id='ATXid_1').status, 'Failed')
+
+    def test_unmatched_reports_are_retried(self):
+        self.client.post(URL, {'id': 'ATXid_late', 'status': 'Delivered'})
+        self.assertEqual(run_pending_delivery_reports(), 1)
+        self.assertEqual(PendingDeliveryReport.objects.get().attempts, 1)
+        RecipientLog.objects.create(message_id=self.message, status='Success', provider_message_id='ATXid_late')
+        self.assertEqual(run_pending_delivery_reports(), 1)
+        self.assertEqual(RecipientLog.objects.get(provider_message_id='ATXid_late').status, 'Delivered')
+        self.assertFalse(PendingDeliveryReport.objects.exists())
+
+    @override_settings(DLR_RETRY_INTERVAL=60)
+    def test_older_report_retried_after_newer_one_applied(self):
+        self.client.post(URL, {'id': 'ATXid_late', 'status': 'Failed'})
+        self.assertEqual(run_pending_delivery_reports(), 1)
+        recipient_log = RecipientLog.objects.create(message_id=self.message, status='Success', provider_message_id='ATXid_late')
+        self.client.post(URL, {'id': 'ATXid_late', 'status': 'Delivered'})
+        delivered_at = PendingDeliveryReport.objects.get(status='Delivered').received_at
+        self.assertEqual(run_pending_delivery_reports(), 1)
+        recipient_log.refresh_from_db()
+        self.assertEqual((recipient_log.status, recipient_log.status_updated_at), ('Delivered', delivered_at))
+
+        # the retry of the failed report comes due after the delivery was applied
+        PendingDeliveryReport.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(run_pending_delivery_reports(), 1)
+        recipient_log.refresh_from_db()
+        self.assertEqual((recipient_log.status, recipient_log.status_updated_at), ('Delivered', delivered_at))
+        self.assertFalse(RetrySchedule.objects.exists())
+        self.assertFalse(PendingDeliveryReport.objects.exists())
+
+    @override_settings(DLR_RETRY_INTERVAL=60)
+    def test_retried_report_replaces_the_older_ones_waiting(self):
+        self.client.post(URL, {'id': 'ATXid_late', 'status': 'Sent'})
+        self.assertEqual(run_pending_delivery_reports(), 1)
+        self.client.post(URL, {'id': 'ATXid_late', 'status': 'Delivered'})
+        self.assertEqual(run_pending_delivery_reports(), 1)
+        self.assertEqual(list(PendingDeliveryReport.objects.values_list('status', 'attempts')), [('Delivered', 1)])
+
+    @override_settings(DLR_UNMATCHED_RETRIES=2)
+    def test_unmatched_reports_are_dropped_after_their_retries(self):
+        self.client.post(URL, {'id': 'ATXid_unknown', 'status': 'Delivered'})
+        for _ in range(3):
+            self.assertEqual(run_pending_delivery_reports(), 1)
+        self.assertFalse(PendingDeliveryReport.objects.exists())
+
+    def test_callback_token_is_checked(self):
+        response = self.client.post('/api/delivery-reports?token=wrong', {'id': 'ATXid_1', 'status': 'Delivered'})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.post('/api/delivery-reports', {'id': 'ATXid_1', 'status': 'Delivered'})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(PendingDeliveryReport.objects.exists())
+
+    @override_settings(DLR_CALLBACK_TOKEN='')
+    def test_reports_are_refused_without_a_configured_token(self):
+        response = self.client.post('/api/delivery-reports', {'id': 'ATXid_1', 'status': 'Failed'})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.post('/api/delivery-reports?token=', {'id': 'ATXid_1', 'status': 'Failed'})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(PendingDeliveryReport.objects.exists())
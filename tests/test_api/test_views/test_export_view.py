@@ -0,0 +1,115 @@
+import csv
+import gzip
+import io
+import json
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from src.contacts.models import Contact
+from src.message_logs.models import MessageLog, RecipientLog
+from src.msg_templates.models import Template, ContactTemplate
+
+User = get_user_model()
+
+
+def body(response):
+    return b''.join(response.streaming_content)
+
+
+class ContactExportViewTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='test_user', password='password', email='test@mail.com')
+        self.client.force_authenticate(user=self.user)
+        self.john = Contact.objects.create(full_name='John Doe', phone='0201234567', email='john@mail.com', created_by=self.user)
+        Contact.objects.create(full_name='Doe, Jane', phone='+233240000000', info='line one\nline two', created_by=self.user)
+        other = User.objects.create_user(username='other_user', password='password', email='other@mail.com')
+        Contact.objects.create(full_name='Someone Else', phone='0270000000', created_by=other)
+
+    def test_contacts_are_exported_as_csv(self):
+        response = self.client.get('/api/contacts-export')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="contacts.csv"')
+
+        rows = list(csv.DictReader(io.StringIO(body(response).decode('utf-8'))))
+        self.assertEqual([row['full_name'] for row in rows], ['John Doe', 'Doe, Jane'])
+        self.assertEqual(rows[0]['phone'], '+233201234567')
+        self.assertEqual(rows[0]['email'], 'john@mail.com')
+        self.assertEqual(rows[1]['info'], 'line one\nline two')
+
+    def test_contacts_are_exported_as_ndjson(self):
+        response = self.client.get('/api/contacts-export', {'file_format': 'ndjson'})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        lines = body(response).decode('utf-8').splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(json.loads(lines[0])['phone'], '+233201234567')
+
+    def test_export_is_gzipped_when_accepted(self):
+        response = self.client.get('/api/contacts-export', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        text = gzip.decompress(body(response)).decode('utf-8')
+        self.assertTrue(text.startswith('full_name,email,info,created_at,phone'))
+        self.assertIn('John Doe', text)
+
+    def test_gzip_refused_with_q_zero_is_not_used(self):
+        for accept_encoding in ('gzip;q=0, deflate', 'deflate, GZIP; q=0.0', '*;q=0', 'identity'):
+            with self.subTest(accept_encoding=accept_encoding):
+                response = self.client.get('/api/contacts-export', HTTP_ACCEPT_ENCODING=accept_encoding)
+                self.assertFalse(response.has_header('Content-Encoding'))
+                self.assertTrue(body(response).decode('utf-8').startswith('full_name,'))
+        for accept_encoding in ('gzip;q=0.5', '*', 'deflate, *;q=0.1'):
+            with self.subTest(accept_encoding=accept_encoding):
+                response = self.client.get('/api/contacts-export', HTTP_ACCEPT_ENCODING=accept_encoding)
+                self.assertEqual(response['Content-Encoding'], 'gzip')
+                b''.join(response.streaming_content)
+
+    def test_export_is_filtered_by_template(self):
+        template = Template.objects.create(name='Promo', content='Hi {full_name}', created_by=self.user)
+        ContactTemplate.objects.create(contact_id=self.john, template_id=template)
+        response = self.client.get('/api/contacts-export', {'template': 'Promo', 'file_format': 'ndjson'})
+        names = [json.loads(line)['full_name'] for line in body(response).decode('utf-8').splitlines()]
+        self.assertEqual(names, ['John Doe'])
+
+    def test_unknown_format_is_rejected(self):
+        response = self.client.get('/api/contacts-export', {'file_format': 'xml'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_invalid_date_is_rejected(self):
+        response = self.client.get('/api/contacts-export', {'created_after': 'yesterday'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class MessageLogExportViewTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='test_user', password='password', email='test@mail.com')
+        self.client.force_authenticate(user=self.user)
+        contact = Contact.objects.create(full_name='John Doe', phone='0201234567', created_by=self.user)
+        message = MessageLog.objects.create(content='Hello', author_id=self.user)
+        RecipientLog.objects.create(message_id=message, contact_id=contact, status='DELIVERED')
+        RecipientLog.objects.create(message_id=message, phone='+233240000000', status='FAILED', attempts=3)
+        other = User.objects.create_user(username='other_user', password='password', email='other@mail.com')
+        other_message = MessageLog.objects.create(content='Hello', author_id=other)
+        RecipientLog.objects.create(message_id=other_message, phone='+233270000000')
+
+    def export(self, **params):
+        response = self.client.get('/api/message-logs/export', params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return list(csv.DictReader(io.StringIO(body(response).decode('utf-8'))))
+
+    def test_one_row_per_recipient_is_exported(self):
+        rows = self.export()
+        self.assertEqual([(row['phone'], row['full_name'], row['status']) for row in rows], [
+            ('+233201234567', 'John Doe', 'DELIVERED'),
+            ('+233240000000', '', 'FAILED'),
+        ])
+        self.assertEqual({row['content'] for row in rows}, {'Hello'})
+        self.assertEqual(rows[1]['attempts'], '3')
+
+    def test_export_is_filtered_by_status(self):
+        rows = self.export(status='FAILED')
+        self.assertEqual([row['phone'] for row in rows], ['+233240000000'])
+
+    def test_export_is_filtered_by_date(self):
+        self.assertEqual(self.export(created_after='2999-01-01T00:00:00Z'), [])
@@ -0,0 +1,112 @@
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from unittest import skipUnless
+from src.contacts.models import Contact
+from src.message_logs.models import MessageLog, RecipientLog
+from api.sms_backends import locmem
+
+User = get_user_model()
+
+
+class MessageLogViewTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='test_user', password='password', email='test@mail.com')
+        self.client.force_authenticate(user=self.user)
+        self.contacts = Contact.objects.bulk_create(
+            [Contact(full_name=f'Contact {i}', phone=f'+2332000{i:05d}', created_by=self.user) for i in range(20)]
+        )
+
+    def create_logs(self, count, recipients):
+        logs = []
+        for _ in range(count):
+            log = MessageLog.objects.create(content='Hello', author_id=self.user)
+            RecipientLog.objects.bulk_create(
+                [RecipientLog(message_id=log, contact_id=contact, status='Success') for contact in self.contacts[:recipients]]
+            )
+            logs.append(log)
+        return logs
+
+    def test_list_query_count_is_constant(self):
+        self.create_logs(2, 2)
+        with CaptureQueriesContext(connection) as small:
+            self.assertEqual(self.client.get('/api/message-logs').status_code, status.HTTP_200_OK)
+        self.create_logs(8, 20)
+        cache.clear()
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get('/api/message-logs')
+        self.assertEqual(len(response.data['results']), 10)
+        self.assertEqual(len(small), len(large))
+
+    def test_list_returns_counters_without_reading_recipients(self):
+        MessageLog.objects.create(content='Hello', author_id=self.user, total_count=3, success_count=1, failed_count=1, pending_count=1)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/message-logs')
+        result = response.data['results'][0]
+        self.assertEqual(
+            [result[field] for field in ('total_count', 'success_count', 'failed_count', 'pending_count')], [3, 1, 1, 1]
+        )
+        self.assertNotIn('recipients', result)
+        self.assertFalse(any('recipient_log' in query['sql'] for query in queries))
+
+    def test_detail_query_count_is_constant(self):
+        small_log, large_log = self.create_logs(1, 1) + self.create_logs(1, 20)
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(f'/api/message-logs/{small_log.id}')
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get(f'/api/message-logs/{large_log.id}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['recipients']), 20)
+        self.assertEqual(response.data['recipients'][0]['contact_info']['full_name'], 'Contact 0')
+        self.assertEqual(len(small), len(large))
+
+    def search(self, q, **params):
+        cache.clear()
+        response = self.client.get('/api/message-logs', {'q': q, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [log['content'] for log in response.data['results']]
+
+    def create_searchable_logs(self):
+        for content in ['Black Friday promo: 20% off', 'Your code is 1234', 'Last chance for the promo', 'Friday meeting moved']:
+            MessageLog.objects.create(content=content, author_id=self.user)
+        other = User.objects.create_user(username='other_user', password='password', email='other@mail.com')
+        MessageLog.objects.create(content='Another promo', author_id=other)
+
+    @skipUnless(connection.vendor != 'postgresql', 'substring fallback')
+    def test_search_matches_every_word(self):
+        self.create_searchable_logs()
+        self.assertEqual(self.search('promo'), ['Last chance for the promo', 'Black Friday promo: 20% off'])
+        self.assertEqual(self.search('FRIDAY promo'), ['Black Friday promo: 20% off'])
+        self.assertEqual(self.search('invoice'), [])
+        self.assertEqual(self.search('promo', ordering='sent_at', page_size=1), ['Black Friday promo: 20% off'])
+
+    @skipUnless(connection.vendor == 'postgresql', 'full-text search')
+    def test_search_is_ranked(self):
+        self.create_searchable_logs()
+        MessageLog.objects.create(content='Promo promo promo', author_id=self.user)
+        self.assertEqual(self.search('promos')[0], 'Promo promo promo')
+        self.assertEqual(self.search('friday -meeting'), ['Black Friday promo: 20% off'])
+        self.assertEqual(len(self.search('promo', ordering='-sent_at')), 3)
+
+        response = self.client.get('/api/message-logs', {'q': 'promo', 'page_size': 2})
+        next_page = self.client.get(response.data['next'])
+        contents = [log['content'] for log in response.data['results'] + next_page.data['results']]
+        self.assertEqual(sorted(contents), ['Black Friday promo: 20% off', 'Last chance for the promo', 'Promo promo promo'])
+
+    @override_settings(SMS_BACKEND='api.sms_backends.locmem.SMSBackend')
+    def test_resends_go_to_the_normalized_numbers(self):
+        contact = Contact.objects.create(full_name='John Doe', phone='020 123 4567', created_by=self.user)
+        message = MessageLog.objects.create(content='Hello', author_id=self.user)
+        RecipientLog.objects.create(message_id=message, contact_id=contact, status='Failed')
+        locmem.outbox.clear()
+
+        response = self.client.post(f'/api/message-logs/{message.id}/resend')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        response = self.client.post(f'/api/message-logs/{message.id}/edit-resend', {'content': 'Hello again'})
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual([numbers for _, numbers, _ in locmem.outbox], [['+233201234567'], ['+233201234567']])
@@ -0,0 +1,141 @@
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from unittest import mock
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from src.contacts.models import Contact
+from src.msg_templates.models import Template, ContactTemplate
+from src.send_jobs.models import SendJob
+from api.jobs import claim_jobs, process_job, run_pending_jobs
+from api.rate_limit import TokenBucket
+from api.sms_backends import locmem
+
+User = get_user_model()
+
+
+@override_settings(SMS_BACKEND='api.sms_backends.locmem.SMSBackend')
+class SendJobViewTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        locmem.outbox.clear()
+        self.user = User.objects.create_user(username='test_user', password='password', email='test@mail.com')
+        self.client.force_authenticate(user=self.user)
+        self.contact1 = Contact.objects.create(full_name='John Doe', phone='+233200000001', created_by=self.user)
+        self.contact2 = Contact.objects.create(full_name='Jane Doe', phone='+233200000002', created_by=self.user)
+
+    def test_send_message_is_queued(self):
+        response = self.client.post('/api/send-message', {'message': 'Hello', 'contacts': ['+233200000001', '+233200000002']}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        job = SendJob.objects.get(pk=response.data['job_id'])
+        self.assertEqual(job.status, SendJob.PENDING)
+        self.assertEqual(job.total, 2)
+
+    def test_worker_drains_quick_send(self):
+        response = self.client.post('/api/send-message', {'message': 'Hello', 'contacts': ['+233200000001', '+233200000002']}, format='json')
+        self.assertEqual(run_pending_jobs('worker-1'), 1)
+
+        response = self.client.get(f"/api/send-jobs/{response.data['job_id']}")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], SendJob.COMPLETED)
+        self.assertEqual(response.data['processed'], 2)
+        self.assertEqual([r['status'] for r in response.data['recipients']['results']], ['Success', 'Success'])
+        self.assertEqual(response.data['counts'], {'total': 2, 'success': 2, 'failed': 0, 'pending': 0})
+        self.assertEqual(len(locmem.outbox), 1)
+
+    def test_recipients_are_paginated(self):
+        numbers = [f'+2332100000{i:02d}' for i in range(25)]
+        Contact.objects.bulk_create([Contact(full_name=f'Contact {i}', phone=number, phone_e164=number, created_by=self.user) for i, number in enumerate(numbers)])
+        response = self.client.post('/api/send-message', {'message': 'Hello', 'contacts': numbers}, format='json')
+        url = f"/api/send-jobs/{response.data['job_id']}"
+        run_pending_jobs('worker-1')
+
+        response = self.client.get(url)
+        self.assertEqual(response.data['counts']['total'], 25)
+        self.assertEqual(len(response.data['recipients']['results']), 10)
+        seen = [r['contact_info']['phone'] for r in response.data['recipients']['results']]
+        while response.data['recipients']['next']:
+            response = self.client.get(response.data['recipients']['next'])
+            seen += [r['contact_info']['phone'] for r in response.data['recipients']['results']]
+        self.assertCountEqual(seen, numbers)
+
+    def test_batch_claims_one_job_at_a_time(self):
+        for _ in range(2):
+            SendJob.objects.create(kind=SendJob.QUICK, created_by=self.user, message='Hello', recipients=['+233200000001'], total=1)
+        leased_while_running = []
+
+        def process(job, worker_id):
+            leased_while_running.append(SendJob.objects.filter(status=SendJob.RUNNING).exclude(pk=job.pk).exists())
+            process_job(job, worker_id)
+
+        with mock.patch('api.jobs.process_job', side_effect=process):
+            self.assertEqual(run_pending_jobs('worker-1', limit=5), 2)
+        self.assertEqual(leased_while_running, [False, False])
+        self.assertEqual(SendJob.objects.filter(status=SendJob.COMPLETED).count(), 2)
+
+    def test_worker_drains_template_send(self):
+        template = Template.objects.create(name='promo', content='Hi <full_name>', created_by=self.user)
+        ContactTemplate.objects.create(contact_id=self.contact1, template_id=template)
+        ContactTemplate.objects.create(contact_id=self.contact2, template_id=template)
+
+        response = self.client.post('/api/templates/promo/send')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        run_pending_jobs('worker-1')
+
+        job = SendJob.objects.get(pk=response.data['job_id'])
+        self.assertEqual(job.status, SendJob.COMPLETED)
+        self.assertEqual(job.processed, 2)
+        self.assertCountEqual(
+            [(log.content, log.recipientlog_set.get().contact_id) for log in job.messagelog_set.all()],
+            [('Hi John Doe', self.contact1), ('Hi Jane Doe', self.contact2)],
+        )
+        template.refresh_from_db()
+        self.assertIsNotNone(template.last_sent)
+
+    def test_identical_renders_share_a_provider_call(self):
+        template = Template.objects.create(name='promo', content='Sale ends today', created_by=self.user)
+        ContactTemplate.objects.create(contact_id=self.contact1, template_id=template)
+        ContactTemplate.objects.create(contact_id=self.contact2, template_id=template)
+
+        response = self.client.post('/api/templates/promo/send')
+        run_pending_jobs('worker-1')
+
+        self.assertEqual(len(locmem.outbox), 1)
+        self.assertCountEqual(locmem.outbox[0][1], ['+233200000001', '+233200000002'])
+        job = SendJob.objects.get(pk=response.data['job_id'])
+        self.assertEqual(job.messagelog_set.count(), 1)
+
+    @override_settings(SMS_RATE_LIMIT_PER_SECOND=1000, SMS_RATE_LIMIT_BURST=1000)
+    def test_sends_run_outside_the_job_transaction(self):
+        # the test case itself runs in transactions, count the ones opened since
+        depth = len(connection.atomic_blocks)
+        seen = []
+        try_acquire, send_batch = TokenBucket.try_acquire, locmem.SMSBackend.send_batch
+
+        def spy(original, name):
+            def wrapper(*args, **kwargs):
+                seen.append((name, len(connection.atomic_blocks) - depth))
+                return original(*args, **kwargs)
+            return wrapper
+
+        template = Template.objects.create(name='promo', content='Hi <full_name>', created_by=self.user)
+        ContactTemplate.objects.create(contact_id=self.contact1, template_id=template)
+        self.client.post('/api/send-message', {'message': 'Hello', 'contacts': ['+233200000001']}, format='json')
+        self.client.post('/api/templates/promo/send')
+        with mock.patch.object(TokenBucket, 'try_acquire', spy(try_acquire, 'bucket')), \
+                mock.patch.object(locmem.SMSBackend, 'send_batch', spy(send_batch, 'provider')):
+            self.assertEqual(run_pending_jobs('worker-1'), 1)
+            self.assertEqual(run_pending_jobs('worker-1'), 1)
+        self.assertEqual(seen, [('bucket', 0), ('provider', 0)] * 2)
+
+    def test_leased_job_is_not_claimed_twice(self):
+        SendJob.objects.create(kind=SendJob.QUICK, created_by=self.user, message='Hello', recipients=['+233200000001'], total=1)
+        self.assertEqual(len(claim_jobs('worker-1')), 1)
+        self.assertEqual(claim_jobs('worker-2'), [])
+
+    def test_job_of_another_user_is_hidden(self):
+        other = User.objects.create_user(username='other', password='password', email='other@mail.com')
+        job = SendJob.objects.create(kind=SendJob.QUICK, created_by=other, message='Hello', recipients=[], total=0)
+        response = self.client.get(f'/api/send-jobs/{job.id}')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,46 @@
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from src.contacts.models import Contact
+from src.send_jobs.models import SendJob
+
+User = get_user_model()
+
+
+@override_settings(SMS_BACKEND='api.sms_backends.locmem.SMSBackend')
+class SendMessageViewTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='test_user', password='password', email='test@mail.com')
+        cls.numbers = [f'+2332000{i:05d}' for i in range(200)]
+        Contact.objects.bulk_create(
+            [Contact(full_name=f'Contact {i}', phone=number, phone_e164=number, created_by=cls.user) for i, number in enumerate(cls.numbers)]
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(user=self.user)
+
+    def send(self, contacts):
+        return self.client.post('/api/send-message', {'message': 'Hello', 'contacts': contacts}, format='json')
+
+    def test_query_count_is_constant(self):
+        with CaptureQueriesContext(connection) as small:
+            self.assertEqual(self.send(self.numbers[:10]).status_code, status.HTTP_202_ACCEPTED)
+        with CaptureQueriesContext(connection) as large:
+            self.assertEqual(self.send(self.numbers).status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(len(small), len(large))
+
+    def test_recipients_are_normalized_and_deduplicated(self):
+        response = self.send([self.numbers[1], '0' + self.numbers[0][4:], self.numbers[1].lstrip('+')])
+        self.assertEqual(SendJob.objects.get(pk=response.data['job_id']).recipients, [self.numbers[1], self.numbers[0]])
+
+    def test_every_unknown_number_is_reported(self):
+        response = self.send([self.numbers[0], '+233999999998', 'garbage', '+233999999999'])
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.data['unknown'], ['+233999999998', 'garbage', '+233999999999'])
+        self.assertFalse(SendJob.objects.exists())
@@ -0,0 +1,84 @@
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from src.contacts.models import Contact
+from src.msg_templates.models import Template, ContactTemplate
+
+User = get_user_model()
+
+
+class TemplateContactViewTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='test_user', password='password', email='test@mail.com')
+        cls.numbers = [f'+2332000{i:05d}' for i in range(200)]
+        Contact.objects.bulk_create(
+            [Contact(full_name=f'Contact {i}', phone=number, phone_e164=number, created_by=cls.user) for i, number in enumerate(cls.numbers)]
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.user)
+        self.template = Template.objects.create(name='promo', content='Hi', created_by=self.user)
+
+    def add(self, contacts, name='promo'):
+        return self.client.post(f'/api/templates/{name}/contacts', {'contacts': contacts}, format='json')
+
+    def test_contacts_are_added(self):
+        response = self.add(self.numbers[:3])
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(ContactTemplate.objects.filter(template_id=self.template).count(), 3)
+
+    def test_contacts_are_listed_a_page_at_a_time(self):
+        self.add(self.numbers[:15])
+        response = self.client.get('/api/templates/promo/contacts', {'ordering': 'full_name', 'page_size': 10})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        names = [contact['full_name'] for contact in response.data['results']]
+        next_page = self.client.get(response.data['next'])
+        names += [contact['full_name'] for contact in next_page.data['results']]
+        self.assertEqual(names, sorted(f'Contact {i}' for i in range(15)))
+        self.assertIsNone(next_page.data['next'])
+
+    def test_template_without_contacts_lists_an_empty_page(self):
+        response = self.client.get('/api/templates/promo/contacts')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'], [])
+
+    def test_query_count_is_constant(self):
+        Template.objects.create(name='other', content='Hi', created_by=self.user)
+        with CaptureQueriesContext(connection) as small:
+            self.add(self.numbers[:10], name='other')
+        with CaptureQueriesContext(connection) as large:
+            self.add(self.numbers)
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(ContactTemplate.objects.filter(template_id=self.template).count(), 200)
+
+    def test_existing_and_unknown_numbers_are_reported(self):
+        self.add(self.numbers[:2])
+        response = self.add(self.numbers[1:4] + ['+233999999999'])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['already_associated'], [self.numbers[1]])
+        self.assertEqual(response.data['unknown'], ['+233999999999'])
+        # the new contacts were still added
+        self.assertEqual(ContactTemplate.objects.filter(template_id=self.template).count(), 4)
+
+    def remove(self, contacts):
+        return self.client.delete('/api/templates/promo/contacts', {'contacts': contacts}, format='json')
+
+    def test_contacts_are_removed_and_misses_counted(self):
+        self.add(self.numbers[:3])
+        response = self.remove([self.numbers[0], self.numbers[2].lstrip('+'), self.numbers[5], 'garbage'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data['removed'], response.data['unmatched']), (2, 2))
+        self.assertEqual(response.data['unmatched_numbers'], [self.numbers[5], 'garbage'])
+        self.assertEqual(list(ContactTemplate.objects.values_list('contact_id__phone', flat=True)), [self.numbers[1]])
+
+    def test_remove_query_count_is_constant(self):
+        self.add(self.numbers)
+        with CaptureQueriesContext(connection) as small:
+            self.remove(self.numbers[:10])
+        with CaptureQueriesContext(connection) as large:
+            self.remove(self.numbers[10:])
+        self.assertEqual(len(small), len(large))
+        self.assertFalse(ContactTemplate.objects.exists())
@@ -0,0 +1,126 @@
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+from src.contacts.models import Contact
+from src.contacts.utils import normalize_phone, normalize_phone_prefix
+
+User = get_user_model()
+
+
+class NormalizePhoneTestCase(SimpleTestCase):
+    def test_formats_are_normalized(self):
+        for phone in ['+233201234567', '+233 20 123 4567', '233201234567', '00233201234567', '020-123-4567', ' (020) 123.4567 ']:
+            self.assertEqual(normalize_phone(phone), '+233201234567', phone)
+
+    def test_country_code_can_be_given(self):
+        self.assertEqual(normalize_phone('0712345678', country_code='254'), '+254712345678')
+
+    def test_invalid_numbers(self):
+        for phone in [None, '', 'abc', '+12', '+0123456789', '+1234567890123456']:
+            self.assertIsNone(normalize_phone(phone), phone)
+
+    def test_prefixes_are_normalized(self):
+        for prefix, expected in [('+23320', '+23320'), ('020 12', '+2332012'), ('0', '+233'), ('0023', '+23'), ('2332', '+2332')]:
+            self.assertEqual(normalize_phone_prefix(prefix), expected, prefix)
+        for prefix in ['', '+', 'jo', '02x', '+0']:
+            self.assertIsNone(normalize_phone_prefix(prefix), prefix)
+
+
+class ContactPhoneTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='test_user', email='test@example.com', password='password')
+
+    def test_save_normalizes(self):
+        contact = Contact.objects.create(full_name='John Doe', phone='020 123 4567', created_by=self.user)
+        self.assertEqual(contact.phone_e164, '+233201234567')
+        contact.phone = '+233 24 000 0000'
+        contact.save(update_fields=['phone'])
+        self.assertEqual(Contact.objects.get(pk=contact.pk).phone_e164, '+233240000000')
+
+    def test_lookup_by_any_format(self):
+        contact = Contact.objects.create(full_name='John Doe', phone='+233201234567', created_by=self.user)
+        self.assertEqual(Contact.objects.with_phone('0201234567').get(), contact)
+        self.assertFalse(Contact.objects.with_phone('not a number').exists())
+
+    def test_invalid_number_does_not_match_unnormalized_contacts(self):
+        Contact.objects.create(full_name='John Doe', phone='12', created_by=self.user)
+        self.assertFalse(Contact.objects.with_phone('abc').exists())
+
+    def test_numbers_are_unique_once_normalized(self):
+        Contact.objects.create(full_name='John Doe', phone='+233201234567', created_by=self.user)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Contact.objects.create(full_name='John Again', phone='020 123 4567', created_by=self.user)
+        other = User.objects.create_user(username='other_user', email='other@example.com', password='password')
+        Contact.objects.create(full_name='John Doe', phone='0201234567', created_by=other)
+
+    def test_backfill(self):
+        Contact.objects.bulk_create([
+            Contact(full_name='John Doe', phone='0201234567', created_by=self.user),
+            Contact(full_name='Jane Doe', phone='12', created_by=self.user),
+        ])
+        out = StringIO()
+        call_command('backfill_phone_e164', batch_size=1, stdout=out)
+        self.assertEqual(Contact.objects.get(full_name='John Doe').phone_e164, '+233201234567')
+        self.assertIn('Normalized 1 phone numbers', out.getvalue())
+        self.assertIn('1 phone numbers could not be normalized', out.getvalue())
+
+
+class MergeDuplicateContactsMigrationTestCase(TransactionTestCase):
+    before = [('contacts', '0005_contact_search_index')]
+    after = [('contacts', '0006_contact_phone_e164_unique')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        executor.loader.build_graph()
+        return executor.loader.project_state(list(executor.loader.applied_migrations)).apps
+
+    def tearDown(self):
+        self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+    def test_duplicates_are_merged_into_the_oldest(self):
+        apps = self.migrate(self.before)
+        User = apps.get_model('accounts', 'UserAccount')
+        Contact = apps.get_model('contacts', 'Contact')
+        Template = apps.get_model('msg_templates', 'Template')
+        ContactTemplate = apps.get_model('msg_templates', 'ContactTemplate')
+        MessageLog = apps.get_model('message_logs', 'MessageLog')
+        RecipientLog = apps.get_model('message_logs', 'RecipientLog')
+
+        user = User.objects.create(username='test_user', email='test@example.com', password='password')
+        now = timezone.now()
+        # phone_e164 of the oldest is filled, the others were saved before the backfill
+        oldest, newer, newest = [
+            Contact.objects.create(full_name=name, phone=phone, phone_e164=phone_e164, created_by=user)
+            for name, phone, phone_e164 in [
+                ('John Doe', '+233201234567', '+233201234567'),
+                ('John D', '0201234567', None),
+                ('Johnny', '020 123 4567', None),
+            ]
+        ]
+        for age, contact in enumerate((newest, newer, oldest)):
+            Contact.objects.filter(pk=contact.pk).update(created_at=now - timedelta(days=age))
+        shared = Template.objects.create(name='Shared', content='Hi', created_by=user)
+        moved = Template.objects.create(name='Moved', content='Hi', created_by=user)
+        for contact, template in [(oldest, shared), (newer, shared), (newer, moved), (newest, moved)]:
+            ContactTemplate.objects.create(contact_id=contact, template_id=template)
+        message = MessageLog.objects.create(content='Hi', author_id=user)
+        RecipientLog.objects.create(message_id=message, contact_id=newest, status='Success')
+
+        apps = self.migrate(self.after)
+        Contact = apps.get_model('contacts', 'Contact')
+        ContactTemplate = apps.get_model('msg_templates', 'ContactTemplate')
+        RecipientLog = apps.get_model('message_logs', 'RecipientLog')
+        self.assertEqual(list(Contact.objects.values_list('pk', 'phone_e164')), [(oldest.pk, '+233201234567')])
+        self.assertEqual(
+            sorted(ContactTemplate.objects.values_list('template_id__name', 'contact_id')),
+            [('Moved', oldest.pk), ('Shared', oldest.pk)],
+        )
+        self.assertEqual(RecipientLog.objects.get().contact_id_id, oldest.pk)